@@ -3,11 +3,19 @@ Dependency injection for API routes.
 Provides:
 - get_current_user: Validate token and return authenticated user
 - Permission checks: Enforce RBAC on endpoints
+- cancel_on_disconnect: Stop work (and DB queries) when the client goes away
+- require_metrics_token: Bearer-token gate for the /metrics scrape endpoint
 """
-from fastapi import Depends, HTTPException, status
+import secrets
+from typing import Optional
+
+from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from app.services import auth_service
 from app.core.domain_errors import AuthenticationFailed, PermissionDenied
+from app.core.config import settings
+from app.core.middleware import CANCEL_ON_DISCONNECT
+from app.core.request_context import set_request_role
 from app.core.permissions import check_permission, Permission
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
@@ -20,6 +28,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
     """
     try:
         user = await auth_service.get_user_by_token(token)
+        set_request_role(user.get("role"))
         return user
     except AuthenticationFailed as e:
         raise HTTPException(
@@ -47,3 +56,32 @@ def require_permission(
                 detail=str(e),
             )
     return permission_check
+
+
+async def require_metrics_token(authorization: Optional[str] = Header(None)) -> None:
+    """
+    Scrapers authenticate with "Authorization: Bearer <METRICS_TOKEN>".
+    Without a configured token /metrics is open outside production and closed in it.
+    """
+    if not settings.METRICS_TOKEN:
+        if settings.is_production:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="METRICS_TOKEN is not configured")
+        return
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+async def cancel_on_disconnect(request: Request):
+    """
+    Cancel the endpoint when the client disconnects mid-request.
+    Used on interactive search endpoints so abandoned queries don't keep running.
+    Only marks the request: CancelOnDisconnectMiddleware watches the connection
+    and cancels the handler; add_request_context then kills the server
+    operations tagged with the request ID.
+    """
+    request.scope[CANCEL_ON_DISCONNECT] = True
@@ -2,17 +2,28 @@
 Admin API routes.
 Game Master / Management APIs: User management & audit views.
 """
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
+from pymongo.errors import BulkWriteError
 from app.api.v1 import deps
+from app.core.domain_errors import DuplicateIdentity, InvalidPageCursor
+from app.core.normalization import canonical_fields
 from app.core.permissions import Permission
-from app.services import user_service
-from app.repositories import audit_repo
+from app.core.sampling_profiler import to_folded_text
+from app.repositories import person_keys_repo, profile_repo
+from app.repositories.person_keys_repo import DRAFT, MASTER
+from app.services import audit_service, identity_service, user_service
 from app.db.mongodb import db
+from app.db.session import run_in_transaction
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
+# Master fields that hold identity keys (see identity_service.record_keys)
+IDENTITY_FIELDS = {"contact", "contact_number", "basic_info.contact", "id_proof_number"}
+
 
 class CreateUserRequest(BaseModel):
     username: str
@@ -62,20 +73,54 @@ async def create_user(
 @router.get("/audit-logs")
 async def get_audit_logs(
     entity_id: Optional[str] = None,
+    entity_type: Optional[str] = None,
+    user_id: Optional[str] = None,
+    action: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
     limit: int = 100,
     current_user: dict = Depends(deps.require_permission(Permission.VIEW_AUDIT_LOGS)),
 ):
     """
-    View audit logs.
+    View audit logs, newest first.
+    Filters: entity (type/id), actor (user_id), action, time range [since, until).
+    Pass `next_cursor` from the previous response as `cursor` for the next page.
     Only game_master and management roles can access this endpoint.
     """
+    if entity_id and not entity_type:
+        entity_type = "volunteer_master"  # Historical default of this endpoint
+    filters = audit_service.build_audit_filter(entity_type, entity_id, user_id, action, since, until)
+    limit = max(1, min(limit, 500))
+
+    try:
+        page = await audit_service.query_audit_logs(filters, cursor=cursor, limit=limit)
+    except InvalidPageCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return {"items": page["items"], "total": len(page["items"]), "next_cursor": page["next_cursor"]}
 
-    if entity_id:
-        logs = await audit_repo.find_by_entity("volunteer_master", entity_id, limit)
-    else:
-        logs = await audit_repo.find_recent(limit)
 
-    return {"items": logs, "total": len(logs)}
+@router.get("/audit-logs/export")
+async def export_audit_logs(
+    entity_id: Optional[str] = None,
+    entity_type: Optional[str] = None,
+    user_id: Optional[str] = None,
+    action: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_user: dict = Depends(deps.require_permission(Permission.VIEW_AUDIT_LOGS)),
+):
+    """
+    Stream matching audit logs as NDJSON (one entry per line) for compliance pulls.
+    Rows are streamed from the cursor, never held in memory all at once.
+    """
+    filters = audit_service.build_audit_filter(entity_type, entity_id, user_id, action, since, until)
+    return StreamingResponse(
+        audit_service.export_audit_logs_ndjson(filters),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=audit_logs.ndjson"},
+    )
 
 
 @router.get("/analytics")
@@ -218,6 +263,11 @@ async def update_volunteer_details(
                 for field, value in update_data["pre_screening"].items():
                     if field in allowed_fields:
                         update_fields[f"pre_screening.{field}"] = value
+
+        # Keep the top-level contact (duplicate checks, identity keys) in step
+        contact = (update_data.get("pre_screening") or {}).get("contact")
+        if contact and "contact" in volunteer:
+            update_fields["contact"] = contact
         
         # Update ID Proof details if provided
         if "id_proof" in update_data:
@@ -235,17 +285,42 @@ async def update_volunteer_details(
                 update_fields["id_proof_number"] = id_number
         
         if update_fields:
-            result = await volunteers_collection.update_one(
-                {"volunteer_id": volunteer_id},
-                {"$set": update_fields}
-            )
-            
+            update_fields.update(canonical_fields(update_fields))
+
+            # New contact / ID proof: the keys move with it, in the same transaction
+            keys = None
+            if IDENTITY_FIELDS & update_fields.keys():
+                keys = identity_service.record_keys_after(volunteer, update_fields)
+                await identity_service.ensure_available(keys, MASTER, volunteer_id, replace_types=(DRAFT,))
+
+            async def write(session):
+                result = await volunteers_collection.update_one(
+                    {"volunteer_id": volunteer_id},
+                    {"$set": update_fields},
+                    session=session,
+                )
+                if keys is not None:
+                    ops = person_keys_repo.claim_ops(keys, MASTER, volunteer_id, datetime.utcnow(), replace_types=(DRAFT,))
+                    ops.append(person_keys_repo.release_op(MASTER, volunteer_id, keep=keys))
+                    await person_keys_repo.bulk_write(ops, session=session, ordered=True)
+                return result
+
+            try:
+                result = await run_in_transaction(write)
+            except BulkWriteError as exc:
+                # Another record claimed one of the keys since the pre-check
+                if keys and identity_service.is_duplicate_key_error(exc):
+                    await identity_service.ensure_available(keys, MASTER, volunteer_id, replace_types=(DRAFT,))
+                raise
+
             if result.modified_count > 0:
                 return {"success": True, "message": "Volunteer updated successfully"}
             else:
                 return {"success": True, "message": "No changes made"}
         
         return {"success": False, "message": "No valid update data provided"}
+    except DuplicateIdentity as e:
+        raise HTTPException(400, str(e))
     except HTTPException:
         raise
     except Exception as e:
@@ -280,6 +355,8 @@ async def delete_volunteer(
         result = await volunteers_collection.delete_one({"volunteer_id": volunteer_id})
         
         if result.deleted_count > 0:
+            # Free the contact / ID proof for a future registration
+            await identity_service.release(MASTER, volunteer_id)
             return {"success": True, "message": f"Volunteer {volunteer_id} deleted successfully"}
         else:
             raise HTTPException(500, "Failed to delete volunteer")
@@ -288,3 +365,38 @@ async def delete_volunteer(
         raise
     except Exception as e:
         raise HTTPException(500, f"Failed to delete volunteer: {str(e)}")
+
+
+# ============ Request Profiles ============
+@router.get("/profiles")
+async def list_request_profiles(
+    limit: int = 50,
+    current_user: dict = Depends(deps.require_permission(Permission.PROFILE_REQUESTS)),
+):
+    """
+    List recent sampling-profiler runs (newest first, without stack data).
+    Trigger a profile by sending `X-Profile: 1` (or `?__profile=1`) on any request.
+    """
+    limit = max(1, min(limit, 200))
+    profiles = await profile_repo.find_recent(limit)
+    return {"items": profiles, "total": len(profiles)}
+
+
+@router.get("/profiles/{profile_id}")
+async def get_request_profile(
+    profile_id: str,
+    format: str = "json",
+    current_user: dict = Depends(deps.require_permission(Permission.PROFILE_REQUESTS)),
+):
+    """
+    Get one profile.
+    format=folded returns flame-graph input for flamegraph.pl / speedscope.
+    """
+    profile = await profile_repo.find_by_id(profile_id)
+    if not profile:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+
+    if format == "folded":
+        stacks = {entry["stack"]: entry["count"] for entry in profile["stacks"]}
+        return PlainTextResponse(to_folded_text(stacks))
+    return profile
@@ -9,8 +9,10 @@ from datetime import datetime
 from io import BytesIO
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment
+from app.db.query_policy import export_db
 from app.db.odm.volunteer_attendance import VolunteerAttendance
 from app.api.v1 import deps
+from app.core.metrics import observe_export_size
 
 router = APIRouter()
 
@@ -32,15 +34,18 @@ async def export_attendance(
     """
     from app.db.odm.assigned_study import AssignedStudy
     
+    # Exports read through the analytics handle with the export time limit
     # Fetch attendance records (volunteers who have checked in/out)
-    attendance_records = await VolunteerAttendance.find(
-        VolunteerAttendance.study_code == study_code
-    ).to_list()
+    attendance_records = [
+        VolunteerAttendance.model_validate(doc)
+        async for doc in export_db.volunteer_attendance.find({"study_code": study_code})
+    ]
     
     # Fetch assigned study records (all volunteers assigned to this study)
-    assigned_volunteers = await AssignedStudy.find(
-        AssignedStudy.study_code == study_code
-    ).to_list()
+    assigned_volunteers = [
+        AssignedStudy.model_validate(doc)
+        async for doc in export_db.assigned_studies.find({"study_code": study_code})
+    ]
     
     if not attendance_records and not assigned_volunteers:
         raise HTTPException(
@@ -184,6 +189,7 @@ async def export_attendance(
     buffer = BytesIO()
     wb.save(buffer)
     buffer.seek(0)
+    observe_export_size("attendance", buffer)
     
     # Generate filename with timestamp
     filename = f"Attendance_{study_code}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
@@ -213,11 +213,14 @@ async def assign_volunteer_to_study(
         remarks=""
     )
     
-    # Debug logging
-    print(f"DEBUG CREATE ASSIGNMENT:")
-    print(f"  Volunteer from DB: {volunteer.get('basic_info', {}).get('name')}")
-    print(f"  Assignment volunteer_name: {assigned_study.volunteer_name}")
-    print(f"  Assignment date: {assignment_date_to_use}")
+    logger.debug(
+        "Creating assignment",
+        extra={
+            "volunteer_name": assigned_study.volunteer_name,
+            "db_name": volunteer.get("basic_info", {}).get("name"),
+            "assignment_date": assignment_date_to_use,
+        },
+    )
     
     await assigned_study.insert()
     
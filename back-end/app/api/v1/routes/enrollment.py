@@ -10,7 +10,8 @@ from datetime import datetime
 from app.api.v1 import deps
 from app.core.permissions import Permission
 from app.services import enrollment_service
-from app.core.domain_errors import InvalidVolunteerState
+from app.core.domain_errors import DuplicateIdentity, InvalidVolunteerState
+from app.core.normalization import canonical_fields
 from app.db.mongodb import db
 
 router = APIRouter(prefix="/enrollment", tags=["enrollment"])
@@ -63,7 +64,7 @@ async def create_from_draft(
             "volunteer_id": volunteer_id,
             "status": "created",
         }
-    except InvalidVolunteerState as e:
+    except (InvalidVolunteerState, DuplicateIdentity) as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e),
@@ -180,7 +181,7 @@ async def approve_volunteer(
     # Update status to approved
     result = await db.volunteers_master.update_one(
         {"volunteer_id": volunteer_id},
-        {"$set": update_fields}
+        {"$set": {**update_fields, **canonical_fields(update_fields)}}
     )
     
     if result.modified_count == 0:
@@ -218,15 +219,14 @@ async def reject_volunteer(
             detail=f"Volunteer must be in screening status to reject. Current status: {volunteer.get('current_status')}"
         )
     
+    update_fields = {
+        "current_status": "rejected",
+        "audit.updated_at": datetime.utcnow(),
+        "audit.updated_by": current_user.get("name", current_user.get("username"))
+    }
     result = await db.volunteers_master.update_one(
         {"volunteer_id": volunteer_id},
-        {
-            "$set": {
-                "current_status": "rejected",
-                "audit.updated_at": datetime.utcnow(),
-                "audit.updated_by": current_user.get("name", current_user.get("username"))
-            }
-        }
+        {"$set": {**update_fields, **canonical_fields(update_fields)}}
     )
     
     if result.modified_count == 0:
@@ -264,15 +264,14 @@ async def move_back_to_prescreening(
             detail=f"Volunteer must be approved to move back. Current status: {volunteer.get('current_status')}"
         )
     
+    update_fields = {
+        "current_status": "prescreening",
+        "audit.updated_at": datetime.utcnow(),
+        "audit.updated_by": current_user.get("name", current_user.get("username"))
+    }
     result = await db.volunteers_master.update_one(
         {"volunteer_id": volunteer_id},
-        {
-            "$set": {
-                "current_status": "prescreening",
-                "audit.updated_at": datetime.utcnow(),
-                "audit.updated_by": current_user.get("name", current_user.get("username"))
-            }
-        }
+        {"$set": {**update_fields, **canonical_fields(update_fields)}}
     )
     
     if result.modified_count == 0:
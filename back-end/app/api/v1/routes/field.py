@@ -8,11 +8,13 @@ from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 from typing import Optional
+from bson import ObjectId
 from app.api.v1 import deps
 from app.core.permissions import Permission
 from app.repositories import field_visit_repo
-from app.core.domain_errors import DuplicateFieldVisit
-from app.db.client import db
+from app.repositories.person_keys_repo import CONTACT, DRAFT, ID_PROOF, MASTER, key_kind
+from app.core.domain_errors import DuplicateIdentity
+from app.services import identity_service
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/field", tags=["field-visits"])
@@ -50,37 +52,26 @@ async def create_field_visit(
     # Check permission
     deps.require_permission(Permission.CREATE_FIELD_DRAFT)
 
-    # Check for duplicates in field_visits collection
-    existing = await field_visit_repo.find_by_contact(data.contact)
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail=f"Field visit with contact '{data.contact}' already exists",
-        )
-    
-    # IMPORTANT: Also check if volunteer already exists in volunteers_master
-    existing_volunteer = await db.volunteers_master.find_one({"contact": data.contact})
-    if existing_volunteer:
+    # One identity-index lookup covers drafts and master records, in any spelling
+    draft_id = ObjectId()
+    try:
+        await identity_service.reserve(DRAFT, str(draft_id), contacts=[data.contact])
+    except DuplicateIdentity as e:
+        if e.owner_type == DRAFT:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Field visit with contact '{data.contact}' already exists",
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"This volunteer (contact: {data.contact}) is already registered in the system. Cannot create field visit for already registered volunteer.",
         )
-    
-    # Check if surname + contact combination already exists in volunteers_master
-    existing_surname = await db.volunteers_master.find_one({
-        "basic_info.surname": data.surname,
-        "contact": data.contact
-    })
-    if existing_surname:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"A volunteer with surname '{data.surname}' and this contact number already exists in the system.",
-        )
 
     # Create draft with proper structure
     full_name = f"{data.first_name} {data.middle_name} {data.surname}" if data.middle_name else f"{data.first_name} {data.surname}"
     
     field_visit = {
+        "_id": draft_id,
         "contact": data.contact,
         "field_area": "Unknown",  # Field agents don't specify area in form
         "basic_info": {
@@ -100,7 +91,11 @@ async def create_field_visit(
         }
     }
 
-    visit_id = await field_visit_repo.create(field_visit)
+    try:
+        visit_id = await field_visit_repo.create(field_visit)
+    except Exception:
+        await identity_service.release(DRAFT, draft_id)
+        raise
     logger.info(f"Field visit created by {current_user['username']} for contact {data.contact}")
     return {"id": visit_id, "status": "created"}
 
@@ -111,50 +106,44 @@ async def check_duplicate(contact: str, id_proof_number: Optional[str] = None):
     Check if a field visit with this contact or ID proof already exists.
     """
     logger.debug(f"Duplicate check for contact={contact}, ID={id_proof_number}")
-    
+
+    # Every key in one query; report drafts first, then master contact, then master ID proof
+    owners = await identity_service.find_duplicates(contacts=[contact], id_proofs=[id_proof_number])
+    contact_owner = next((o for k, o in owners.items() if key_kind(k) == CONTACT), None)
+    id_proof_owner = next((o for k, o in owners.items() if key_kind(k) == ID_PROOF), None)
+
     # 1. Check Drafts (Field Visits)
-    # Check by Contact
-    existing_draft = await field_visit_repo.find_by_contact(contact)
-    if existing_draft:
+    if contact_owner and contact_owner["type"] == DRAFT:
         logger.info(f"Duplicate found in field drafts for contact: {contact}")
+        existing_draft = await field_visit_repo.find_by_id(contact_owner["id"])
         return {
             "exists": True, 
             "location": "field",
             "details": "Found in field drafts (Contact Match)",
-            "draft": existing_draft.get("basic_info", {})
+            "draft": (existing_draft or {}).get("basic_info", {})
         }
-        
-    # Check by ID Proof (if provided) - field_visit_repo might need update if we store ID proof in drafts
-    # Currently Drafts don't store ID proof typically, but updated FieldForm sends it.
-    # We haven't updated FieldVisitCreate model yet! We should do that too.
-    # For now, let's focus on Master check for ID Proof as distinct warning.
 
     # 2. Check Master Volunteers
-    from app.repositories import volunteer_repo
-    
     # Master Contact Check
-    master_contact = await volunteer_repo.find_by_contact(contact)
-    if master_contact:
+    if contact_owner and contact_owner["type"] == MASTER:
         logger.info(f"Duplicate found in master for contact: {contact}")
         return {
             "exists": True, 
             "location": "master",
             "details": "Found in master database (Contact Match)",
-             "master_id": master_contact.get("volunteer_id")
+             "master_id": contact_owner["id"]
         }
 
     # Master ID Proof Check
-    if id_proof_number:
-        master_id_proof = await volunteer_repo.find_by_id_proof(id_proof_number)
-        if master_id_proof:
-            logger.info(f"Duplicate found in master for ID proof: {id_proof_number}")
-            return {
-                "exists": True,
-                "location": "master",
-                "details": "Found in master database (ID Proof Match)",
-                "master_id": master_id_proof.get("volunteer_id"),
-                "match_type": "id_proof"
-            }
+    if id_proof_owner and id_proof_owner["type"] == MASTER:
+        logger.info(f"Duplicate found in master for ID proof: {id_proof_number}")
+        return {
+            "exists": True,
+            "location": "master",
+            "details": "Found in master database (ID Proof Match)",
+            "master_id": id_proof_owner["id"],
+            "match_type": "id_proof"
+        }
 
     logger.debug("No duplicate found")
     return {"exists": False}
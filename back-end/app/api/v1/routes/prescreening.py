@@ -5,6 +5,10 @@ from app.db.mongodb import db
 from app.utils.id_generator import generate_volunteer_id
 from app.utils.id_generation import generate_unique_subject_code
 from app.repositories import volunteer_repo
+from app.repositories.person_keys_repo import CONTACT, DRAFT, MASTER
+from app.core.domain_errors import DuplicateIdentity
+from app.core.normalization import canonical_fields
+from app.services import identity_service
 from datetime import datetime
 
 router = APIRouter()
@@ -17,26 +21,6 @@ async def create_prescreening(
     volunteer_id = await generate_volunteer_id()
     now = datetime.utcnow()
 
-    # Check for duplicates in volunteers_master collection
-    # First check if contact number already exists
-    existing_contact = await db.volunteers_master.find_one({"contact": data.contact})
-    if existing_contact:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"A volunteer with contact number {data.contact} already exists in the system. Please use Search & Register."
-        )
-    
-    # Check if surname + contact combination already exists (extra safety)
-    existing_surname_contact = await db.volunteers_master.find_one({
-        "basic_info.surname": data.surname,
-        "contact": data.contact
-    })
-    if existing_surname_contact:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"A volunteer with surname '{data.surname}' and this contact number already exists."
-        )
-
     # Validate Age
     if data.dob:
         dob_date = datetime.strptime(data.dob, "%Y-%m-%d")
@@ -48,6 +32,21 @@ async def create_prescreening(
             )
     
     
+    # Claim contact + ID proof in the identity index (a field draft's claim is taken over)
+    try:
+        await identity_service.reserve(
+            MASTER, volunteer_id,
+            contacts=[data.contact],
+            id_proofs=[data.id_proof_number],
+            replace_types=(DRAFT,),
+        )
+    except DuplicateIdentity as e:
+        if e.kind == CONTACT:
+            detail = f"A volunteer with contact number {data.contact} already exists in the system. Please use Search & Register."
+        else:
+            detail = f"A volunteer with ID proof number {data.id_proof_number} already exists in the system. Please use Search & Register."
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
     # Combine name fields
     full_name = f"{data.first_name} {data.middle_name} {data.surname}" if data.middle_name else f"{data.first_name} {data.surname}"
     
@@ -92,6 +91,8 @@ async def create_prescreening(
         }
     }
     
+    master_doc.update(canonical_fields(master_doc))
+
     # 2. Create Pre-screening Form
     prescreen_doc = {
         "volunteer_id": volunteer_id,
@@ -106,11 +107,17 @@ async def create_prescreening(
     }
     
     # Insert into new collections
-    await db.volunteers_master.insert_one(master_doc)
+    try:
+        await db.volunteers_master.insert_one(master_doc)
+    except Exception:
+        await identity_service.release(MASTER, volunteer_id)
+        raise
     await db.prescreening_forms.insert_one(prescreen_doc)
 
-    # 3. Clean up Field Visit record if it exists
-    await db.field_visits.delete_one({"contact": data.contact})
+    # 3. Clean up Field Visit record (and any keys it still holds) if it exists
+    draft = await db.field_visits.find_one_and_delete({"contact": data.contact}, {"_id": 1})
+    if draft:
+        await identity_service.release(DRAFT, draft["_id"])
     
     return {
         "message": "Pre-screening record created successfully",
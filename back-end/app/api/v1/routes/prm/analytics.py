@@ -6,9 +6,10 @@ from fastapi import APIRouter, Depends, Query
 from typing import Optional, Dict, Any
 from datetime import datetime, timedelta, timezone
 import logging
+import re
 
 from app.db.odm.study_master import StudyMaster
-from app.db import db
+from app.db.query_policy import dashboard_db
 from app.db.models.user import UserBase
 from app.api.v1.deps import get_current_user
 
@@ -42,14 +43,14 @@ async def get_dashboard_metrics(
         "status": {"$in": ["COMPLETED", "completed"]}
     }
     
-    ongo = await db.study_instances.count_documents(ongo_q)
-    upco = await db.study_instances.count_documents(upco_q)
-    comp = await db.study_instances.count_documents(comp_q)
+    ongo = await dashboard_db.study_instances.count_documents(ongo_q)
+    upco = await dashboard_db.study_instances.count_documents(upco_q)
+    comp = await dashboard_db.study_instances.count_documents(comp_q)
 
     # 3. Volunteer Stats (Global from Volunteers Collection)
-    vol_coll = db.volunteers
+    vol_coll = dashboard_db.volunteers
     if (await vol_coll.count_documents({})) == 0:
-         vol_coll = db.volunteers_master
+         vol_coll = dashboard_db.volunteers_master
     
     total_volunteers_clinic = await vol_coll.count_documents({})
     
@@ -59,14 +60,14 @@ async def get_dashboard_metrics(
         {"$group": {"_id": "$volunteerId"}},
         {"$count": "count"}
     ]
-    active_vols_res = await db.study_visits.aggregate(pipeline).to_list(1)
+    active_vols_res = await dashboard_db.study_visits.aggregate(pipeline).to_list(1)
     participating_volunteers = active_vols_res[0]["count"] if active_vols_res else 0
     
     # Registration process? Maybe status="new" or similar in volunteers
     registration_volunteers = await vol_coll.count_documents({"status": {"$in": ["new", "registration", "pending"]}})
 
     # Fetch Visit Stats (Global)
-    visits = await db.study_visits.find().to_list(10000)
+    visits = await dashboard_db.study_visits.find().to_list(10000)
     upcoming_visits_count = sum(1 for v in visits if v.get("status") == "UPCOMING")
     completed_visits_count = sum(1 for v in visits if v.get("status") == "COMPLETED")
     
@@ -103,20 +104,21 @@ async def search_dashboard(
     Search for Studies or Volunteers.
     """
     if type == "study":
-        # Search Instances (Active Studies)
+        # Search Instances (Active Studies); codes like "AB-1(2)" are matched literally
+        pattern = re.escape(q)
         query = {
             "$or": [
-                {"studyName": {"$regex": q, "$options": "i"}},
-                {"enteredStudyCode": {"$regex": q, "$options": "i"}},
-                {"studyInstanceCode": {"$regex": q, "$options": "i"}},
-                {"studyId": {"$regex": q, "$options": "i"}}
+                {"studyName": {"$regex": pattern, "$options": "i"}},
+                {"enteredStudyCode": {"$regex": pattern, "$options": "i"}},
+                {"studyInstanceCode": {"$regex": pattern, "$options": "i"}},
+                {"studyId": {"$regex": pattern, "$options": "i"}}
             ]
         }
-        instances = await db.study_instances.find(query).to_list(50)
+        instances = await dashboard_db.study_instances.find(query).to_list(50)
         results = []
         for i in instances:
             iid = str(i["_id"])
-            v_count = await db.study_visits.count_documents({"studyInstanceId": iid})
+            v_count = await dashboard_db.study_visits.count_documents({"studyInstanceId": iid})
             
             # Use the entered study code or studyInstanceCode as the code
             study_code = i.get("enteredStudyCode") or i.get("studyInstanceCode") or i.get("studyId", "N/A")
@@ -133,9 +135,9 @@ async def search_dashboard(
         
     elif type == "volunteer":
         # Search Volunteers
-        vol_coll = db.volunteers
+        vol_coll = dashboard_db.volunteers
         count = await vol_coll.count_documents({})
-        if count == 0: vol_coll = db.volunteers_master
+        if count == 0: vol_coll = dashboard_db.volunteers_master
             
         v_query = {
              "$or": [
@@ -148,7 +150,7 @@ async def search_dashboard(
         results = []
         for v in vols:
             vid = str(v.get("_id"))
-            history_count = await db.study_visits.count_documents({"volunteerId": vid}) 
+            history_count = await dashboard_db.study_visits.count_documents({"volunteerId": vid}) 
             
             results.append({
                 "id": vid,
@@ -187,7 +189,7 @@ async def get_analytics(user: UserBase = Depends(get_current_user)):
     ]
 
     # 2. Visits by Status (Source: Visits collection)
-    visits = await db.study_visits.find().to_list(10000)
+    visits = await dashboard_db.study_visits.find().to_list(10000)
     status_counts = {}
     for v in visits:
         s = v.get("status", "UNKNOWN")
@@ -242,7 +244,7 @@ async def get_studies_by_status(
             query = {"status": {"$in": ["COMPLETED", "completed"]}}
         
         # Fetch studies matching the status
-        studies = await db.study_instances.find(query).sort("startDate", -1).to_list(1000)
+        studies = await dashboard_db.study_instances.find(query).sort("startDate", -1).to_list(1000)
         
         results = []
         for study in studies:
@@ -252,10 +254,10 @@ async def get_studies_by_status(
             # Count assigned volunteers for this study
             assignment_count = 0
             if study_code:
-                assignment_count = await db.assigned_studies.count_documents({"study_code": study_code})
+                assignment_count = await dashboard_db.assigned_studies.count_documents({"study_code": study_code})
             
             # Count visits for this study
-            visit_count = await db.study_visits.count_documents({"studyInstanceId": study_id})
+            visit_count = await dashboard_db.study_visits.count_documents({"studyInstanceId": study_id})
             
             results.append({
                 "_id": study_id,
@@ -300,7 +302,7 @@ async def get_timeline_workload(
     start_dt = datetime.strptime(start, "%Y-%m-%d") if start else current
     end_dt = datetime.strptime(end, "%Y-%m-%d") if end else (start_dt + timedelta(days=60))
     
-    visits = await db.study_visits.find({
+    visits = await dashboard_db.study_visits.find({
         "status": {"$ne": "CANCELLED"},
         "plannedDate": {"$gte": start_dt, "$lte": end_dt}
     }).to_list(5000)
@@ -13,112 +13,74 @@ from beanie import PydanticObjectId
 
 from app.db.odm.assigned_study import AssignedStudy
 from app.db import db
+from app.db.query_policy import export_db
 from app.db.models.user import UserBase
-from app.api.v1.deps import get_current_user
+from app.api.v1.deps import get_current_user, cancel_on_disconnect
+from app.core.domain_errors import InvalidPageCursor
+from app.core.metrics import observe_export_size
+from app.repositories import assignment_repo
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-@router.get("/assigned-studies")
+@router.get("/assigned-studies", dependencies=[Depends(cancel_on_disconnect)])
 async def get_assigned_studies(
     page: int = 1,
     limit: int = 50,
     search: Optional[str] = None,
     study_id: Optional[str] = None,
+    cursor: Optional[str] = None,
     user: UserBase = Depends(get_current_user)
 ):
     """
     Get paginated list of assigned studies from dedicated collection.
     Only returns studies that were created via PRM calendar login.
+    Pass `next_cursor` as `cursor` to page without skip offsets (`page` is then ignored).
     """
-    skip = (page - 1) * limit
-    
-    query = {}
-    if search:
-        query["$or"] = [
-            {"volunteer_name": {"$regex": search, "$options": "i"}},
-            {"volunteer_id": {"$regex": search, "$options": "i"}},
-            {"study_code": {"$regex": search, "$options": "i"}},
-            {"study_name": {"$regex": search, "$options": "i"}}
-        ]
-    
-    if study_id:
-        query["study_id"] = study_id
+    limit = max(1, min(limit, 500))
+    skip = (max(page, 1) - 1) * limit
 
-    # Count
-    total = await AssignedStudy.find(query).count()
-    
-    # Fetch
-    assignments = await AssignedStudy.find(query).sort("-created_at").skip(skip).limit(limit).to_list()
-    
-    # Filter to only PRM calendar studies
-    # Get unique study_ids from assignments
-    unique_study_ids = list(set([a.study_id for a in assignments if a.study_id]))
-    
-    # Check which studies exist in study_instances (PRM calendar)
-    prm_study_ids = set()
-    if unique_study_ids:
-        obj_ids = []
-        for sid in unique_study_ids:
-            try:
-                obj_ids.append(PydanticObjectId(sid))
-            except:
-                pass
-        
-        if obj_ids:
-            calendar_studies = await db.study_instances.find({"_id": {"$in": obj_ids}}).to_list(None)
-            prm_study_ids = {str(cs["_id"]) for cs in calendar_studies}
-    
-    # Filter assignments to only those from PRM calendar
-    filtered_assignments = [a for a in assignments if a.study_id in prm_study_ids]
-    
-    # ------------------------------------------------------------------
-    # Fetch PRM Study Codes (enteredStudyCode) from Calendar
-    # ------------------------------------------------------------------
-    study_code_map = {}
-    if prm_study_ids:
-        obj_ids = [PydanticObjectId(sid) for sid in prm_study_ids]
-        calendar_studies = await db.study_instances.find({"_id": {"$in": obj_ids}}).to_list(None)
-        for cs in calendar_studies:
-            # enteredStudyCode is the "PRM Login Code" (e.g. XXX-7I02...)
-            # fallback to studyInstanceCode if entered missing
-            code = cs.get("enteredStudyCode") or cs.get("studyInstanceCode")
-            if code:
-                study_code_map[str(cs["_id"])] = code
+    try:
+        result = await assignment_repo.find_calendar_assignments(
+            search=search, study_id=study_id, cursor=cursor, skip=skip, limit=limit
+        )
+    except InvalidPageCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     # Map to frontend format
     data = []
-    for a in filtered_assignments:
+    for a in result["items"]:
         # Sanitize volunteer name - remove duplicate prefix if exists (e.g., "SSahil" -> "Sahil", "ffieldtest" -> "fieldtest")
-        volunteer_name = a.volunteer_name or ""
+        volunteer_name = a.get("volunteer_name") or ""
         # Check if first two characters are identical (regardless of case)
         if len(volunteer_name) > 1 and volunteer_name[0] == volunteer_name[1]:
             # Likely a duplicate prefix, remove first character
             volunteer_name = volunteer_name[1:]
-            print(f"DEBUG: Sanitized '{a.volunteer_name}' -> '{volunteer_name}'")  # Debug log
-        
+
+        assignment_date = a.get("assignment_date")
         data.append({
-            "_id": str(a.id),  # Add MongoDB document ID for attendance tracking
-            "visit_id": a.visit_id,
-            "volunteer_id": a.volunteer_id,
+            "_id": str(a["_id"]),  # Add MongoDB document ID for attendance tracking
+            "visit_id": a.get("visit_id"),
+            "volunteer_id": a.get("volunteer_id"),
             "volunteer_name": volunteer_name,
-            "volunteer_contact": a.volunteer_contact,
-            "volunteer_gender": a.volunteer_gender,
-            "volunteer_gender": a.volunteer_gender,
-            "study_code": a.study_code,
-            "prm_study_code": study_code_map.get(a.study_id, a.study_code), # New Field: verified PRM code
-            "study_name": a.study_name,
-            "visit_date": a.assignment_date.strftime("%Y-%m-%d"),
-            "status": a.fitness_status,
-            "assigned_by": a.assigned_by
+            "volunteer_contact": a.get("volunteer_contact"),
+            "volunteer_gender": a.get("volunteer_gender"),
+            "study_code": a.get("study_code"),
+            "prm_study_code": a.get("prm_study_code") or a.get("study_code"),  # verified PRM code
+            "study_name": a.get("study_name"),
+            "visit_date": assignment_date.strftime("%Y-%m-%d") if assignment_date else None,
+            "status": a.get("fitness_status", "pending"),
+            "assigned_by": a.get("assigned_by")
         })
-        
+
+    total = result["total"]
     return {
         "success": True,
         "data": data,
-        "total": len(data),  # Update total to reflect filtered count
+        "total": total,
         "page": page,
-        "pages": (len(data) + limit - 1) // limit
+        "pages": (total + limit - 1) // limit,
+        "next_cursor": result["next_cursor"],
     }
 
 @router.get("/assigned-studies/export")
@@ -128,7 +90,7 @@ async def export_assigned_studies(
     """
     Export all assigned studies to Excel.
     """
-    visits = await db.study_visits.find().to_list(None)
+    visits = await export_db.study_visits.find().to_list(None)
     
     if not visits:
         raise HTTPException(status_code=404, detail="No data to export")
@@ -154,6 +116,7 @@ async def export_assigned_studies(
         df.to_excel(writer, index=False, sheet_name='Assigned Studies')
         
     output.seek(0)
+    observe_export_size("assigned_studies", output)
     
     headers = {
         'Content-Disposition': f'attachment; filename="assigned_studies_{datetime.now().strftime("%Y%m%d")}.xlsx"'
@@ -247,9 +210,10 @@ async def export_study_specific(
     """
     try:
         # Get all assignments for this study
-        assignments = await AssignedStudy.find(
-            AssignedStudy.study_code == study_code
-        ).to_list()
+        assignments = [
+            AssignedStudy.model_validate(doc)
+            async for doc in export_db.assigned_studies.find({"study_code": study_code})
+        ]
         
         if not assignments:
             raise HTTPException(status_code=404, detail=f"No volunteers found for study: {study_code}")
@@ -301,6 +265,7 @@ async def export_study_specific(
                 worksheet.set_column(col_num, col_num, 18)  # Set column width
         
         output.seek(0)
+        observe_export_size("study_volunteers", output)
         
         headers = {
             'Content-Disposition': f'attachment; filename="{study_code}_Volunteers_{datetime.now().strftime("%Y%m%d")}.xlsx"'
@@ -9,6 +9,7 @@ import logging
 from bson import ObjectId
 from beanie import PydanticObjectId
 
+from app.core.normalization import study_code_key
 from app.db.odm.study_master import StudyMaster
 from app.db import db
 from app.db.models.user import UserBase
@@ -192,6 +193,7 @@ async def create_study_instance(
             initial_status = "ONGOING"
 
     instance_data["status"] = initial_status
+    instance_data["study_code_key"] = study_code_key(instance_data.get("enteredStudyCode"))
     
     if "_id" in instance_data:
         del instance_data["_id"]
@@ -417,6 +419,8 @@ async def update_study_instance(
         if "_id" in instance_data: del instance_data["_id"]
         instance_data["updatedAt"] = datetime.now(timezone.utc)
         instance_data["updatedBy"] = str(user.get("id") or user.get("_id"))
+        if "enteredStudyCode" in instance_data:
+            instance_data["study_code_key"] = study_code_key(instance_data["enteredStudyCode"])
         
         res = await db.study_instances.update_one(
             {"_id": oid}, 
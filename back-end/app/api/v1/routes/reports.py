@@ -3,18 +3,22 @@ Reports API routes for AI-generated summaries and insights
 Accessible to management, game_master, and prm roles
 """
 
+import asyncio
+import json
 import logging
 from fastapi import APIRouter, HTTPException, status, Depends, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional, Dict
+from typing import AsyncIterator, Optional, Dict
 from datetime import datetime, timedelta
 from enum import Enum
 
 from app.api.v1 import deps
 from app.services.ai_service import get_ai_service
 from app.services.data_aggregator import get_data_aggregator
+from app.services import report_cache
 from app.core.rate_limiter import limiter
-from app.db.mongodb import db
+from app.db.query_policy import export_db
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/reports", tags=["reports"])
@@ -40,6 +44,7 @@ class ReportResponse(BaseModel):
     summary: str
     raw_data: Dict
     date_range: Optional[Dict] = None
+    cached: bool = False
 
 def require_report_access(current_user: dict = Depends(deps.get_current_user)):
     """Ensure user has management, game_master, or prm role"""
@@ -51,6 +56,56 @@ def require_report_access(current_user: dict = Depends(deps.get_current_user)):
         )
     return current_user
 
+def _date_range_dict(body: ReportRequest) -> Optional[Dict]:
+    if not body.date_range:
+        return None
+    return {
+        "start": body.date_range.start,
+        "end": body.date_range.end
+    }
+
+async def _aggregate_report_data(aggregator, body: ReportRequest, date_range_dict: Optional[Dict]) -> Dict:
+    """Raw data the AI summarizes for a report request"""
+    if body.report_type == ReportType.OVERALL:
+        logger.info("Aggregating data for overall summary")
+        raw_data = await aggregator.aggregate_all_data(date_range_dict)
+        logger.info(f"Data aggregated successfully: {len(str(raw_data))} bytes")
+        return raw_data
+
+    if body.report_type == ReportType.VOLUNTEERS:
+        logger.info("Aggregating volunteer data")
+        volunteer_data = await aggregator.get_volunteer_statistics(date_range_dict)
+        return {
+            "volunteers": volunteer_data,
+            "generated_at": datetime.now().isoformat()
+        }
+
+    if body.report_type == ReportType.STUDIES:
+        logger.info("Aggregating study data")
+        study_data, calendar_data = await asyncio.gather(
+            aggregator.get_study_metrics(date_range_dict),
+            aggregator.get_calendar_summary(),
+        )
+        return {
+            "studies": study_data,
+            "calendar": calendar_data,
+            "generated_at": datetime.now().isoformat()
+        }
+
+    if body.report_type == ReportType.CUSTOM:
+        if not body.custom_prompt:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="custom_prompt is required for custom reports"
+            )
+        logger.info(f"Aggregating data for custom query: {body.custom_prompt[:50]}...")
+        return await aggregator.aggregate_all_data(date_range_dict)
+
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Invalid report type: {body.report_type}"
+    )
+
 @router.post("/generate", response_model=ReportResponse)
 @limiter.limit("100/hour")  # Increased for testing - was 10/hour
 async def generate_report(
@@ -77,7 +132,7 @@ async def generate_report(
             )
         
         try:
-            aggregator = get_data_aggregator(db)
+            aggregator = get_data_aggregator(export_db)
             logger.info("Data aggregator initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize data aggregator: {str(e)}")
@@ -87,63 +142,24 @@ async def generate_report(
             )
         
         # Parse date range if provided
-        date_range_dict = None
-        if body.date_range:
-            date_range_dict = {
-                "start": body.date_range.start,
-                "end": body.date_range.end
-            }
+        date_range_dict = _date_range_dict(body)
         
         # Aggregate data based on report type
         try:
-            if body.report_type == ReportType.OVERALL:
-                logger.info("Aggregating data for overall summary")
-                raw_data = await aggregator.aggregate_all_data(date_range_dict)
-                logger.info(f"Data aggregated successfully: {len(str(raw_data))} bytes")
-                
-                logger.info("Calling AI API for overall summary")
-                summary = await ai_service.generate_overall_summary(raw_data)
-                logger.info("AI API call successful")
-            
-            elif body.report_type == ReportType.VOLUNTEERS:
-                logger.info("Aggregating volunteer data")
-                volunteer_data = await aggregator.get_volunteer_statistics(date_range_dict)
-                raw_data = {
-                    "volunteers": volunteer_data,
-                    "generated_at": datetime.now().isoformat()
-                }
-                logger.info("Calling AI API for volunteer insights")
-                summary = await ai_service.generate_volunteer_insights(raw_data)
-            
-            elif body.report_type == ReportType.STUDIES:
-                logger.info("Aggregating study data")
-                study_data = await aggregator.get_study_metrics(date_range_dict)
-                calendar_data = await aggregator.get_calendar_summary()
-                raw_data = {
-                    "studies": study_data,
-                    "calendar": calendar_data,
-                    "generated_at": datetime.now().isoformat()
-                }
-                logger.info("Calling AI API for study performance")
-                summary = await ai_service.generate_study_performance(raw_data)
-            
-            elif body.report_type == ReportType.CUSTOM:
-                if not body.custom_prompt:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="custom_prompt is required for custom reports"
-                    )
-                
-                logger.info(f"Aggregating data for custom query: {body.custom_prompt[:50]}...")
-                raw_data = await aggregator.aggregate_all_data(date_range_dict)
-                logger.info("Calling AI API for custom report")
-                summary = await ai_service.generate_custom_report(body.custom_prompt, raw_data)
-            
+            raw_data = await _aggregate_report_data(aggregator, body, date_range_dict)
+
+            # Same type, range, prompt and underlying numbers -> reuse the summary
+            cache_key = report_cache.report_cache_key(
+                body.report_type.value, date_range_dict, body.custom_prompt, raw_data, ai_service.model
+            )
+            summary = await report_cache.get_cached_summary(cache_key)
+            cached = summary is not None
+            if cached:
+                logger.info(f"Report cache hit: type={body.report_type}")
             else:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Invalid report type: {body.report_type}"
-                )
+                logger.info(f"Calling AI API for {body.report_type.value}")
+                summary = await ai_service.generate_report(body.report_type.value, raw_data, body.custom_prompt)
+                await report_cache.store_summary(cache_key, summary, body.report_type.value)
         
         except HTTPException:
             raise
@@ -162,7 +178,8 @@ async def generate_report(
             generated_at=datetime.now(),
             summary=summary,
             raw_data=raw_data,
-            date_range=date_range_dict
+            date_range=date_range_dict,
+            cached=cached,
         )
     
     except HTTPException:
@@ -174,6 +191,91 @@ async def generate_report(
             detail="Failed to generate report. Please try again."
         )
 
+def _sse(event: str, data) -> str:
+    """One Server-Sent Events frame; data is JSON so newlines in tokens stay inside the frame"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+async def report_event_stream(
+    ai_service,
+    body: ReportRequest,
+    raw_data: Dict,
+    date_range_dict: Optional[Dict],
+    cache_key: str,
+    cached_summary: Optional[str] = None,
+) -> AsyncIterator[str]:
+    """
+    SSE frames for a streamed report:
+      meta  - sent immediately (report type, date range, cache status)
+      token - text chunks as the model produces them
+      done  - generated_at and raw_data once the text is complete
+      error - the model failed part way; nothing is cached
+    Only a fully streamed summary is written to the report cache.
+    """
+    report_type = body.report_type.value
+    yield _sse("meta", {"report_type": report_type, "date_range": date_range_dict, "cached": cached_summary is not None})
+
+    if cached_summary is not None:
+        yield _sse("token", cached_summary)
+    else:
+        parts = []
+        try:
+            async for token in ai_service.stream_report(report_type, raw_data, body.custom_prompt):
+                parts.append(token)
+                yield _sse("token", token)
+        except Exception as e:
+            logger.error(f"Streaming report generation failed: {str(e)}", exc_info=True)
+            yield _sse("error", {"detail": f"Report generation failed: {str(e)}"})
+            return
+        await report_cache.store_summary(cache_key, "".join(parts), report_type)
+
+    yield _sse("done", {"generated_at": datetime.now(), "raw_data": raw_data})
+
+@router.post("/generate/stream")
+@limiter.limit("100/hour")
+async def generate_report_stream(
+    request: Request,
+    body: ReportRequest,
+    current_user: dict = Depends(require_report_access)
+):
+    """
+    Streaming variant of /generate: tokens are forwarded as Server-Sent Events
+    while the model writes, so the first words arrive within a second instead
+    of after the whole completion. Shares rate limit and cache with /generate.
+    """
+    logger.info(f"Starting streamed report for user: {current_user.get('username')}, type: {body.report_type}")
+    try:
+        ai_service = get_ai_service()
+    except Exception as e:
+        logger.error(f"Failed to initialize AI service: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"AI API configuration error: {str(e)}"
+        )
+
+    # Aggregation and cache lookup happen before the stream opens so their
+    # failures still surface as ordinary HTTP errors
+    date_range_dict = _date_range_dict(body)
+    try:
+        raw_data = await _aggregate_report_data(get_data_aggregator(export_db), body, date_range_dict)
+        cache_key = report_cache.report_cache_key(
+            body.report_type.value, date_range_dict, body.custom_prompt, raw_data, ai_service.model
+        )
+        cached_summary = await report_cache.get_cached_summary(cache_key)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error during report data aggregation: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Report generation failed: {str(e)}"
+        )
+
+    return StreamingResponse(
+        report_event_stream(ai_service, body, raw_data, date_range_dict, cache_key, cached_summary),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.get("/metrics")
 async def get_raw_metrics(
     current_user: dict = Depends(require_report_access)
@@ -183,7 +285,7 @@ async def get_raw_metrics(
     Useful for quick dashboard views
     """
     try:
-        aggregator = get_data_aggregator(db)
+        aggregator = get_data_aggregator(export_db)
         data = await aggregator.aggregate_all_data()
         
         logger.info(f"Metrics retrieved by user={current_user.get('username')}")
@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from app.db.client import db
-from app.api.v1.deps import get_current_user
+from app.db.query_policy import search_db
+from app.api.v1.deps import get_current_user, cancel_on_disconnect
 import re
 
 router = APIRouter()
 
-@router.get("/search/master")
+@router.get("/search/master", dependencies=[Depends(cancel_on_disconnect)])
 async def search_master_volunteer(
     id: str = Query(..., description="Volunteer ID or Legacy ID"),
     current_recruiter: dict = Depends(get_current_user)
@@ -26,22 +26,22 @@ async def search_master_volunteer(
                 seen_ids.add(doc["volunteer_id"])
 
     # 1. Try Exact/Partial Volunteer ID
-    await add_matches(db.volunteers_master.find({"volunteer_id": {"$regex": query, "$options": "i"}}).limit(20))
+    await add_matches(search_db.volunteers_master.find({"volunteer_id": {"$regex": query, "$options": "i"}}).limit(20))
     
     # 2. Try Subject Code (Partial)
-    await add_matches(db.volunteers_master.find({"subject_code": {"$regex": query, "$options": "i"}}).limit(20))
+    await add_matches(search_db.volunteers_master.find({"subject_code": {"$regex": query, "$options": "i"}}).limit(20))
 
     # 3. Try Legacy ID (Cleaning spaces logic included in regex if needed, or simple regex)
     # Simplified for list search: exact or partial match on regex
-    await add_matches(db.volunteers_master.find({"legacy_id": {"$regex": query, "$options": "i"}}).limit(20))
+    await add_matches(search_db.volunteers_master.find({"legacy_id": {"$regex": query, "$options": "i"}}).limit(20))
         
     # 4. Try Name Search (Case Insensitive)
-    await add_matches(db.volunteers_master.find({"basic_info.name": {"$regex": query, "$options": "i"}}).limit(20))
+    await add_matches(search_db.volunteers_master.find({"basic_info.name": {"$regex": query, "$options": "i"}}).limit(20))
 
     # 5. Try Contact Search
     # Check both root 'contact' (sometimes used) and 'basic_info.contact' (more common in legacy)
-    await add_matches(db.volunteers_master.find({"contact": {"$regex": query}}).limit(20))
-    await add_matches(db.volunteers_master.find({"basic_info.contact": {"$regex": query}}).limit(20))
+    await add_matches(search_db.volunteers_master.find({"contact": {"$regex": query}}).limit(20))
+    await add_matches(search_db.volunteers_master.find({"basic_info.contact": {"$regex": query}}).limit(20))
 
     if not results:
         # Return empty list instead of 404 for better UI handling
@@ -72,7 +72,7 @@ async def search_master_volunteer(
     return response_list
 
 
-@router.get("/search/field")
+@router.get("/search/field", dependencies=[Depends(cancel_on_disconnect)])
 async def search_field_visit(
     id: str = Query(..., description="Contact Number or Name"),
     current_recruiter: dict = Depends(get_current_user)
@@ -85,11 +85,11 @@ async def search_field_visit(
     field_visit = None
 
     # 1. Search by Contact (Exact or partial)
-    field_visit = await db.field_visits.find_one({"contact": {"$regex": query}})
+    field_visit = await search_db.field_visits.find_one({"contact": {"$regex": query}})
     
     # 2. Search by Name (Case Insensitive) - NOW CHECKS basic_info.name
     if not field_visit:
-        field_visit = await db.field_visits.find_one({"basic_info.name": {"$regex": query, "$options": "i"}})
+        field_visit = await search_db.field_visits.find_one({"basic_info.name": {"$regex": query, "$options": "i"}})
 
     if not field_visit:
         raise HTTPException(status_code=404, detail=f"No active field visit found for '{id}'")
@@ -3,6 +3,7 @@ Study-wise attendance endpoint for Live Tracker/SBoard.
 Returns ongoing studies with assigned volunteers and follow-up tracking.
 """
 
+import logging
 from fastapi import APIRouter, Depends, HTTPException
 from datetime import datetime, timezone, timedelta
 from typing import List, Optional
@@ -11,6 +12,8 @@ from pydantic import BaseModel
 from app.api.v1.deps import get_current_user
 from app.db.mongodb import db
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/prm", tags=["prm"])
 
 
@@ -96,6 +99,6 @@ async def get_study_attendance(current_user: dict = Depends(get_current_user)):
         return {"studies": result}
         
     except Exception as e:
-        print(f"Error fetching study attendance: {e}")
+        logger.error(f"Error fetching study attendance: {e}")
         # Return empty for now
         return {"studies": []}
@@ -1,6 +1,9 @@
 from fastapi import APIRouter, Depends, Query, HTTPException, status
-from app.db.client import db
+from app.db.query_policy import dashboard_db
 from app.api.v1 import deps
+from app.core.domain_errors import InvalidPageCursor
+from app.core.metrics import observe_export_size
+from app.core.normalization import canonical_filter, study_code_filter
 from typing import Optional, Literal, List
 import pandas as pd
 from io import BytesIO
@@ -43,7 +46,7 @@ async def get_dashboard_stats(current_user: dict = Depends(deps.get_current_user
          ]
          identifiers = [i for i in identifiers if i]
          
-         my_vols = await db.prescreening_forms.find(
+         my_vols = await dashboard_db.prescreening_forms.find(
              {"recruiter.name": {"$in": identifiers}}, 
              {"volunteer_id": 1}
          ).to_list(None)
@@ -60,7 +63,7 @@ async def get_dashboard_stats(current_user: dict = Depends(deps.get_current_user
     
     # 2. Recent Data (Personal for Recruiter, Global for Manager)
     recent_volunteers = await dashboard_repo.get_recent_volunteers(personal_filter)
-    recent_field_visits = await db.field_visits.find({}, {"_id": 0, "name": 1, "contact": 1, "field_area": 1, "audit": 1})\
+    recent_field_visits = await dashboard_db.field_visits.find({}, {"_id": 0, "name": 1, "contact": 1, "field_area": 1, "audit": 1})\
         .sort("audit.created_at", -1).limit(5).to_list(5)
     
     for v in recent_field_visits:
@@ -133,6 +136,8 @@ async def get_dashboard_stats(current_user: dict = Depends(deps.get_current_user
 async def get_volunteers(
     skip: int = 0,
     limit: int = 20,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
     stage: Optional[str] = None,
     status: Optional[str] = None,
     gender: Optional[str] = None,
@@ -142,6 +147,8 @@ async def get_volunteers(
     """
     Get paginated list of volunteers with filtering.
     Used by VolunteerList page.
+    Pass `next_cursor` from the previous response as `cursor` for the next page;
+    `total` is approximate (omit with include_total=false).
     """
     filter_query = {}
 
@@ -151,14 +158,10 @@ async def get_volunteers(
     if status:
         filter_query["current_status"] = status
     
-    # Normalize gender filter manually because DB stores variations
-    if gender:
-        if gender.lower() == "male":
-             filter_query["basic_info.gender"] = {"$in": ["VB", "male"]}
-        elif gender.lower() == "female":
-             filter_query["basic_info.gender"] = {"$in": ["FVB", "female"]}
-        elif gender.lower() == "minor":
-             filter_query["basic_info.gender"] = {"$in": ["MVB", "Mfvb", "kids_7_11", "female_minor", "male_minor"]}
+    # Variants (VB, FVB, kids_7_11, ...) are folded into gender_norm at write time;
+    # documents not yet backfilled are matched on basic_info.gender
+    if gender and gender.lower() in ("male", "female", "minor"):
+        filter_query.setdefault("$and", []).append(canonical_filter("gender_norm", [gender.lower()]))
 
     # Text Search (Name or ID)
     if search:
@@ -183,7 +186,7 @@ async def get_volunteers(
          # Remove Nones
          identifiers = [i for i in identifiers if i]
          
-         my_vols = await db.prescreening_forms.find(
+         my_vols = await dashboard_db.prescreening_forms.find(
              {"recruiter.name": {"$in": identifiers}}, 
              {"volunteer_id": 1}
          ).to_list(None)
@@ -201,7 +204,12 @@ async def get_volunteers(
 
     filter_query = filter_query # Placeholder for clarity
     
-    return await dashboard_repo.search_volunteers(filter_query, skip, limit)
+    try:
+        return await dashboard_repo.search_volunteers(
+            filter_query, skip, limit, cursor=cursor, include_total=include_total
+        )
+    except InvalidPageCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.get("/clinical/participation")
 async def get_study_participation(
@@ -238,7 +246,7 @@ async def export_study_data(
     authorized_roles = ["prm", "management", "gamemaster"]
     client_name = None
     if user_role in authorized_roles:
-        study_info = await db.study_instances.find_one({"enteredStudyCode": {"$regex": f"^{study_code}$", "$options": "i"}})
+        study_info = await dashboard_repo.find_study_instance(study_code)
         if study_info:
             client_name = study_info.get("clientName")
         
@@ -296,6 +304,7 @@ async def export_study_data(
                 worksheet.set_column(col_num, col_num, column_len)
                 
         output.seek(0)
+        observe_export_size("study_participation", output)
         
         filename = f"Detailed_Study_Report_{study_code}_{datetime.now().strftime('%Y%m%d')}.xlsx"
         logger.info(f"Excel generated successfully: {filename}")
@@ -317,11 +326,11 @@ async def get_study_analytics(
     """Get detailed analytics for a specific clinical study"""
     logger.info(f"Analytics Request - Study: {study_code}")
     try:
-        # Base filter for assigned_studies collection (Case insensitive)
-        filter_q = {"study_code": {"$regex": f"^{study_code}$", "$options": "i"}}
+        # Base filter for assigned_studies collection (case-insensitive, indexed)
+        filter_q = study_code_filter(study_code, "assigned_studies")
         
         # Total count from assigned_studies
-        total_participants = await db.assigned_studies.count_documents(filter_q)
+        total_participants = await dashboard_db.assigned_studies.count_documents(filter_q)
         
         # Status Distribution from assigned_studies
         status_pipeline = [
@@ -329,7 +338,7 @@ async def get_study_analytics(
             {"$group": {"_id": "$status", "count": {"$sum": 1}}},
             {"$project": {"name": "$_id", "value": "$count", "_id": 0}}
         ]
-        status_data = await db.assigned_studies.aggregate(status_pipeline).to_list(None)
+        status_data = await dashboard_db.assigned_studies.aggregate(status_pipeline).to_list(None)
         
         # Timeline (daily assignments)
         timeline_pipeline = [
@@ -338,7 +347,7 @@ async def get_study_analytics(
             {"$sort": {"_id": 1}},
             {"$project": {"date": "$_id", "count": 1, "_id": 0}}
         ]
-        timeline_data = await db.assigned_studies.aggregate(timeline_pipeline).to_list(None)
+        timeline_data = await dashboard_db.assigned_studies.aggregate(timeline_pipeline).to_list(None)
 
         # Location Distribution
         location_pipeline = [
@@ -348,7 +357,7 @@ async def get_study_analytics(
             {"$limit": 10},
             {"$project": {"name": "$_id", "value": "$count", "_id": 0}}
         ]
-        location_data = await db.assigned_studies.aggregate(location_pipeline).to_list(None)
+        location_data = await dashboard_db.assigned_studies.aggregate(location_pipeline).to_list(None)
 
         # Recruiters Leaderboard (if available in assigned_studies)
         recruiter_pipeline = [
@@ -358,10 +367,10 @@ async def get_study_analytics(
             {"$limit": 5},
             {"$project": {"name": "$_id", "value": "$count", "_id": 0}}
         ]
-        recruiter_data = await db.assigned_studies.aggregate(recruiter_pipeline).to_list(None)
+        recruiter_data = await dashboard_db.assigned_studies.aggregate(recruiter_pipeline).to_list(None)
         
         # Get study info including client name from study instances
-        study_info = await db.study_instances.find_one({"enteredStudyCode": {"$regex": f"^{study_code}$", "$options": "i"}})
+        study_info = await dashboard_repo.find_study_instance(study_code)
         study_name = study_info.get("enteredStudyName") if study_info else study_code
         
         # Include client name only for authorized roles
@@ -420,7 +429,7 @@ async def get_field_visit_stats(
         {"$project": {"label": "$_id", "count": 1, "_id": 0}}
     ]
     
-    stats = await db.field_visits.aggregate(pipeline).to_list(limit)
+    stats = await dashboard_db.field_visits.aggregate(pipeline).to_list(limit)
     
     # For "day" period, ensure we have at least Yesterday and Today
     if period == "day":
@@ -449,12 +458,12 @@ async def get_enrollment_stats(
     """Get enrollment statistics from Master collection with filters"""
     role = current_user.get("role")
     username = current_user.get("name")
-    master = db.volunteers_master
+    master = dashboard_db.volunteers_master
     
     # Base match: Recruiter sees only their own data
     filter_query = {}
     if role == "recruiter":
-         my_vols = await db.prescreening_forms.find(
+         my_vols = await dashboard_db.prescreening_forms.find(
              {"recruiter.name": username}, 
              {"volunteer_id": 1}
          ).to_list(None)
@@ -524,16 +533,16 @@ async def get_funnel_stats(current_user: dict = Depends(deps.get_current_user)):
     """
     
     # 1. Field Visits
-    field_visits_count = await db.field_visits.count_documents({})
+    field_visits_count = await dashboard_db.field_visits.count_documents({})
     
     # 2. Registered (All in master)
-    registered_count = await db.volunteers_master.count_documents({})
+    registered_count = await dashboard_db.volunteers_master.count_documents({})
     
     # 3. Verified (Approved status)
-    verified_count = await db.volunteers_master.count_documents({"current_status": "approved"})
+    verified_count = await dashboard_db.volunteers_master.count_documents({"current_status": "approved"})
     
     # 4. Enrolled (Unique in clinical participation)
-    enrolled_list = await db.clinical_participation.distinct("volunteer_id")
+    enrolled_list = await dashboard_db.clinical_participation.distinct("volunteer_id")
     enrolled_count = len(enrolled_list)
     
     return [
@@ -5,6 +5,7 @@ from pydantic import BaseModel
 import logging
 
 from app.api.v1.deps import get_current_user
+from app.core.normalization import canonical_fields
 from app.db.mongodb import db
 from app.db.odm.volunteer_attendance import VolunteerAttendance
 from app.db.odm.assigned_study import AssignedStudy
@@ -454,6 +455,7 @@ async def update_approval_status(
             update_data["current_status"] = "approved"
         elif update.status == "rejected":
              update_data["current_status"] = "rejected"
+        update_data.update(canonical_fields(update_data))
         
         result = await db.volunteers_master.update_one(
             {"volunteer_id": volunteer_id},
@@ -531,7 +533,7 @@ async def get_study_attendance(current_user: dict = Depends(get_current_user)):
                     # No study_id means not from calendar
                     continue
             except Exception as e:
-                print(f"Error checking study_instances for {study_code}: {e}")
+                logger.warning(f"Error checking study_instances for {study_code}: {e}")
                 continue
             
             # Filter 2: Only show ONGOING studies or follow-up studies active today
@@ -546,7 +548,7 @@ async def get_study_attendance(current_user: dict = Depends(get_current_user)):
                     if now < start_date or now > end_date:
                         continue
                 except Exception as e:
-                    print(f"Error parsing dates for study {study_code}: {e}")
+                    logger.warning(f"Error parsing dates for study {study_code}: {e}")
             
             volunteers_data = []
             
@@ -587,5 +589,5 @@ async def get_study_attendance(current_user: dict = Depends(get_current_user)):
         return {"studies": result}
         
     except Exception as e:
-        print(f"Error fetching study attendance: {e}")
+        logger.error(f"Error fetching study attendance: {e}")
         return {"studies": []}
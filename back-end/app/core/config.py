@@ -3,15 +3,81 @@ Environment configuration and settings validation.
 Loads .env and ensures all required variables are present.
 """
 import os
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
 
+    ENVIRONMENT: str = "development"  # "production" disables debug-only response headers
+
     # Database
     MONGODB_URL: str = "mongodb://localhost:27017"
     DATABASE_NAME: str = "test_enrollment_db"
+    ENABLE_INDEX_SYNC: bool = True  # Create missing indexes at startup
+    INDEX_SYNC_IN_BACKGROUND: bool = True  # Don't block startup on index builds
+
+    # Database connection pool & wire options
+    MONGO_APP_NAME: str = "enrollment-backend"  # Shows up in server logs / currentOp
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_MAX_IDLE_TIME_MS: int = 300000  # Drop idle pooled connections after 5 min
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 10000
+    MONGO_CONNECT_TIMEOUT_MS: int = 10000
+    MONGO_COMPRESSORS: str = "zstd,snappy,zlib"  # Unavailable codecs are skipped
+    MONGO_TLS: bool = True  # Set false for a local mongod without TLS
+
+    # Analytics reads (dashboards, reports, exports)
+    ANALYTICS_MONGODB_URL: str = ""  # Optional dedicated node/cluster; defaults to MONGODB_URL
+    ANALYTICS_READ_PREFERENCE: str = "secondaryPreferred"
+    ANALYTICS_MAX_STALENESS_SECONDS: int = -1  # -1 = no limit, otherwise >= 90
+
+    # Server-side query time limits (maxTimeMS) per operation class
+    QUERY_TIMEOUT_INTERACTIVE_MS: int = 3000  # Search boxes, lookups, list pages
+    QUERY_TIMEOUT_DASHBOARD_MS: int = 15000  # Dashboard / analytics aggregations
+    QUERY_TIMEOUT_EXPORT_MS: int = 60000  # Excel exports and report aggregation
+
+    # Volunteer list: filtered totals are cached this long instead of counted per page
+    VOLUNTEER_TOTAL_CACHE_SECONDS: int = 60
+
+    # Prometheus-style /metrics endpoint
+    METRICS_ENABLED: Optional[bool] = None  # Unset: on, except when ENVIRONMENT=production
+    METRICS_TOKEN: str = ""  # Scrapers send "Authorization: Bearer <token>"; required in production
+
+    # Request query profiler (N+1 detection)
+    QUERY_PROFILER_ENABLED: bool = True
+    QUERY_PROFILER_MAX_QUERIES: int = 25  # Warn above this many queries per request
+    QUERY_PROFILER_MAX_DB_MS: int = 1000  # Warn above this much DB time per request
+    QUERY_PROFILER_REPEAT_THRESHOLD: int = 5  # Same query shape this often = likely N+1
+
+    # Sampling profiler (admin-triggered with X-Profile: 1 or ?__profile=1)
+    SAMPLING_PROFILER_ENABLED: bool = True
+    SAMPLING_PROFILER_INTERVAL_MS: int = 5
+    SAMPLING_PROFILER_MAX_SAMPLES: int = 20000  # Stops sampling past this (~100s at 5ms)
+    SAMPLING_PROFILER_MAX_PROFILES: int = 200  # Capped collection document limit
+    SAMPLING_PROFILER_STORAGE_BYTES: int = 50 * 1024 * 1024  # Capped collection size
+
+    # Audit log buffering (batched insert_many; flushed on shutdown)
+    AUDIT_BUFFER_ENABLED: bool = True
+    AUDIT_BATCH_SIZE: int = 200
+    AUDIT_FLUSH_INTERVAL_MS: int = 500
+    AUDIT_BUFFER_MAX: int = 10000  # Above this new entries go to the log only (and are counted)
+
+    # Audit archival: older entries move to compressed monthly collections
+    AUDIT_ARCHIVE_ENABLED: bool = True
+    AUDIT_HOT_RETENTION_DAYS: int = 180
+    AUDIT_ARCHIVE_INTERVAL_HOURS: int = 24
+
+    # Logging (queued writer thread; LOG_FORMAT json|text)
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    LOG_SAMPLING: str = ""  # e.g. "app.core.middleware=0.1" keeps 10% of INFO/DEBUG records
+
+    # Event-loop lag monitor (lag histogram in /metrics, stack logged on stalls)
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_LAG_INTERVAL_MS: int = 100
+    LOOP_BLOCK_THRESHOLD_MS: int = 250
 
     # Security
     SECRET_KEY: str = None  # Must be set in .env
@@ -24,8 +90,17 @@ class Settings(BaseSettings):
     # OpenAI Configuration (Optional - for AI features)
     OPENAI_API_KEY: str = ""  # Optional - AI features disabled if not set
     OPENAI_MODEL: str = "gpt-3.5-turbo"  # or "gpt-4" for better quality
+    GEMINI_API_KEY: str = ""
+    GEMINI_MODEL: str = "gemini-1.5-flash"
+    AI_PROVIDER: str = "openai"  # openai | gemini | fake (deterministic local stand-in, tests / offline dev)
+    AI_MAX_CONCURRENCY: int = 4  # In-flight AI calls per provider per worker
+    AI_MAX_CONNECTIONS: int = 10  # Pooled keep-alive connections per provider
+    AI_TIMEOUT_SECONDS: float = 60.0
+    AI_MAX_RETRIES: int = 2  # Retries for timeouts, connection errors, 429 and 5xx
+    AI_RETRY_BASE_DELAY: float = 0.5  # Seconds; full-jitter exponential backoff
     ENABLE_REPORT_CACHING: bool = True
     REPORT_CACHE_DURATION: int = 86400  # 24 hours (was 3600) - 80% cost savings
+    REPORT_CACHE_MAX_ENTRIES: int = 256  # In-process LRU size per worker
 
     class Config:
         env_file = ".env"
@@ -33,6 +108,8 @@ class Settings(BaseSettings):
 
     def model_post_init(self, __context):
         super().model_post_init(__context)
+        if self.METRICS_ENABLED is None:
+            self.METRICS_ENABLED = not self.is_production
 
     def validate(self) -> bool:
         """
@@ -48,5 +125,9 @@ class Settings(BaseSettings):
         
         return True
 
+    @property
+    def is_production(self) -> bool:
+        return self.ENVIRONMENT.lower() == "production"
+
 
 settings = Settings()
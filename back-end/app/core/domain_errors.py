@@ -47,3 +47,23 @@ class PermissionDenied(DomainError):
 class ImmutableFieldModified(DomainError):
     """Attempt to modify an immutable field."""
     pass
+
+
+class QueryTimeout(DomainError):
+    """A database query exceeded its server-side time limit."""
+    pass
+
+
+class InvalidPageCursor(DomainError):
+    """A pagination cursor token is malformed or was issued for another query."""
+    pass
+
+
+class DuplicateIdentity(DomainError):
+    """A contact or ID proof number already belongs to another draft or volunteer."""
+
+    def __init__(self, message: str, kind: str = None, owner_type: str = None, owner_id: str = None):
+        super().__init__(message)
+        self.kind = kind
+        self.owner_type = owner_type
+        self.owner_id = owner_id
@@ -1,17 +1,184 @@
 """
 Structured logging and audit helpers.
-Used by audit_service for recording system state changes.
+
+setup_logging() installs a non-blocking pipeline: every logger feeds a
+QueueHandler, and a single QueueListener thread formats records (JSON by
+default) and writes them to stdout. Request handlers never wait on stdout.
+shutdown_logging() drains the queue and falls back to writing directly.
+
+Records carry the current request ID, and per-logger sampling keeps
+high-frequency INFO/DEBUG events from flooding the output (warnings and
+errors are never sampled).
+
+Audit helpers are used by audit_service for recording system state changes.
 """
+import atexit
 import json
 import logging
-from datetime import datetime
-from typing import Any, Optional
+import logging.handlers
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
 from enum import Enum
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+from app.core.request_context import get_request_id
+
 logger = logging.getLogger(__name__)
 
+# Attributes every LogRecord has; anything else was passed via `extra=`
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+_output: Optional[logging.Handler] = None
+
+
+# ============ Pipeline ============
+class RequestContextFilter(logging.Filter):
+    """Stamp records with the request ID. Runs in the logging thread, before queuing."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = get_request_id()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep 1 in N INFO/DEBUG records for configured loggers (and their children).
+    Rates come from LOG_SAMPLING, e.g. "app.core.middleware=0.1" keeps 10%.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self._every = {name: max(1, round(1 / rate)) for name, rate in rates.items() if rate > 0}
+        self._dropped_all = {name for name, rate in rates.items() if rate <= 0}
+        self._seen: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _rule_for(self, name: str) -> Optional[str]:
+        while name:
+            if name in self._every or name in self._dropped_all:
+                return name
+            name = name.rpartition(".")[0]
+        return None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rule = self._rule_for(record.name)
+        if rule is None:
+            return True
+        if rule in self._dropped_all:
+            return False
+        with self._lock:
+            seen = self._seen.get(rule, 0)
+            self._seen[rule] = seen + 1
+        return seen % self._every[rule] == 0
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, message, request_id + extras."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and key != "request_id":
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _PreparedQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps `extra` fields intact for the JSON formatter."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Like the default prepare(): resolve args now (they may be mutated later)
+        # and render tracebacks to text, but leave JSON encoding and the write
+        # to the listener thread.
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def parse_sampling(spec: str) -> Dict[str, float]:
+    """Parse "logger=rate,logger=rate" into a dict."""
+    rates = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, rate = part.partition("=")
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+def setup_logging(level: str = "INFO", fmt: str = "json", sampling: str = "") -> None:
+    """
+    Route all logging through a queue to a background writer thread.
+    Safe to call more than once; the previous listener is stopped first.
+    """
+    global _listener, _queue_handler, _output
+    shutdown_logging()
+
+    output = logging.StreamHandler(sys.stdout)
+    if fmt == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _PreparedQueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter())
+    if sampling:
+        queue_handler.addFilter(SamplingFilter(parse_sampling(sampling)))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper())
+
+    _queue_handler, _output = queue_handler, output
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    # Flush anything still queued if the process exits without a clean lifespan shutdown
+    atexit.unregister(shutdown_logging)
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """
+    Flush queued records and stop the writer thread.
+    The root logger then writes directly to the output handler (same format and
+    filters), so records logged after shutdown are not left in a dead queue.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _queue_handler is not None:
+        root = logging.getLogger()
+        for log_filter in _queue_handler.filters:
+            _output.addFilter(log_filter)
+        root.removeHandler(_queue_handler)
+        root.addHandler(_output)
+        _queue_handler = None
+
 
 class AuditAction(str, Enum):
     """Types of actions that trigger audit logs."""
@@ -33,7 +200,8 @@ def log_audit(
 ) -> dict:
     """
     Create a structured audit log entry.
-    Used by audit_service to persist to database.
+    Used by audit_service to persist to database; entries reach the log only
+    when they cannot be written there (see audit_writer).
     """
     audit_entry = {
         "action": action.value,
@@ -44,22 +212,19 @@ def log_audit(
         "changes": changes or {},
         "metadata": metadata or {},
     }
-    
-    # Log to stdout for visibility
-    logger.info(f"AUDIT: {json.dumps({k: str(v) for k, v in audit_entry.items()}, default=str)}")
-    
     return audit_entry
 
 
 def log_permission_denied(user_id: str, required_permission: str, context: Optional[dict] = None):
     """Log when a user is denied access."""
-    log_audit(
+    audit_entry = log_audit(
         action=AuditAction.PERMISSION_CHECK,
         entity_type="permission",
         entity_id=required_permission,
         user_id=user_id,
         metadata={"denied": True, "context": context or {}},
     )
+    logger.warning(f"Permission {required_permission} denied for {user_id}", extra={"audit": audit_entry})
 
 
 def log_request(request_id: str, user_id: Optional[str], method: str, path: str):
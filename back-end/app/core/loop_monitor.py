@@ -0,0 +1,100 @@
+"""
+Event-loop lag monitor and blocking-call detector.
+
+Two cooperating parts:
+- A probe coroutine wakes every LOOP_LAG_INTERVAL_MS and records how late it
+  woke up (scheduling delay) into the LOOP_LAG histogram.
+- A watchdog thread checks the probe's heartbeat. If the loop has not ticked
+  for LOOP_BLOCK_THRESHOLD_MS it grabs the loop thread's stack *while it is
+  still blocked* and logs it, so the offending call (bcrypt, pandas, openpyxl,
+  synchronous I/O...) is named rather than inferred.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from app.core.config import settings
+from app.core.metrics import LOOP_BLOCKED, LOOP_LAG
+
+logger = logging.getLogger(__name__)
+
+
+class LoopMonitor:
+    """Start with start() from inside the running loop; stop() on shutdown."""
+
+    def __init__(self, interval_ms: int, block_threshold_ms: int):
+        self.interval = interval_ms / 1000
+        self.block_threshold = block_threshold_ms / 1000
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._probe: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self) -> "LoopMonitor":
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._probe = asyncio.get_running_loop().create_task(self._run_probe())
+        self._watchdog = threading.Thread(target=self._run_watchdog, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        return self
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._probe is not None:
+            self._probe.cancel()
+            try:
+                await self._probe
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+
+    async def _run_probe(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self._heartbeat = time.monotonic()
+            LOOP_LAG.observe(lag)
+
+    def _run_watchdog(self):
+        reported_for = None
+        while not self._stopped.wait(self.block_threshold / 2):
+            heartbeat = self._heartbeat
+            blocked_for = time.monotonic() - heartbeat - self.interval
+            if blocked_for < self.block_threshold or reported_for == heartbeat:
+                continue
+            # One report per stall, taken while the loop is still stuck
+            reported_for = heartbeat
+            LOOP_BLOCKED.inc()
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "<unavailable>"
+            del frame
+            logger.warning(
+                f"EVENT LOOP BLOCKED for {blocked_for * 1000:.0f}ms+ (still blocked), stack:\n{stack}"
+            )
+
+
+_monitor: Optional[LoopMonitor] = None
+
+
+def start_loop_monitor() -> Optional[LoopMonitor]:
+    """Start the app-wide monitor if enabled. Called from the lifespan."""
+    global _monitor
+    if not settings.LOOP_MONITOR_ENABLED or _monitor is not None:
+        return _monitor
+    _monitor = LoopMonitor(settings.LOOP_LAG_INTERVAL_MS, settings.LOOP_BLOCK_THRESHOLD_MS).start()
+    return _monitor
+
+
+async def stop_loop_monitor() -> None:
+    global _monitor
+    if _monitor is not None:
+        await _monitor.stop()
+        _monitor = None
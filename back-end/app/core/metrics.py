@@ -0,0 +1,218 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Hot-path updates are lock-free: each thread writes to its own shard
+(threading.local) and shards are only merged when /metrics is scraped.
+That keeps request, Mongo listener (executor threads) and AI timings cheap.
+"""
+import bisect
+import threading
+import time
+from typing import Dict, List, Sequence, Tuple
+
+from pymongo import monitoring
+
+# Latency buckets in seconds (request, DB and AI timings)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Event-loop scheduling delay in seconds; most ticks are sub-millisecond
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Prompt size buckets in estimated tokens
+TOKEN_BUCKETS = (250, 500, 1000, 1500, 2000, 3000, 5000, 10000)
+# Size buckets in bytes (exports)
+SIZE_BUCKETS = (10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000, 10_000_000, 50_000_000)
+
+REGISTRY: List["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        REGISTRY.append(self)
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "data", None)
+        if shard is None:
+            shard = self._local.data = {}
+            self._shards.append(shard)  # list.append is atomic
+        return shard
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, labels: Tuple = (), amount: float = 1) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def collect(self) -> Dict[Tuple, float]:
+        merged: Dict[Tuple, float] = {}
+        for shard in list(self._shards):
+            for labels, value in list(shard.items()):
+                merged[labels] = merged.get(labels, 0) + value
+        return merged
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {v}" for k, v in sorted(self.collect().items())]
+
+
+class Gauge(Counter):
+    """Up/down gauge; shards hold deltas so inc/dec stay lock-free."""
+    kind = "gauge"
+
+    def dec(self, labels: Tuple = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, labels: Tuple = ()) -> None:
+        shard = self._shard()
+        state = shard.get(labels)
+        if state is None:
+            # [per-bucket counts (+Inf last), sum, count]
+            state = shard[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        state[0][bisect.bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def collect(self) -> Dict[Tuple, list]:
+        merged: Dict[Tuple, list] = {}
+        for shard in list(self._shards):
+            for labels, (counts, total, count) in list(shard.items()):
+                acc = merged.setdefault(labels, [[0] * (len(self.buckets) + 1), 0.0, 0])
+                acc[0] = [a + b for a, b in zip(acc[0], counts)]
+                acc[1] += total
+                acc[2] += count
+        return merged
+
+    def render(self) -> List[str]:
+        lines = []
+        for labels, (counts, total, count) in sorted(self.collect().items()):
+            cumulative = 0
+            for bound, n in zip(list(self.buckets) + ["+Inf"], counts):
+                cumulative += n
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+    def time(self, labels: Tuple = ()):
+        """Context manager observing the elapsed wall time of a block."""
+        return _Timer(self, labels)
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: Tuple):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, self.labels)
+        return False
+
+
+def render_latest() -> str:
+    """All registered metrics in Prometheus text format (version 0.0.4)."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ============ Application Metrics ============
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route, method, status and user role",
+    ("method", "route", "status", "role"),
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency",
+    ("method", "route", "status", "role"),
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+MONGO_LATENCY = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency",
+    ("command", "collection", "outcome"),
+)
+EXPORT_SIZE = Histogram(
+    "export_size_bytes", "Size of generated export files",
+    ("export",), buckets=SIZE_BUCKETS,
+)
+AI_LATENCY = Histogram(
+    "ai_request_duration_seconds", "AI provider call latency",
+    ("provider", "outcome"),
+)
+AI_PROMPT_TOKENS = Histogram(
+    "ai_prompt_tokens", "Estimated prompt size per AI report",
+    ("report_type",), buckets=TOKEN_BUCKETS,
+)
+
+LOOP_LAG = Histogram(
+    "event_loop_lag_seconds", "Delay between scheduled and actual event-loop wake-ups",
+    buckets=LAG_BUCKETS,
+)
+LOOP_BLOCKED = Counter("event_loop_blocked_total", "Event-loop stalls longer than the blocking threshold")
+AUDIT_DROPPED = Counter(
+    "audit_entries_dropped_total", "Audit entries the buffered writer gave up on",
+    ("reason",),
+)
+
+
+def observe_export_size(export: str, buffer) -> None:
+    """Record the size of an in-memory export buffer (BytesIO)."""
+    EXPORT_SIZE.observe(buffer.getbuffer().nbytes, (export,))
+
+
+class MongoMetricsListener(monitoring.CommandListener):
+    """Feeds MONGO_LATENCY from pymongo command events."""
+
+    def __init__(self):
+        self._collections: Dict[int, str] = {}
+
+    def started(self, event):
+        # dict assignment/pop are atomic; no lock needed across executor threads
+        key = "collection" if event.command_name == "getMore" else event.command_name
+        value = event.command.get(key)
+        self._collections[event.request_id] = value if isinstance(value, str) else ""
+
+    def succeeded(self, event):
+        collection = self._collections.pop(event.request_id, "")
+        MONGO_LATENCY.observe(event.duration_micros / 1_000_000, (event.command_name, collection, "ok"))
+
+    def failed(self, event):
+        collection = self._collections.pop(event.request_id, "")
+        MONGO_LATENCY.observe(event.duration_micros / 1_000_000, (event.command_name, collection, "error"))
+
+
+mongo_metrics_listener = MongoMetricsListener()
@@ -2,12 +2,25 @@
 Cross-cutting request handling.
 Handles request ID injection, rate limiting, global error catching.
 """
+import asyncio
 import uuid
 import time
+from datetime import datetime, timezone
 from fastapi import Request
 from fastapi.responses import JSONResponse
 import logging
 
+from app.core.config import settings
+from app.core.domain_errors import AuthenticationFailed, PermissionDenied, QueryTimeout
+from app.core.permissions import Permission, check_permission
+from app.core.query_profiler import profile_queries, report_if_slow
+from app.core.metrics import HTTP_IN_FLIGHT, HTTP_LATENCY, HTTP_REQUESTS
+from app.core.request_context import request_id_var, start_request_labels
+from app.core import sampling_profiler
+from app.db.query_policy import kill_request_operations
+from app.repositories import profile_repo
+from app.services import auth_service
+
 logger = logging.getLogger(__name__)
 
 
@@ -48,29 +61,212 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 
+async def query_timeout_handler(request: Request, exc: QueryTimeout):
+    """Convert server-side query timeouts into a 503 the client can retry."""
+    request_id = getattr(request.state, "request_id", "unknown")
+    logger.warning(f"[{request_id}] QUERY TIMEOUT: {str(exc)}")
+
+    return JSONResponse(
+        status_code=503,
+        content={
+            "detail": "The query took too long. Please narrow your search and try again.",
+            "request_id": request_id,
+        }
+    )
+
+
 async def add_request_context(request: Request, call_next):
     """Inject request ID and handle request/response logging."""
     request_id = str(uuid.uuid4())
     request.state.request_id = request_id
+    request_id_var.set(request_id)
     start_time = time.time()
     
     try:
-        response = await call_next(request)
+        with profile_queries() as profile:
+            response = await call_next(request)
+        report_if_slow(profile, f"[{request_id}] {request.method} {request.url.path}")
         
         # Add request ID to response headers
         response.headers["X-Request-ID"] = request_id
+        if not settings.is_production:
+            response.headers["Server-Timing"] = profile.server_timing()
         
         # Log request duration
         duration = time.time() - start_time
         logger.info(f"[{request_id}] {request.method} {request.url.path} completed in {duration:.2f}s")
         
         return response
+    except asyncio.CancelledError:
+        # Client went away: stop any queries this request left running on the server
+        logger.info(f"[{request_id}] {request.method} {request.url.path} cancelled")
+        asyncio.get_running_loop().create_task(kill_request_operations(request_id))
+        raise
     except Exception as e:
         duration = time.time() - start_time
         logger.error(f"[{request_id}] {request.method} {request.url.path} failed in {duration:.2f}s: {str(e)}")
         raise
 
 
+# Set in the ASGI scope by deps.cancel_on_disconnect for routes that opt in
+CANCEL_ON_DISCONNECT = "app.cancel_on_disconnect"
+
+
+class CancelOnDisconnectMiddleware:
+    """
+    Pure ASGI middleware: runs the app in its own task while watching the real
+    receive channel. When the client disconnects mid-request on a route that
+    opted in (CANCEL_ON_DISCONNECT in the scope), the app task is cancelled;
+    add_request_context then kills the server operations tagged with the request ID.
+
+    This has to sit outside the @app.middleware("http") layers: behind
+    BaseHTTPMiddleware, request.is_disconnected() never turns true for the inner
+    request, so a handler cannot notice the disconnect itself.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        messages: asyncio.Queue = asyncio.Queue()
+        disconnected = False
+
+        async def watch():
+            nonlocal disconnected
+            while True:
+                message = await receive()
+                await messages.put(message)
+                if message["type"] == "http.disconnect":
+                    if scope.get(CANCEL_ON_DISCONNECT) and not app_task.done():
+                        disconnected = True
+                        app_task.cancel()
+                    return
+
+        app_task = asyncio.ensure_future(self.app(scope, messages.get, send))
+        watcher = asyncio.ensure_future(watch())
+        try:
+            await asyncio.wait({app_task}, return_when=asyncio.ALL_COMPLETED)
+        finally:
+            watcher.cancel()
+            if not app_task.done():
+                # We were cancelled ourselves (server shutdown): take the app down with us
+                app_task.cancel()
+
+        if disconnected and app_task.cancelled():
+            return  # Nobody is left to send a response to
+        app_task.result()
+
+
+def route_template(scope) -> str:
+    """
+    Full mounted template of the matched route, e.g. /api/v1/volunteers/{volunteer_id}.
+    route.path only holds the path declared on the route's own router: FastAPI
+    keeps included routers nested, so router and /api/v1 prefixes are missing.
+    The prefix is recovered by rendering the route with its path params and
+    taking it off the end of the request path.
+    """
+    route = scope.get("route")
+    route_path = getattr(route, "path", None)
+    if route_path is None:
+        return "unmatched"
+    path_format = getattr(route, "path_format", route_path)
+    try:
+        rendered = path_format.format(**{k: str(v) for k, v in scope.get("path_params", {}).items()})
+    except (KeyError, IndexError, ValueError):
+        return route_path
+    path = scope.get("path", "")
+    root_path = scope.get("root_path", "")
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    if not path.endswith(rendered):
+        return route_path
+    return path[:len(path) - len(rendered)] + route_path
+
+
+async def track_request_metrics(request: Request, call_next):
+    """Record per-route latency, status and role plus the in-flight gauge."""
+    if request.url.path == "/metrics":
+        return await call_next(request)
+
+    labels = start_request_labels()
+    HTTP_IN_FLIGHT.inc()
+    start_time = time.perf_counter()
+    status_code = "500"
+    try:
+        response = await call_next(request)
+        status_code = str(response.status_code)
+        return response
+    finally:
+        HTTP_IN_FLIGHT.dec()
+        # Route template (e.g. /api/v1/volunteers/{volunteer_id}) keeps label cardinality bounded
+        route_path = route_template(request.scope)
+        metric_labels = (request.method, route_path, status_code, labels.get("role", "anonymous"))
+        HTTP_REQUESTS.inc(metric_labels)
+        HTTP_LATENCY.observe(time.perf_counter() - start_time, metric_labels)
+
+
+async def _authorize_profiling(request: Request) -> bool:
+    """Only users with PROFILE_REQUESTS may trigger the sampling profiler."""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        user = await auth_service.get_user_by_token(token)
+        check_permission(user["role"], Permission.PROFILE_REQUESTS)
+        return True
+    except (AuthenticationFailed, PermissionDenied):
+        return False
+
+
+async def profile_request(request: Request, call_next):
+    """Run the sampling profiler around a request when an admin asks for it."""
+    if not settings.SAMPLING_PROFILER_ENABLED or not sampling_profiler.profile_requested(request):
+        return await call_next(request)
+    if not await _authorize_profiling(request):
+        return await call_next(request)
+
+    sampler = sampling_profiler.try_start_sampler()
+    if sampler is None:
+        response = await call_next(request)
+        response.headers["X-Profile"] = "busy"
+        return response
+
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        stacks = sampling_profiler.stop_sampler(sampler)
+        request_id = getattr(request.state, "request_id", None)
+        profile = {
+            "request_id": request_id,
+            "method": request.method,
+            "path": request.url.path,
+            "route": route_template(request.scope),
+            "status_code": status_code,
+            "created_at": datetime.now(timezone.utc),
+            "duration_ms": round(sampler.duration_ms, 1),
+            "interval_ms": settings.SAMPLING_PROFILER_INTERVAL_MS,
+            "sample_count": sampler.sample_count,
+            "concurrent_requests": HTTP_IN_FLIGHT.collect().get((), 0),
+            # Stack strings contain dots, so they are stored as values, not keys
+            "stacks": [{"stack": s, "count": n} for s, n in stacks.items()],
+        }
+        try:
+            profile_id = await profile_repo.insert_profile(profile)
+        except Exception as e:
+            profile_id = None
+            logger.error(f"[{request_id}] could not store request profile: {e}")
+
+    if profile_id:
+        response.headers["X-Profile-ID"] = profile_id
+    return response
+
+
 async def add_security_headers(request: Request, call_next):
     """Add comprehensive security headers to all responses."""
     response = await call_next(request)
@@ -0,0 +1,208 @@
+"""
+Canonical forms for values that are typed in many formats.
+Used to build lookup keys and the canonical *_norm fields; the values shown to
+users are stored as entered.
+"""
+import re
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+_NON_DIGITS = re.compile(r"\D")
+_NON_ALNUM = re.compile(r"[^0-9A-Za-z]")
+
+# Indian mobile numbers: 10 digits, optionally written with +91 / 91 / 0 in front
+_NATIONAL_LENGTH = 10
+_TRUNK_PREFIXES = ("91", "0")
+
+
+def normalize_contact(value) -> Optional[str]:
+    """'+91 98765-43210', '098765 43210' and '9876543210' -> '9876543210'."""
+    if value is None:
+        return None
+    digits = _NON_DIGITS.sub("", str(value))
+    if len(digits) > _NATIONAL_LENGTH:
+        for prefix in _TRUNK_PREFIXES:
+            if digits.startswith(prefix) and len(digits) - len(prefix) == _NATIONAL_LENGTH:
+                digits = digits[len(prefix):]
+                break
+    return digits if len(digits) >= 6 else None
+
+
+def normalize_id_proof(value) -> Optional[str]:
+    """'abcde 1234-f' -> 'ABCDE1234F'. Spaces, dashes and case are not significant."""
+    if value is None:
+        return None
+    cleaned = _NON_ALNUM.sub("", str(value)).upper()
+    return cleaned or None
+
+
+# ============ Canonical volunteer fields ============
+# Stored next to the raw values on every volunteer write (gender_norm,
+# status_norm, dob_date) so dashboards group and count on indexed fields
+# instead of re-deriving buckets with $switch on every query.
+
+GENDER_BUCKETS = ("male", "female", "minor", "unknown")
+
+_GENDER_ALIASES = {
+    "vb": "male",
+    "male": "male",
+    "fvb": "female",
+    "female": "female",
+    "mvb": "minor",
+    "mfvb": "minor",
+    "kids_7_11": "minor",
+    "female_minor": "minor",
+    "male_minor": "minor",
+    "minor": "minor",
+}
+
+_STATUS_ALIASES = {
+    "inacti": "inactive",
+    "not-active": "inactive",
+}
+
+_DOB_FORMATS = ("%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y", "%Y/%m/%d")
+
+
+def normalize_gender(value) -> str:
+    """'FVB' / 'Female' -> 'female', 'kids_7_11' -> 'minor'; anything else 'unknown'."""
+    if value is None:
+        return "unknown"
+    return _GENDER_ALIASES.get(str(value).strip().lower(), "unknown")
+
+
+def normalize_status(value) -> Optional[str]:
+    """'Active New' / 'active_new' -> 'active-new', 'inacti' -> 'inactive'."""
+    if value is None:
+        return None
+    status = re.sub(r"[\s_]+", "-", str(value).strip().lower())
+    if not status:
+        return None
+    return _STATUS_ALIASES.get(status, status)
+
+
+def parse_dob(value) -> Optional[datetime]:
+    """Date of birth as a midnight datetime; None if missing or unparseable."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return datetime(value.year, value.month, value.day)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    text = str(value).strip()[:10]
+    for fmt in _DOB_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+_MISSING = object()
+
+
+def _lookup(doc: Dict[str, Any], path: str):
+    """Value at a dotted path, given either as a $set key or as nested dicts."""
+    if path in doc:
+        return doc[path]
+    value: Any = doc
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def canonical_fields(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Canonical fields for the raw values present in `doc` (an insert document or a
+    $set). Only fields whose source is being written are returned, so the result
+    can be merged into either.
+    """
+    out: Dict[str, Any] = {}
+    gender = _lookup(doc, "basic_info.gender")
+    if gender is not _MISSING:
+        out["gender_norm"] = normalize_gender(gender)
+    status = _lookup(doc, "current_status")
+    if status is not _MISSING:
+        out["status_norm"] = normalize_status(status)
+    dob = _lookup(doc, "basic_info.dob")
+    if dob is not _MISSING:
+        out["dob_date"] = parse_dob(dob)
+    return out
+
+
+# Canonical field -> (raw field it is derived from, normalizer). Both
+# normalizers map an already-canonical value to itself.
+CANONICAL_SOURCES = {
+    "gender_norm": ("basic_info.gender", normalize_gender),
+    "status_norm": ("current_status", normalize_status),
+}
+
+
+def raw_spellings(field: str, values: Iterable[str]) -> List[str]:
+    """Raw values (in their usual casings) that normalize to one of `values`."""
+    values = set(values)
+    aliases = _GENDER_ALIASES if field == "gender_norm" else _STATUS_ALIASES
+    words = {alias for alias, value in aliases.items() if value in values}
+    if field == "status_norm":
+        words |= values | {v.replace("-", sep) for v in values for sep in (" ", "_")}
+    spellings = set()
+    for word in words:
+        spellings.update((word, word.lower(), word.upper(), word.capitalize(), word.title()))
+    return sorted(spellings)
+
+
+def canonical_filter(field: str, values: Iterable[str]) -> Dict[str, Any]:
+    """
+    Match documents whose canonical `field` is one of `values`. Documents
+    written before the canonical fields existed (no `field` yet) are matched
+    on the raw value instead, so filters work before the backfill has run.
+    """
+    values = list(values)
+    raw_field = CANONICAL_SOURCES[field][0]
+    return {"$or": [
+        {field: {"$in": values}},
+        {field: {"$exists": False}, raw_field: {"$in": raw_spellings(field, values)}},
+    ]}
+
+
+def age_on(dob: Optional[datetime], today: datetime) -> Optional[int]:
+    if not dob:
+        return None
+    return today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
+
+
+# ============ Study codes ============
+# assigned_studies, study_instances and clinical_participation store
+# study_code_key next to the code as entered. Lookups match the key exactly,
+# so they use its index instead of a case-insensitive anchored regex.
+# Collection -> field the key is derived from
+STUDY_CODE_SOURCES = {
+    "assigned_studies": "study_code",
+    "study_instances": "enteredStudyCode",
+    "clinical_participation": "study.study_code",
+}
+
+def study_code_key(value) -> Optional[str]:
+    """' ab-101 ' -> 'AB-101'."""
+    if value is None:
+        return None
+    key = str(value).strip().upper()
+    return key or None
+
+
+def study_code_filter(study_code, collection: str) -> Dict[str, Any]:
+    """
+    The one way to query `collection` by study code. Documents written before
+    study_code_key existed (no key yet) are matched on the raw code, case-
+    insensitively, so lookups work before the backfill has run.
+    """
+    key = study_code_key(study_code)
+    if key is None:
+        return {"study_code_key": {"$in": []}}  # a blank code matches nothing
+    raw_field = STUDY_CODE_SOURCES[collection]
+    return {"$or": [
+        {"study_code_key": key},
+        {"study_code_key": {"$exists": False}, raw_field: {"$regex": rf"^\s*{re.escape(key)}\s*$", "$options": "i"}},
+    ]}
@@ -0,0 +1,81 @@
+"""
+Keyset (seek) pagination helpers.
+
+Pages are addressed by the sort key of the last row returned instead of a skip
+offset, so page N costs the same as page 1 and rows inserted meanwhile do not
+shift pages. The last row's key is handed to clients as an opaque token.
+
+    sort = [("timestamp", -1), ("_id", -1)]
+    query = {**filters, **keyset_filter(sort, decode_cursor(token))}
+    rows = await coll.find(query).sort(sort).limit(limit + 1).to_list(limit + 1)
+    items, next_token = split_page(rows, sort, limit)
+
+The sort must end in a unique field (normally _id) so ties are broken.
+"""
+import base64
+import binascii
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from bson import json_util
+from bson.json_util import CANONICAL_JSON_OPTIONS
+
+from app.core.domain_errors import InvalidPageCursor
+
+SortSpec = Sequence[Tuple[str, int]]
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """Opaque, URL-safe token. Canonical extended JSON keeps datetimes/ObjectIds typed."""
+    raw = json_util.dumps(values, json_options=CANONICAL_JSON_OPTIONS)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Inverse of encode_cursor. None/empty means "first page"."""
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json_util.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidPageCursor("Invalid page cursor") from e
+    if not isinstance(values, dict):
+        raise InvalidPageCursor("Invalid page cursor")
+    return values
+
+
+def _get(doc: Dict[str, Any], path: str) -> Any:
+    for part in path.split("."):
+        doc = doc.get(part) if isinstance(doc, dict) else None
+    return doc
+
+
+def keyset_filter(sort: SortSpec, after: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Filter selecting rows strictly after `after` in `sort` order:
+    (a > x) OR (a == x AND b > y) OR ... with > / < chosen per direction.
+    """
+    if not after:
+        return {}
+    missing = [field for field, _ in sort if field not in after]
+    if missing:
+        raise InvalidPageCursor(f"Page cursor does not match this query (missing {', '.join(missing)})")
+
+    branches = []
+    for i, (field, direction) in enumerate(sort):
+        branch = {f: after[f] for f, _ in sort[:i]}
+        branch[field] = {"$lt" if direction < 0 else "$gt": after[field]}
+        branches.append(branch)
+    return branches[0] if len(branches) == 1 else {"$or": branches}
+
+
+def split_page(rows: List[Dict[str, Any]], sort: SortSpec, limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Given up to limit + 1 rows, return the page and the token for the next one
+    (None when this is the last page).
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode_cursor({field: _get(last, field) for field, _ in sort})
@@ -32,6 +32,7 @@ class Permission(str, Enum):
     MANAGE_USERS = "manage_users"
     VIEW_AUDIT_LOGS = "view_audit_logs"
     VIEW_SYSTEM_ANALYTICS = "view_system_analytics"
+    PROFILE_REQUESTS = "profile_requests"
 
 
 # Role → Permissions mapping
@@ -55,6 +56,7 @@ ROLE_PERMISSIONS: dict[Role, List[Permission]] = {
         Permission.MANAGE_USERS,
         Permission.VIEW_AUDIT_LOGS,
         Permission.VIEW_SYSTEM_ANALYTICS,
+        Permission.PROFILE_REQUESTS,
     ],
     Role.GAME_MASTER: [
         # Game Master has all permissions
@@ -68,6 +70,7 @@ ROLE_PERMISSIONS: dict[Role, List[Permission]] = {
         Permission.MANAGE_USERS,
         Permission.VIEW_AUDIT_LOGS,
         Permission.VIEW_SYSTEM_ANALYTICS,
+        Permission.PROFILE_REQUESTS,
     ],
 }
 
@@ -0,0 +1,149 @@
+"""
+Request-level MongoDB query profiler.
+
+A pymongo CommandListener records every command issued while a request (or a
+profile_queries() block) is active: query count, total DB time and how often
+each query *shape* repeats. Repeated shapes are the signature of N+1 loops.
+
+Motor runs pymongo on an executor but copies contextvars into it, so the
+listener can find the profile of the request that issued the command.
+"""
+import json
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from pymongo import monitoring
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Commands that are driver housekeeping rather than application queries
+_IGNORED_COMMANDS = {"endSessions", "killCursors", "hello", "isMaster", "ping", "saslStart", "saslContinue"}
+
+# Where each command keeps the part of the document that defines its shape
+_SHAPE_FIELDS = {
+    "find": "filter",
+    "aggregate": "pipeline",
+    "count": "query",
+    "distinct": "query",
+    "update": "updates",
+    "delete": "deletes",
+    "findAndModify": "query",
+}
+
+
+def query_shape(command_name: str, command: Dict[str, Any]) -> str:
+    """Command + collection + filter structure with all literal values masked."""
+    def mask(value):
+        if isinstance(value, dict):
+            return {k: mask(v) for k, v in sorted(value.items())}
+        if isinstance(value, list):
+            return [mask(value[0])] if value and isinstance(value[0], (dict, list)) else "?"
+        return "?"
+
+    collection = command.get(command_name)
+    field = _SHAPE_FIELDS.get(command_name)
+    body = mask(command.get(field)) if field else None
+    return f"{command_name} {collection} {json.dumps(body, sort_keys=True)}"
+
+
+class RequestProfile:
+    """Mutable per-request accumulator filled by the command listener."""
+
+    def __init__(self):
+        self.query_count = 0
+        self.total_ms = 0.0
+        self.shapes: Counter = Counter()
+        self._pending: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def started(self, request_id: int, shape: str):
+        with self._lock:
+            self._pending[request_id] = shape
+
+    def finished(self, request_id: int, duration_micros: int):
+        with self._lock:
+            shape = self._pending.pop(request_id, None)
+            self.total_ms += duration_micros / 1000
+            if shape is not None:
+                self.query_count += 1
+                self.shapes[shape] += 1
+
+    def repeated_shapes(self, threshold: int) -> List[tuple]:
+        """Shapes issued at least `threshold` times, most frequent first."""
+        return [(s, n) for s, n in self.shapes.most_common() if n >= threshold]
+
+    def server_timing(self) -> str:
+        """Value for the Server-Timing response header."""
+        return f'db;dur={self.total_ms:.1f};desc="{self.query_count} queries"'
+
+
+_profile_var: ContextVar[Optional[RequestProfile]] = ContextVar("query_profile", default=None)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _profile_var.get()
+
+
+@contextmanager
+def profile_queries():
+    """
+    Collect queries issued inside the block.
+    Used by the request middleware and by tests to regress-test N+1 patterns:
+
+        with profile_queries() as profile:
+            await handler(...)
+        assert profile.query_count <= 3
+    """
+    profile = RequestProfile()
+    token = _profile_var.set(profile)
+    try:
+        yield profile
+    finally:
+        _profile_var.reset(token)
+
+
+def report_if_slow(profile: RequestProfile, label: str) -> None:
+    """Log a warning when a request exceeds the configured query thresholds."""
+    repeated = profile.repeated_shapes(settings.QUERY_PROFILER_REPEAT_THRESHOLD)
+    too_many = profile.query_count > settings.QUERY_PROFILER_MAX_QUERIES
+    too_slow = profile.total_ms > settings.QUERY_PROFILER_MAX_DB_MS
+    if not (repeated or too_many or too_slow):
+        return
+
+    details = "; ".join(f"{n}x {shape}" for shape, n in repeated[:3])
+    logger.warning(
+        f"{label} issued {profile.query_count} queries in {profile.total_ms:.1f}ms"
+        + (f" - repeated shapes (possible N+1): {details}" if details else "")
+    )
+
+
+class QueryProfilerListener(monitoring.CommandListener):
+    """Routes command events to the active RequestProfile, if any."""
+
+    def started(self, event):
+        profile = _profile_var.get()
+        if profile is None or event.command_name in _IGNORED_COMMANDS:
+            return
+        if event.command_name == "getMore":
+            # Part of an earlier query: counted for time, not as a new query
+            return
+        profile.started(event.request_id, query_shape(event.command_name, event.command))
+
+    def succeeded(self, event):
+        profile = _profile_var.get()
+        if profile is not None and event.command_name not in _IGNORED_COMMANDS:
+            profile.finished(event.request_id, event.duration_micros)
+
+    def failed(self, event):
+        profile = _profile_var.get()
+        if profile is not None and event.command_name not in _IGNORED_COMMANDS:
+            profile.finished(event.request_id, event.duration_micros)
+
+
+query_profiler_listener = QueryProfilerListener()
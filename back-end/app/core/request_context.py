@@ -0,0 +1,31 @@
+"""
+Per-request context shared with code that has no access to the Request object
+(repositories, DB wrappers, loggers). Populated by middleware.add_request_context.
+"""
+from contextvars import ContextVar
+from typing import Optional
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Mutable holder so values set inside the endpoint (e.g. the authenticated role)
+# are visible to the middleware that created it.
+_request_labels_var: ContextVar[Optional[dict]] = ContextVar("request_labels", default=None)
+
+
+def get_request_id() -> Optional[str]:
+    """Current request ID, or None outside of a request."""
+    return request_id_var.get()
+
+
+def start_request_labels() -> dict:
+    """Create the label holder for a new request."""
+    labels = {}
+    _request_labels_var.set(labels)
+    return labels
+
+
+def set_request_role(role: Optional[str]) -> None:
+    """Record the authenticated user's role for the current request."""
+    labels = _request_labels_var.get()
+    if labels is not None and role:
+        labels["role"] = role
@@ -1,26 +1,95 @@
 """
 MongoDB Motor async client and connection lifecycle.
+
+Two handles are exported:
+- db: primary reads/writes (check-ins, registrations, assignments)
+- analytics_db: heavy read-only work (dashboards, reports, exports), routed to
+  secondaries when available so it doesn't compete with writes on the primary.
 """
 import motor.motor_asyncio
 import certifi
+from pymongo.read_preferences import read_pref_mode_from_name, make_read_preference
 from app.core.config import settings
+from app.core.metrics import mongo_metrics_listener
+from app.core.query_profiler import query_profiler_listener
+
+def _compressor_available(name: str) -> bool:
+    """Ask pymongo whether a wire compressor's codec can be loaded."""
+    try:
+        from pymongo import compression_support
+    except ImportError:
+        return False
+    check = getattr(compression_support, f"_have_{name}", None)
+    return bool(check and check())
+
+
+def available_compressors(requested: str) -> list:
+    """Keep only compressors whose codec is installed (pymongo warns on the rest)."""
+    return [c for c in (c.strip() for c in requested.split(",")) if c and _compressor_available(c)]
+
+
+def build_client_options() -> dict:
+    """Connection pool, timeout, compression and TLS options from Settings."""
+    options = {
+        "appname": settings.MONGO_APP_NAME,
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+        "tls": settings.MONGO_TLS,
+    }
+    if settings.MONGO_TLS:
+        # Use certifi for SSL certificate verification to prevent handshake errors
+        options["tlsAllowInvalidCertificates"] = True
+        options["tlsCAFile"] = certifi.where()
+    listeners = []
+    if settings.QUERY_PROFILER_ENABLED:
+        listeners.append(query_profiler_listener)
+    if settings.METRICS_ENABLED:
+        listeners.append(mongo_metrics_listener)
+    if listeners:
+        options["event_listeners"] = listeners
+    compressors = available_compressors(settings.MONGO_COMPRESSORS)
+    if compressors:
+        options["compressors"] = ",".join(compressors)
+    return options
+
+
+def analytics_read_preference():
+    """Read preference for the analytics handle (secondaryPreferred by default)."""
+    mode = read_pref_mode_from_name(settings.ANALYTICS_READ_PREFERENCE)
+    return make_read_preference(mode, None, max_staleness=settings.ANALYTICS_MAX_STALENESS_SECONDS)
+
 
 # MongoDB client (Motor for async)
-# Use certifi for SSL certificate verification to prevent handshake errors
-client = motor.motor_asyncio.AsyncIOMotorClient(
-    settings.MONGODB_URL,
-    tls=True,
-    tlsAllowInvalidCertificates=True,
-    tlsCAFile=certifi.where()
-)
+client = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGODB_URL, **build_client_options())
 db = client[settings.DATABASE_NAME]
 
+# Analytics client: shares the main pool unless a dedicated URL is configured
+if settings.ANALYTICS_MONGODB_URL:
+    analytics_client = motor.motor_asyncio.AsyncIOMotorClient(
+        settings.ANALYTICS_MONGODB_URL, **build_client_options()
+    )
+else:
+    analytics_client = client
+analytics_db = analytics_client.get_database(
+    settings.DATABASE_NAME, read_preference=analytics_read_preference()
+)
+
 
 async def get_db():
     """Get database instance for dependency injection."""
     return db
 
 
+async def get_analytics_db():
+    """Get the secondary-preferred analytics database handle."""
+    return analytics_db
+
+
 async def close_db():
-    """Close MongoDB connection on app shutdown."""
+    """Close MongoDB connection(s) on app shutdown."""
     client.close()
+    if analytics_client is not client:
+        analytics_client.close()
@@ -0,0 +1,247 @@
+"""
+Index manager.
+Declares the desired index set once and reconciles it with what MongoDB already has.
+
+- One list_indexes() round-trip per collection, collections checked concurrently.
+- Only missing indexes are created; existing ones are never rebuilt on boot.
+- Drift is reported, never auto-fixed: indexes on fields a Beanie model does not
+  store, indexes present in the DB but not declared, and option mismatches.
+
+Run as a CLI:
+    python -m app.db.indexes            # report + create missing
+    python -m app.db.indexes --dry-run  # report only
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, IndexModel
+
+from app.db.odm import DOCUMENT_MODELS
+
+logger = logging.getLogger(__name__)
+
+# Options that make two indexes on the same key behave differently
+_SIGNIFICANT_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+
+# ============ Declared Indexes (raw collections) ============
+# Collections accessed through Motor directly. Beanie model indexes are read
+# from each model's Settings.indexes and merged in by desired_indexes().
+RAW_COLLECTION_INDEXES: Dict[str, List[IndexModel]] = {
+    "volunteers_master": [
+        IndexModel("volunteer_id", unique=True),
+        IndexModel("legacy_id"),
+        IndexModel("current_stage"),
+        IndexModel("current_status"),
+        # Volunteer list sort + keyset cursor (dashboard_repo.VOLUNTEER_SORT)
+        IndexModel([("audit.created_at", -1), ("_id", -1)]),
+        # Canonical fields (app.core.normalization): dashboard counts and groups
+        IndexModel([("gender_norm", 1), ("audit.created_at", 1)]),
+        IndexModel("status_norm"),
+        IndexModel([("basic_info.field_area", 1), ("gender_norm", 1)]),
+    ],
+    "field_visits": [
+        IndexModel("contact", unique=True),
+        IndexModel("field_area"),
+        IndexModel("audit.created_by"),
+    ],
+    "prescreening_forms": [
+        IndexModel("volunteer_id", unique=True),
+        IndexModel("field_area"),
+    ],
+    "registration_forms": [
+        IndexModel("volunteer_id", unique=True),
+    ],
+    "clinical_participation": [
+        IndexModel([("study.study_code", 1), ("volunteer_id", 1)]),
+        IndexModel("volunteer_ref.contact"),
+        IndexModel("study_code_key"),
+    ],
+    "clinical_studies": [
+        IndexModel("study_code", unique=True),
+    ],
+    "users": [
+        IndexModel("username", unique=True),
+    ],
+    # audit_logs indexes are declared on the AuditLog model
+    # person_keys is keyed by the normalized identity (_id); this finds an owner's keys
+    "person_keys": [
+        IndexModel([("owner.type", 1), ("owner.id", 1)]),
+    ],
+    "report_cache": [
+        IndexModel("expires_at", expireAfterSeconds=0),
+    ],
+}
+
+
+# ============ Spec Helpers ============
+def _to_index_model(spec: Any) -> IndexModel:
+    """Convert a Beanie Settings.indexes entry into a pymongo IndexModel."""
+    if isinstance(spec, IndexModel):
+        return spec
+    if isinstance(spec, str):
+        return IndexModel([(spec, ASCENDING)])
+    return IndexModel(list(spec))
+
+
+def _key_of(index_doc: Dict[str, Any]) -> Tuple[Tuple[str, Any], ...]:
+    """Normalized key pattern used to match declared and existing indexes."""
+    key = index_doc["key"]
+    if "_fts" in key or "text" in key.values():
+        # The server stores text indexes as {_fts, _ftsx} plus a weights map
+        weights = index_doc.get("weights") or {f: 1 for f, d in key.items() if d == "text"}
+        return tuple((field, "text") for field in sorted(weights))
+    return tuple((field, direction) for field, direction in key.items())
+
+
+def _options_of(index_doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {opt: index_doc[opt] for opt in _SIGNIFICANT_OPTIONS if opt in index_doc}
+
+
+def _stored_fields(model) -> set:
+    """Top-level field names as persisted by Beanie (aliases win)."""
+    fields = {"_id", "revision_id"}
+    for name, info in model.model_fields.items():
+        fields.add(info.alias or name)
+    return fields
+
+
+def desired_indexes() -> Dict[str, List[IndexModel]]:
+    """Full desired index set: raw collections plus every Beanie model."""
+    desired = {name: list(models) for name, models in RAW_COLLECTION_INDEXES.items()}
+    for model in DOCUMENT_MODELS:
+        settings = getattr(model, "Settings", None)
+        collection = getattr(settings, "name", None)
+        if not collection:
+            continue
+        specs = getattr(settings, "indexes", None) or []
+        desired.setdefault(collection, []).extend(_to_index_model(s) for s in specs)
+    return desired
+
+
+def model_field_drift() -> List[str]:
+    """Report Beanie index declarations on fields the model does not store."""
+    problems = []
+    for model in DOCUMENT_MODELS:
+        settings = getattr(model, "Settings", None)
+        stored = _stored_fields(model)
+        for spec in getattr(settings, "indexes", None) or []:
+            for field, _ in _key_of(_to_index_model(spec).document):
+                root = field.split(".")[0]
+                if root not in stored:
+                    problems.append(
+                        f"{model.__name__}: index on '{field}' but the model stores no such field"
+                    )
+    return problems
+
+
+# ============ Reconciliation ============
+async def reconcile_collection(
+    db,
+    collection: str,
+    wanted: List[IndexModel],
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    """
+    Compare declared indexes with list_indexes() for one collection.
+    Creates missing indexes (unless dry_run) and returns a report.
+    """
+    existing = {}
+    async for index_doc in db[collection].list_indexes():
+        existing[_key_of(index_doc)] = index_doc
+
+    missing = []
+    drift = []
+    declared_keys = set()
+    for model in wanted:
+        doc = model.document
+        key = _key_of(doc)
+        if key in declared_keys:
+            continue
+        declared_keys.add(key)
+
+        current = existing.get(key)
+        if current is None:
+            missing.append(model)
+        elif _options_of(current) != _options_of(doc):
+            drift.append(
+                f"{collection}.{current['name']}: options {_options_of(current)} != declared {_options_of(doc)}"
+            )
+
+    for key, index_doc in existing.items():
+        if key not in declared_keys and index_doc["name"] != "_id_":
+            drift.append(f"{collection}.{index_doc['name']}: exists in DB but is not declared")
+
+    created = []
+    if missing and not dry_run:
+        created = await db[collection].create_indexes(missing)
+
+    return {
+        "collection": collection,
+        "missing": [m.document["name"] for m in missing],
+        "created": created,
+        "drift": drift,
+    }
+
+
+async def reconcile_indexes(db, dry_run: bool = False) -> List[Dict[str, Any]]:
+    """Reconcile every declared collection concurrently and log a summary."""
+    desired = desired_indexes()
+    reports = await asyncio.gather(*[
+        reconcile_collection(db, collection, wanted, dry_run=dry_run)
+        for collection, wanted in desired.items()
+    ])
+
+    for problem in model_field_drift():
+        logger.warning(f"INDEX DRIFT: {problem}")
+    for report in reports:
+        for problem in report["drift"]:
+            logger.warning(f"INDEX DRIFT: {problem}")
+        if report["created"]:
+            logger.info(f"Created indexes on {report['collection']}: {report['created']}")
+        elif report["missing"] and dry_run:
+            logger.info(f"Missing indexes on {report['collection']}: {report['missing']}")
+
+    return list(reports)
+
+
+async def _run_reconcile_in_background(db):
+    """Background variant used at startup; failures are logged, not raised."""
+    try:
+        await reconcile_indexes(db)
+    except Exception as e:
+        logger.error(f"Index reconciliation failed: {e}")
+
+
+def schedule_reconcile(db) -> Optional[asyncio.Task]:
+    """Start reconciliation without blocking app startup."""
+    return asyncio.create_task(_run_reconcile_in_background(db))
+
+
+# ============ CLI ============
+async def _main(dry_run: bool):
+    from app.db.client import db, close_db
+
+    try:
+        reports = await reconcile_indexes(db, dry_run=dry_run)
+    finally:
+        await close_db()
+
+    for problem in model_field_drift():
+        print(f"[DRIFT] {problem}")
+    for report in reports:
+        status = "created" if report["created"] else ("missing" if report["missing"] else "ok")
+        names = report["created"] or report["missing"]
+        print(f"[{status.upper()}] {report['collection']} {names if names else ''}".rstrip())
+        for problem in report["drift"]:
+            print(f"[DRIFT] {problem}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Reconcile MongoDB indexes with the declared set.")
+    parser.add_argument("--dry-run", action="store_true", help="Report missing indexes and drift without creating anything")
+    args = parser.parse_args()
+    asyncio.run(_main(args.dry_run))
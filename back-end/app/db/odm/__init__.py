@@ -0,0 +1,21 @@
+"""
+Beanie document models.
+DOCUMENT_MODELS is the single list registered with init_beanie and the index manager.
+"""
+from app.db.odm.study_master import StudyMaster
+from app.db.odm.study_instance import StudyInstance
+from app.db.odm.study_visit import StudyVisit
+from app.db.odm.assigned_study import AssignedStudy
+from app.db.odm.volunteer_attendance import VolunteerAttendance
+from app.db.odm.audit_log import AuditLog
+from app.db.odm.dashboard_analytics import DashboardAnalytics
+
+DOCUMENT_MODELS = [
+    StudyMaster,
+    StudyInstance,
+    StudyVisit,
+    AssignedStudy,
+    VolunteerAttendance,
+    AuditLog,
+    DashboardAnalytics,
+]
@@ -1,7 +1,10 @@
-from beanie import Document, PydanticObjectId
+from beanie import Document, Insert, PydanticObjectId, Replace, Save, before_event
+from pydantic import Field
+from pymongo import IndexModel
 from datetime import datetime
 from typing import Optional, List, Any
 
+from app.core.normalization import study_code_key
 from app.db.enums import FitnessStatus
 
 class AssignedStudy(Document):
@@ -18,6 +21,7 @@ class AssignedStudy(Document):
     # Study Reference
     study_id: str # The Mongo ID of the StudyInstance
     study_code: str # The human readable code
+    study_code_key: Optional[str] = None  # Upper-cased study_code, used for lookups
     study_name: str
     start_date: Optional[str] = None
     end_date: Optional[str] = None
@@ -40,8 +44,12 @@ class AssignedStudy(Document):
     washout_days: Optional[int] = None  # Number of days volunteer must wait
 
     # Audit
-    created_at: datetime = datetime.now()
-    updated_at: datetime = datetime.now()
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+    @before_event(Insert, Replace, Save)
+    def set_study_code_key(self):
+        self.study_code_key = study_code_key(self.study_code)
 
     class Settings:
         name = "assigned_studies"
@@ -50,6 +58,12 @@ class AssignedStudy(Document):
             "volunteer_id",
             "study_id",
             "study_code",
+            "study_code_key",
             [("study_id", 1), ("fitness_status", 1)],
-            [("volunteer_id", 1), ("assigned_date", -1)]
+            [("volunteer_id", 1), ("assignment_date", -1)],
+            # /assigned-studies listing: sort + keyset, optionally per study
+            [("created_at", -1), ("_id", -1)],
+            [("study_id", 1), ("created_at", -1), ("_id", -1)],
+            # Word search on names (assignment_repo.search_filter)
+            IndexModel([("volunteer_name", "text"), ("study_name", "text")], name="assignment_names_text"),
         ]
@@ -1,28 +1,31 @@
 from beanie import Document
 from pydantic import Field
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Dict, Any
 
 class AuditLog(Document):
     """
     Centralized audit trail for all critical data changes.
+    Mirrors the entries written by audit_service.write_audit_log.
     """
     entity_id: str
-    entity_type: str  # e.g., "volunteer", "study"
-    action: str       # e.g., "create", "update", "delete", "export"
+    entity_type: str  # e.g., "volunteer_master", "user"
+    action: str       # e.g., "create", "update", "state_transition"
     
-    actor_id: str     # User ID who performed the action
-    actor_name: str
+    user_id: str      # User ID who performed the action
     
     changes: Dict[str, Any] = Field(default_factory=dict) # { "field": { "old": val, "new": val } }
+    metadata: Dict[str, Any] = Field(default_factory=dict)
     
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     
     class Settings:
         name = "audit_logs"
+        # Every audit query sorts by (timestamp, _id) descending for keyset pagination;
+        # each filter gets a compound index ending in that sort.
         indexes = [
-            "entity_id",
-            "entity_type",
-            "actor_id",
-            "timestamp"
+            [("timestamp", -1), ("_id", -1)],
+            [("entity_type", 1), ("entity_id", 1), ("timestamp", -1), ("_id", -1)],
+            [("user_id", 1), ("timestamp", -1), ("_id", -1)],
+            [("action", 1), ("timestamp", -1), ("_id", -1)],
         ]
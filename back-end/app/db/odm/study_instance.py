@@ -1,9 +1,10 @@
 
-from beanie import Document, Link, PydanticObjectId
+from beanie import Document, Insert, Link, PydanticObjectId, Replace, Save, before_event
 from pydantic import Field
 from datetime import datetime
 from typing import Optional, Dict, Any, Literal
 from .study_master import StudyMaster
+from app.core.normalization import study_code_key
 from app.db.enums import StudyStatus
 
 class StudyInstance(Document):
@@ -20,6 +21,7 @@ class StudyInstance(Document):
     
     entered_study_code: str = Field(alias="enteredStudyCode")
     study_instance_code: str = Field(alias="studyInstanceCode")
+    study_code_key: Optional[str] = None  # Upper-cased enteredStudyCode, used for lookups
     
     start_date: str = Field(alias="startDate") # YYYY-MM-DD
     volunteers_planned: int = Field(alias="volunteersPlanned")
@@ -40,10 +42,15 @@ class StudyInstance(Document):
     created_by: Optional[str] = Field(default=None, alias="createdBy")
     created_at: datetime = Field(default_factory=datetime.utcnow, alias="createdAt")
 
+    @before_event(Insert, Replace, Save)
+    def set_study_code_key(self):
+        self.study_code_key = study_code_key(self.entered_study_code)
+
     class Settings:
         name = "study_instances"
         indexes = [
+            "study_code_key",
             "status",
-            "start_date",
-            [("status", 1), ("start_date", -1)]
+            "startDate",
+            [("status", 1), ("startDate", -1)]
         ]
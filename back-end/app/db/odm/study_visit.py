@@ -20,8 +20,8 @@ class StudyVisit(Document):
     class Settings:
         name = "study_visits"
         indexes = [
-            "study_instance_id",
+            "studyInstanceId",
             "status",
-            "planned_date",
-            [("study_instance_id", 1), ("status", 1), ("planned_date", 1)]
+            "plannedDate",
+            [("studyInstanceId", 1), ("status", 1), ("plannedDate", 1)]
         ]
@@ -0,0 +1,178 @@
+"""
+Query policy layer.
+Wraps a Motor database handle so every read carries a server-side time limit
+(maxTimeMS) for its operation class, and is tagged with the current request ID
+so it can be killed if the request is cancelled.
+
+    search_db     - interactive search / lookups (primary)
+    dashboard_db  - dashboard and analytics aggregations (analytics handle)
+    export_db     - exports and report aggregation (analytics handle)
+
+Server timeouts surface as QueryTimeout (a DomainError) instead of pymongo errors.
+"""
+import logging
+from contextlib import contextmanager
+from enum import Enum
+
+from pymongo.errors import ExecutionTimeout, PyMongoError
+
+from app.core.config import settings
+from app.core.domain_errors import QueryTimeout
+from app.core.request_context import get_request_id
+from app.db.client import db, analytics_db
+
+logger = logging.getLogger(__name__)
+
+
+class QueryClass(str, Enum):
+    """Operation classes with their own time budget."""
+    INTERACTIVE = "interactive"
+    DASHBOARD = "dashboard"
+    EXPORT = "export"
+
+
+def time_limit_ms(query_class: QueryClass) -> int:
+    """Configured maxTimeMS for an operation class."""
+    return {
+        QueryClass.INTERACTIVE: settings.QUERY_TIMEOUT_INTERACTIVE_MS,
+        QueryClass.DASHBOARD: settings.QUERY_TIMEOUT_DASHBOARD_MS,
+        QueryClass.EXPORT: settings.QUERY_TIMEOUT_EXPORT_MS,
+    }[query_class]
+
+
+@contextmanager
+def _translate_timeouts(query_class: QueryClass, collection: str):
+    try:
+        yield
+    except ExecutionTimeout as e:
+        raise QueryTimeout(
+            f"{query_class.value} query on '{collection}' exceeded {time_limit_ms(query_class)}ms"
+        ) from e
+
+
+class PolicyCursor:
+    """Cursor proxy: chaining returns the proxy, iteration translates timeouts."""
+
+    def __init__(self, cursor, query_class: QueryClass, collection: str):
+        self._cursor = cursor
+        self._query_class = query_class
+        self._collection = collection
+
+    def __getattr__(self, name):
+        attr = getattr(self._cursor, name)
+        if not callable(attr):
+            return attr
+
+        def chained(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            # Motor cursor modifiers (sort, skip, limit, ...) return the cursor itself
+            return self if result is self._cursor else result
+        return chained
+
+    async def to_list(self, length=None):
+        with _translate_timeouts(self._query_class, self._collection):
+            return await self._cursor.to_list(length)
+
+    async def __aiter__(self):
+        with _translate_timeouts(self._query_class, self._collection):
+            async for doc in self._cursor:
+                yield doc
+
+
+class PolicyCollection:
+    """Collection proxy applying maxTimeMS + request comment to read operations."""
+
+    def __init__(self, collection, query_class: QueryClass):
+        self._collection = collection
+        self._query_class = query_class
+
+    def __getattr__(self, name):
+        # Writes and everything else pass straight through
+        return getattr(self._collection, name)
+
+    @property
+    def name(self) -> str:
+        return self._collection.name
+
+    def _tag(self, kwargs: dict, time_key: str) -> dict:
+        kwargs.setdefault(time_key, time_limit_ms(self._query_class))
+        request_id = get_request_id()
+        if request_id:
+            kwargs.setdefault("comment", request_id)
+        return kwargs
+
+    def find(self, *args, **kwargs) -> PolicyCursor:
+        cursor = self._collection.find(*args, **self._tag(kwargs, "max_time_ms"))
+        return PolicyCursor(cursor, self._query_class, self.name)
+
+    def aggregate(self, pipeline, **kwargs) -> PolicyCursor:
+        cursor = self._collection.aggregate(pipeline, **self._tag(kwargs, "maxTimeMS"))
+        return PolicyCursor(cursor, self._query_class, self.name)
+
+    async def find_one(self, *args, **kwargs):
+        with _translate_timeouts(self._query_class, self.name):
+            return await self._collection.find_one(*args, **self._tag(kwargs, "max_time_ms"))
+
+    async def count_documents(self, filter, **kwargs) -> int:
+        with _translate_timeouts(self._query_class, self.name):
+            return await self._collection.count_documents(filter, **self._tag(kwargs, "maxTimeMS"))
+
+    async def estimated_document_count(self, **kwargs) -> int:
+        with _translate_timeouts(self._query_class, self.name):
+            return await self._collection.estimated_document_count(**self._tag(kwargs, "maxTimeMS"))
+
+    async def distinct(self, key, filter=None, **kwargs) -> list:
+        with _translate_timeouts(self._query_class, self.name):
+            return await self._collection.distinct(key, filter, **self._tag(kwargs, "maxTimeMS"))
+
+
+class PolicyDatabase:
+    """Database proxy handing out PolicyCollections for one operation class."""
+
+    def __init__(self, database, query_class: QueryClass):
+        self._database = database
+        self._query_class = query_class
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return PolicyCollection(self._database[name], self._query_class)
+
+    def __getitem__(self, name):
+        return PolicyCollection(self._database[name], self._query_class)
+
+    @property
+    def query_class(self) -> QueryClass:
+        return self._query_class
+
+
+search_db = PolicyDatabase(db, QueryClass.INTERACTIVE)
+dashboard_db = PolicyDatabase(analytics_db, QueryClass.DASHBOARD)
+export_db = PolicyDatabase(analytics_db, QueryClass.EXPORT)
+
+
+async def kill_request_operations(request_id: str) -> int:
+    """
+    Best-effort kill of server operations tagged with a request ID.
+    Called when a request is cancelled so abandoned queries stop consuming the server.
+    """
+    if not request_id:
+        return 0
+    killed = 0
+    try:
+        admin = db.client.admin
+        ops = await admin.aggregate([
+            {"$currentOp": {}},
+            {"$match": {"$or": [
+                {"command.comment": request_id},
+                {"cursor.originatingCommand.comment": request_id},
+            ]}},
+            {"$project": {"opid": 1}},
+        ]).to_list(None)
+        for op in ops:
+            await admin.command("killOp", op=op["opid"])
+            killed += 1
+    except PyMongoError as e:
+        # Usually missing privileges for $currentOp/killOp; maxTimeMS still applies
+        logger.debug(f"[{request_id}] could not kill operations: {e}")
+    return killed
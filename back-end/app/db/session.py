@@ -2,8 +2,17 @@
 MongoDB transaction and session helpers.
 Used for multi-step workflows that need transactional consistency.
 """
+import logging
+
+from pymongo.errors import OperationFailure
+
 from app.db.client import client
 
+logger = logging.getLogger(__name__)
+
+# Server error code for "Transaction numbers are only allowed on a replica set member or mongos"
+_TRANSACTIONS_UNSUPPORTED = 20
+
 
 async def start_session():
     """Start a MongoDB session for transactions."""
@@ -14,3 +23,19 @@ async def with_transaction(session, callback):
     """Execute a callback within a MongoDB transaction."""
     async with session.start_transaction():
         return await callback(session)
+
+
+async def run_in_transaction(callback):
+    """
+    Run `callback(session)` in a transaction, retrying transient transaction
+    errors. Standalone servers (local development) cannot run transactions;
+    there the callback runs once without a session.
+    """
+    async with await client.start_session() as session:
+        try:
+            return await session.with_transaction(callback)
+        except OperationFailure as e:
+            if e.code != _TRANSACTIONS_UNSUPPORTED:
+                raise
+    logger.warning("MongoDB does not support transactions here (standalone server); writing without one")
+    return await callback(None)
@@ -5,30 +5,49 @@ Application entry point.
 - Registers API routers
 - Runs startup validation (env, DB, indexes)
 """
+import logging
 import uuid
 import time
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import Depends, FastAPI, Request, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
+from app.core.domain_errors import QueryTimeout
 from app.core.middleware import (
     global_exception_handler,
+    query_timeout_handler,
+    CancelOnDisconnectMiddleware,
     add_request_context,
-    add_security_headers
+    add_security_headers,
+    profile_request,
+    track_request_metrics,
 )
+from app.core.logging import setup_logging, shutdown_logging
+from app.core.loop_monitor import start_loop_monitor, stop_loop_monitor
+from app.core.metrics import render_latest
 from app.db import init_db
 from app.db.client import close_db
+from app.db.query_policy import export_db
+from app.services.ai_providers import start_ai_providers, stop_ai_providers
+from app.services.audit_archive import start_audit_archiver, stop_audit_archiver
+from app.services.audit_writer import start_audit_writer, stop_audit_writer
+from app.services.data_aggregator import warm_collection_cache
 from app.api.v1.routes import (
     auth, field, enrollment, clinical, admin, vboard, 
     search, registration, prescreening, users, attendance, volunteers, reports
 )
 from app.api.v1.routes import attendance_export
+from app.api.v1 import deps
 # Import PRM module (refactored into sub-modules)
 from app.api.v1.routes.prm import router as prm_router
 
 
+setup_logging(settings.LOG_LEVEL, settings.LOG_FORMAT, settings.LOG_SAMPLING)
+logger = logging.getLogger(__name__)
+
+
 # ============ Lifespan Management ============
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -36,23 +55,26 @@ async def lifespan(app: FastAPI):
     try:
         settings.validate()
         await init_db()
-        print("[OK] Database initialized and indexes created")
-        
-        # Debug: Print all routes
-        print("\n--- Registered Routes ---")
-        for route in app.routes:
-            if hasattr(route, "path"):
-                print(f"Route: {route.path} [{','.join(route.methods)}]")
-        print("-------------------------\n")
+        logger.info("Database initialized")
+        await warm_collection_cache(export_db)
+        start_loop_monitor()
+        start_audit_writer()
+        start_audit_archiver()
+        start_ai_providers()
     except Exception as e:
-        print(f"[ERROR] Startup failed: {e}")
+        logger.error(f"Startup failed: {e}")
         raise
     
     yield
     
     # Shutdown: Clean up resources
+    await stop_ai_providers()
+    await stop_audit_archiver()
+    await stop_audit_writer()
+    await stop_loop_monitor()
     await close_db()
-    print("[OK] Database connection closed")
+    logger.info("Database connection closed")
+    shutdown_logging()
 
 
 # ============ App Creation ============
@@ -85,8 +107,12 @@ app.state.limiter = limiter
 app.add_middleware(SlowAPIMiddleware)
 
 # Custom Middleware
+app.middleware("http")(track_request_metrics)
+app.middleware("http")(profile_request)
 app.middleware("http")(add_request_context)
 app.middleware("http")(add_security_headers)
+# Outermost, so it sees the client's real receive channel (see its docstring)
+app.add_middleware(CancelOnDisconnectMiddleware)
 
 
 # ============ Global Exception Handler ============
@@ -95,6 +121,11 @@ async def handle_exception(request: Request, exc: Exception):
     return await global_exception_handler(request, exc)
 
 
+@app.exception_handler(QueryTimeout)
+async def handle_query_timeout(request: Request, exc: QueryTimeout):
+    return await query_timeout_handler(request, exc)
+
+
 # ============ API Router Registration ============
 # API v1 routes - no business logic, just routing
 app.include_router(auth.router, prefix="/api/v1")
@@ -121,6 +152,14 @@ async def health_check():
     return {"status": "healthy", "service": "enrollment-backend"}
 
 
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(deps.require_metrics_token)])
+async def metrics():
+    """Prometheus text-format metrics (request latency, Mongo, exports, AI). Bearer METRICS_TOKEN."""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(render_latest(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
 async def root():
     """API root endpoint."""
@@ -0,0 +1,112 @@
+"""
+Repository for the assigned_studies listing used to drive attendance marking.
+
+Only assignments whose study_id points at a PRM calendar study (study_instances)
+are listed. The join, the total and the page are produced by one aggregation so
+pages are never short and the total is exact.
+"""
+from typing import Any, Dict, List, Optional
+
+from app.core.pagination import decode_cursor, keyset_filter, split_page
+from app.db.query_policy import search_db
+
+# Newest first; _id breaks ties between assignments created together
+ASSIGNMENT_SORT = [("created_at", -1), ("_id", -1)]
+
+
+def search_filter(term: str) -> Dict[str, Any]:
+    """
+    Index-backed search: exact IDs/codes (as typed or upper-cased) on their
+    single-field indexes, words in volunteer/study names via the text index.
+    """
+    term = term.strip()
+    variants = sorted({term, term.upper()})
+    return {"$or": [
+        {"volunteer_id": {"$in": variants}},
+        {"visit_id": {"$in": variants}},
+        {"study_code": {"$in": variants}},
+        {"$text": {"$search": term}},
+    ]}
+
+
+def _calendar_join() -> List[Dict[str, Any]]:
+    """Attach the PRM calendar instance (codes only) and drop assignments without one."""
+    return [
+        {"$addFields": {"_study_oid": {
+            "$convert": {"input": "$study_id", "to": "objectId", "onError": None, "onNull": None}
+        }}},
+        {"$lookup": {
+            "from": "study_instances",
+            "localField": "_study_oid",
+            "foreignField": "_id",
+            "pipeline": [{"$project": {"_id": 0, "enteredStudyCode": 1, "studyInstanceCode": 1}}],
+            "as": "_instance",
+        }},
+        {"$match": {"_instance": {"$ne": []}}},
+    ]
+
+
+def assigned_studies_pipeline(
+    query: Dict[str, Any],
+    after: Optional[Dict[str, Any]],
+    skip: int,
+    limit: int,
+) -> List[Dict[str, Any]]:
+    """
+    filter -> sort -> calendar join -> $facet {total, page}.
+    The page branch seeks past `after` (keyset) or skips `skip` rows and
+    returns limit + 1 rows so the caller can tell whether another page exists.
+    """
+    page: List[Dict[str, Any]] = []
+    seek = keyset_filter(ASSIGNMENT_SORT, after)
+    if seek:
+        page.append({"$match": seek})
+    elif skip:
+        page.append({"$skip": skip})
+    page.append({"$limit": limit + 1})
+    page.append({"$project": {"_study_oid": 0}})
+
+    return [
+        {"$match": query},
+        {"$sort": dict(ASSIGNMENT_SORT)},
+        *_calendar_join(),
+        {"$facet": {
+            "total": [{"$count": "n"}],
+            "page": page,
+        }},
+    ]
+
+
+async def find_calendar_assignments(
+    search: Optional[str] = None,
+    study_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 50,
+) -> Dict[str, Any]:
+    """
+    One page of PRM calendar assignments plus the exact total.
+    Rows carry `prm_study_code` (enteredStudyCode, else studyInstanceCode).
+    Raises InvalidPageCursor for a malformed cursor.
+    """
+    query: Dict[str, Any] = {}
+    if study_id:
+        query["study_id"] = study_id
+    if search and search.strip():
+        query.update(search_filter(search))
+
+    pipeline = assigned_studies_pipeline(query, decode_cursor(cursor), skip, limit)
+    result = await search_db.assigned_studies.aggregate(pipeline).to_list(1)
+    facet = result[0] if result else {}
+
+    total_rows = facet.get("total") or []
+    rows, next_cursor = split_page(facet.get("page") or [], ASSIGNMENT_SORT, limit)
+    for row in rows:
+        instance = (row.pop("_instance", None) or [{}])[0]
+        row["prm_study_code"] = instance.get("enteredStudyCode") or instance.get("studyInstanceCode")
+
+    return {
+        "items": rows,
+        "total": total_rows[0]["n"] if total_rows else 0,
+        "next_cursor": next_cursor,
+    }
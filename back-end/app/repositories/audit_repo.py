@@ -1,9 +1,25 @@
 """
-Repository for audit_logs collection.
+Repository for audit_logs collection and its monthly archive tier.
 Writes immutable audit records for all data mutations and important events.
+
+Hot entries live in audit_logs. Older entries are moved to one compressed
+collection per month (audit_logs_archive_YYYY_MM); audit_archive_ranges records
+which months exist and the time span each one covers.
 """
-from typing import List, Dict, Any
+from datetime import datetime
+from typing import AsyncIterator, List, Dict, Any, Optional
+
+from pymongo.errors import CollectionInvalid
+
 from app.db.client import db
+from app.db.query_policy import export_db, search_db
+
+HOT_COLLECTION = "audit_logs"
+ARCHIVE_PREFIX = "audit_logs_archive_"
+RANGES_COLLECTION = "audit_archive_ranges"
+
+# Matches the compound indexes on AuditLog; _id breaks timestamp ties
+AUDIT_SORT = [("timestamp", -1), ("_id", -1)]
 
 
 async def insert_audit_log(audit_entry: Dict[str, Any]) -> str:
@@ -15,9 +31,20 @@ async def insert_audit_log(audit_entry: Dict[str, Any]) -> str:
     return str(result.inserted_id)
 
 
+async def insert_audit_logs(audit_entries: List[Dict[str, Any]]) -> int:
+    """
+    Insert a batch of audit log entries in one round-trip.
+    Returns the number inserted.
+    """
+    if not audit_entries:
+        return 0
+    result = await db.audit_logs.insert_many(audit_entries, ordered=False)
+    return len(result.inserted_ids)
+
+
 async def find_by_entity(entity_type: str, entity_id: str, limit: int = 100) -> List[Dict[str, Any]]:
     """Find all audit logs for a specific entity."""
-    cursor = db.audit_logs.find({
+    cursor = search_db.audit_logs.find({
         "entity_type": entity_type,
         "entity_id": entity_id
     }).sort("timestamp", -1).limit(limit)
@@ -26,17 +53,135 @@ async def find_by_entity(entity_type: str, entity_id: str, limit: int = 100) ->
 
 async def find_by_user(user_id: str, limit: int = 100) -> List[Dict[str, Any]]:
     """Find all audit logs created by a specific user."""
-    cursor = db.audit_logs.find({"user_id": user_id}).sort("timestamp", -1).limit(limit)
+    cursor = search_db.audit_logs.find({"user_id": user_id}).sort("timestamp", -1).limit(limit)
     return await cursor.to_list(length=limit)
 
 
 async def find_by_action(action: str, limit: int = 100) -> List[Dict[str, Any]]:
     """Find all audit logs for a specific action type."""
-    cursor = db.audit_logs.find({"action": action}).sort("timestamp", -1).limit(limit)
+    cursor = search_db.audit_logs.find({"action": action}).sort("timestamp", -1).limit(limit)
     return await cursor.to_list(length=limit)
 
 
+async def find_page(query: Dict[str, Any], limit: int, collection: str = HOT_COLLECTION) -> List[Dict[str, Any]]:
+    """
+    Up to `limit` entries in AUDIT_SORT order from one tier.
+    Callers ask for one row more than they show to detect a further page.
+    """
+    cursor = search_db[collection].find(query).sort(AUDIT_SORT).limit(limit)
+    return await cursor.to_list(length=limit)
+
+
+async def iter_matching(
+    query: Dict[str, Any],
+    collection: str = HOT_COLLECTION,
+    batch_size: int = 1000,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Stream every matching entry of one tier in AUDIT_SORT order (export time limit)."""
+    cursor = export_db[collection].find(query).sort(AUDIT_SORT).batch_size(batch_size)
+    async for doc in cursor:
+        yield doc
+
+
+# ============ Archive Tier ============
+def archive_collection_name(month_start: datetime) -> str:
+    return f"{ARCHIVE_PREFIX}{month_start.year:04d}_{month_start.month:02d}"
+
+
+async def find_archive_ranges(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    """Archive months overlapping [since, until), newest first."""
+    query: Dict[str, Any] = {}
+    if since:
+        query["end"] = {"$gte": since}
+    if until:
+        query["start"] = {"$lt": until}
+    cursor = search_db[RANGES_COLLECTION].find(query).sort("start", -1)
+    return await cursor.to_list(length=None)
+
+
+async def months_before(cutoff: datetime) -> List[datetime]:
+    """First day of every month that still has hot entries older than cutoff."""
+    cursor = db[HOT_COLLECTION].aggregate([
+        {"$match": {"timestamp": {"$lt": cutoff}}},
+        {"$group": {"_id": {"$dateTrunc": {"date": "$timestamp", "unit": "month"}}}},
+        {"$sort": {"_id": 1}},
+    ])
+    return [doc["_id"] async for doc in cursor]
+
+
+async def ensure_archive_collection(name: str, index_models: list) -> None:
+    """
+    Create a zstd-compressed archive collection with the hot tier's indexes.
+    Indexes are (re)created even if the collection exists: a run that crashed
+    after creating it may not have built them, and create_indexes is idempotent.
+    """
+    try:
+        await db.create_collection(
+            name,
+            storageEngine={"wiredTiger": {"configString": "block_compressor=zstd"}},
+        )
+    except CollectionInvalid:
+        pass  # Already exists
+    if index_models:
+        await db[name].create_indexes(index_models)
+
+
+async def move_to_archive(name: str, start: datetime, end: datetime, batch_size: int = 1000) -> int:
+    """
+    Move hot entries with start <= timestamp < end into archive collection `name`.
+    Copy, record the archive range, then delete from the hot tier only the _ids
+    the archive is confirmed to hold. $merge keeps existing rows, so a re-run
+    after a crash is safe; until then an entry can sit in both tiers, which
+    audit_service skips when it reads them.
+    Returns the number of hot entries removed.
+    """
+    window = {"timestamp": {"$gte": start, "$lt": end}}
+    await db[HOT_COLLECTION].aggregate([
+        {"$match": window},
+        {"$merge": {"into": name, "on": "_id", "whenMatched": "keepExisting", "whenNotMatched": "insert"}},
+    ]).to_list(length=None)
+
+    span = await db[name].aggregate([
+        {"$group": {"_id": None, "start": {"$min": "$timestamp"}, "end": {"$max": "$timestamp"}, "count": {"$sum": 1}}},
+    ]).to_list(length=1)
+    if span:
+        await db[RANGES_COLLECTION].update_one(
+            {"_id": name},
+            {"$set": {
+                "collection": name,
+                "start": span[0]["start"],
+                "end": span[0]["end"],
+                "count": span[0]["count"],
+                "archived_at": datetime.utcnow(),
+            }},
+            upsert=True,
+        )
+
+    removed = 0
+    batch: List[Any] = []
+    async for doc in db[HOT_COLLECTION].find(window, {"_id": 1}).batch_size(batch_size):
+        batch.append(doc["_id"])
+        if len(batch) >= batch_size:
+            removed += await _delete_archived(name, batch)
+            batch = []
+    if batch:
+        removed += await _delete_archived(name, batch)
+    return removed
+
+
+async def _delete_archived(name: str, ids: List[Any]) -> int:
+    """Delete the hot copies of those `ids` that archive collection `name` holds."""
+    archived = [doc["_id"] async for doc in db[name].find({"_id": {"$in": ids}}, {"_id": 1})]
+    if not archived:
+        return 0
+    result = await db[HOT_COLLECTION].delete_many({"_id": {"$in": archived}})
+    return result.deleted_count
+
+
 async def find_recent(limit: int = 100) -> List[Dict[str, Any]]:
     """Find the most recent audit logs."""
-    cursor = db.audit_logs.find({}).sort("timestamp", -1).limit(limit)
+    cursor = search_db.audit_logs.find({}).sort("timestamp", -1).limit(limit)
     return await cursor.to_list(length=limit)
@@ -4,17 +4,19 @@ Access layer for volunteer study assignments and clinical progress.
 """
 from typing import Optional, List, Dict, Any
 from bson import ObjectId
+from app.core.normalization import study_code_filter, study_code_key
 from app.db.client import db
+from app.db.query_policy import search_db
 
 
 async def find_by_volunteer_id(volunteer_id: str) -> Optional[Dict[str, Any]]:
     """Find clinical participation record for a volunteer."""
-    return await db.clinical_participation.find_one({"volunteer_id": volunteer_id})
+    return await search_db.clinical_participation.find_one({"volunteer_id": volunteer_id})
 
 
 async def find_by_volunteer_and_study(volunteer_id: str, study_code: str) -> Optional[Dict[str, Any]]:
     """Find a specific volunteer-study assignment."""
-    return await db.clinical_participation.find_one({
+    return await search_db.clinical_participation.find_one({
         "volunteer_id": volunteer_id,
         "study.study_code": study_code
     })
@@ -22,11 +24,12 @@ async def find_by_volunteer_and_study(volunteer_id: str, study_code: str) -> Opt
 
 async def find_by_id(participation_db_id: str) -> Optional[Dict[str, Any]]:
     """Find clinical participation by MongoDB _id."""
-    return await db.clinical_participation.find_one({"_id": ObjectId(participation_db_id)})
+    return await search_db.clinical_participation.find_one({"_id": ObjectId(participation_db_id)})
 
 
 async def create(participation_data: Dict[str, Any]) -> str:
     """Create a new clinical participation record. Returns the inserted ID."""
+    participation_data["study_code_key"] = study_code_key((participation_data.get("study") or {}).get("study_code"))
     result = await db.clinical_participation.insert_one(participation_data)
     return str(result.inserted_id)
 
@@ -45,13 +48,13 @@ async def update(volunteer_id: str, study_code: str, updates: Dict[str, Any]) ->
 
 async def find_by_study_code(study_code: str, limit: int = 50) -> List[Dict[str, Any]]:
     """Find all volunteers assigned to a specific study."""
-    cursor = db.clinical_participation.find({"study.study_code": study_code}).limit(limit)
+    cursor = search_db.clinical_participation.find(study_code_filter(study_code, "clinical_participation")).limit(limit)
     return await cursor.to_list(length=limit)
 
 
 async def find_by_status(status: str, limit: int = 50) -> List[Dict[str, Any]]:
     """Find all clinical participations with a specific status."""
-    cursor = db.clinical_participation.find({"status": status}).limit(limit)
+    cursor = search_db.clinical_participation.find({"status": status}).limit(limit)
     return await cursor.to_list(length=limit)
 
 
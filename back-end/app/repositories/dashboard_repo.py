@@ -1,19 +1,26 @@
-from app.db.mongodb import db
+from app.core.config import settings
+from app.core.normalization import CANONICAL_SOURCES, age_on, canonical_filter, normalize_gender, parse_dob, study_code_filter
+from app.core.pagination import decode_cursor, keyset_filter, split_page
+from app.db.query_policy import dashboard_db
+from bson import json_util
 from datetime import datetime
+from typing import Dict, Optional, Tuple
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
 async def get_total_counts(filter_query: dict) -> dict:
-    master = db.volunteers_master
+    master = dashboard_db.volunteers_master
     
     total_volunteers = await master.count_documents(filter_query)
     pre_screening_count = await master.count_documents({**filter_query, "current_stage": {"$in": ["pre_screening", "New Volunteer", "new_volunteer"]}})
     registered_count = await master.count_documents({**filter_query, "current_stage": "registered"})
-    approved_count = await master.count_documents({**filter_query, "current_status": {"$in": ["approved", "active"]}})
-    rejected_count = await master.count_documents({**filter_query, "current_status": {"$in": ["rejected", "inactive", "inacti"]}})
+    # canonical_filter also matches documents the canonical-fields backfill has not reached
+    approved_count = await master.count_documents({"$and": [filter_query, canonical_filter("status_norm", ["approved", "active"])]})
+    rejected_count = await master.count_documents({"$and": [filter_query, canonical_filter("status_norm", ["rejected", "inactive"])]})
     legacy_count = await master.count_documents({**filter_query, "legacy_id": {"$ne": None}})
-    field_visit_count = await db.field_visits.count_documents({})
+    field_visit_count = await dashboard_db.field_visits.count_documents({})
 
     return {
         "total_volunteers": total_volunteers,
@@ -45,53 +52,58 @@ async def get_recent_volunteers(filter_query: dict, limit: int = 5) -> list:
             "pre_screening.name": {"$ifNull": ["$prescreen_data.name", "$basic_info.name", "Unknown"]},
         }}
     ]
-    return await db.volunteers_master.aggregate(pipeline).to_list(limit)
+    return await dashboard_db.volunteers_master.aggregate(pipeline).to_list(limit)
 
-async def get_gender_stats(filter_query: dict) -> list:
+async def _count_by(field: str, filter_query: dict, default: str) -> Dict[str, int]:
+    """
+    {value: count} over one canonical field. Sorting on the field first lets the
+    planner walk its index and never fetch documents (covered group).
+    """
     pipeline = [
         {"$match": filter_query},
-        {
-            "$project": {
-                "normalized_gender": {
-                    "$switch": {
-                        "branches": [
-                            {"case": {"$in": ["$basic_info.gender", ["VB", "male"]]}, "then": "male"},
-                            {"case": {"$in": ["$basic_info.gender", ["FVB", "female"]]}, "then": "female"},
-                            {"case": {"$in": ["$basic_info.gender", ["MVB", "Mfvb", "kids_7_11", "female_minor", "male_minor"]]}, "then": "minor"}
-                        ],
-                        "default": "unknown"
-                    }
-                }
-            }
-        },
-        {"$group": {"_id": "$normalized_gender", "count": {"$sum": 1}}},
-        {"$project": {"name": "$_id", "value": "$count", "_id": 0}}
+        {"$sort": {field: 1}},
+        {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
     ]
-    return await db.volunteers_master.aggregate(pipeline).to_list(None)
+    counts: Dict[str, int] = {}
+    unset = 0
+    for row in await dashboard_db.volunteers_master.aggregate(pipeline).to_list(None):
+        if row["_id"] is None:
+            unset += row["count"]
+        else:
+            counts[row["_id"]] = counts.get(row["_id"], 0) + row["count"]
+    if unset:
+        # Documents the canonical-fields backfill has not reached: bucket their raw values
+        raw_field, normalize = CANONICAL_SOURCES[field]
+        raw_pipeline = [
+            {"$match": {"$and": [filter_query, {field: {"$exists": False}}]}},
+            {"$group": {"_id": f"${raw_field}", "count": {"$sum": 1}}},
+        ]
+        for row in await dashboard_db.volunteers_master.aggregate(raw_pipeline).to_list(None):
+            key = normalize(row["_id"]) or default
+            counts[key] = counts.get(key, 0) + row["count"]
+            unset -= row["count"]
+        if unset > 0:
+            counts[default] = counts.get(default, 0) + unset
+    return counts
+
+async def get_gender_stats(filter_query: dict) -> list:
+    counts = await _count_by("gender_norm", filter_query, "unknown")
+    return [{"name": name, "value": value} for name, value in counts.items()]
+
+# status_norm -> chart label; everything else (submitted, screening, ...) is "Not Active"
+STATUS_LABELS = {
+    "active-new": "Active New",
+    "active-old": "Active Old",
+    "approved": "Approved",
+    "rejected": "Rejected",
+}
 
 async def get_status_stats(filter_query: dict) -> list:
-    pipeline = [
-        {"$match": filter_query},
-        {
-            "$project": {
-                "mapped_status": {
-                    "$switch": {
-                        "branches": [
-                            {"case": {"$eq": ["$current_status", "active-new"]}, "then": "Active New"},
-                            {"case": {"$eq": ["$current_status", "active-old"]}, "then": "Active Old"},
-                            {"case": {"$eq": ["$current_status", "inactive"]}, "then": "Not Active"},
-                            {"case": {"$eq": ["$current_status", "approved"]}, "then": "Approved"},
-                            {"case": {"$eq": ["$current_status", "rejected"]}, "then": "Rejected"}
-                        ],
-                        "default": "Not Active" # Map submitted or others to Not Active
-                    }
-                }
-            }
-        },
-        {"$group": {"_id": "$mapped_status", "count": {"$sum": 1}}},
-        {"$project": {"name": "$_id", "value": "$count", "_id": 0}}
-    ]
-    return await db.volunteers_master.aggregate(pipeline).to_list(None)
+    labels: Dict[str, int] = {}
+    for status_norm, count in (await _count_by("status_norm", filter_query, "")).items():
+        label = STATUS_LABELS.get(status_norm, "Not Active")
+        labels[label] = labels.get(label, 0) + count
+    return [{"name": name, "value": value} for name, value in labels.items()]
 
 async def get_daily_activity(filter_query: dict, days: int = 14) -> dict:
     master_pipeline = [
@@ -106,7 +118,7 @@ async def get_daily_activity(filter_query: dict, days: int = 14) -> dict:
         {"$project": {"date": "$_id", "count": 1, "_id": 0}}
     ]
     # Use registration_forms as "enrollment data" for Ecosystem Activity as per user request
-    registration_daily = await db.registration_forms.aggregate(master_pipeline).to_list(days)
+    registration_daily = await dashboard_db.registration_forms.aggregate(master_pipeline).to_list(days)
     
     field_pipeline = [
         {"$match": {"audit.created_at": {"$ne": None}}},
@@ -119,7 +131,7 @@ async def get_daily_activity(filter_query: dict, days: int = 14) -> dict:
         {"$sort": {"_id": 1}},
         {"$project": {"date": "$_id", "count": 1, "_id": 0}}
     ]
-    field_daily = await db.field_visits.aggregate(field_pipeline).to_list(days)
+    field_daily = await dashboard_db.field_visits.aggregate(field_pipeline).to_list(days)
     
     return {"master": registration_daily, "field": field_daily}
 
@@ -136,7 +148,7 @@ async def get_monthly_growth(filter_query: dict, year: int) -> dict:
         {"$sort": {"_id": 1}},
         {"$project": {"date": "$_id", "count": 1, "_id": 0}}
     ]
-    registration_monthly = await db.registration_forms.aggregate(monthly_pipeline).to_list(12)
+    registration_monthly = await dashboard_db.registration_forms.aggregate(monthly_pipeline).to_list(12)
 
     field_monthly_pipeline = [
         {"$match": {"audit.created_at": {"$ne": None}}},
@@ -149,7 +161,7 @@ async def get_monthly_growth(filter_query: dict, year: int) -> dict:
         {"$sort": {"_id": 1}},
         {"$project": {"date": "$_id", "count": 1, "_id": 0}}
     ]
-    field_monthly = await db.field_visits.aggregate(field_monthly_pipeline).to_list(12)
+    field_monthly = await dashboard_db.field_visits.aggregate(field_monthly_pipeline).to_list(12)
     
     return {"master": registration_monthly, "field": field_monthly}
 
@@ -160,7 +172,7 @@ async def get_area_stats(limit: int = 10) -> list:
         {"$limit": limit},
         {"$project": {"name": {"$ifNull": ["$_id", "Unknown"]}, "value": "$count", "_id": 0}}
     ]
-    return await db.volunteers_master.aggregate(pipeline).to_list(limit)
+    return await dashboard_db.volunteers_master.aggregate(pipeline).to_list(limit)
 
 async def get_yearly_gender_stats(filter_query: dict) -> list:
     pipline = [
@@ -168,16 +180,8 @@ async def get_yearly_gender_stats(filter_query: dict) -> list:
         {
             "$project": {
                 "year": {"$year": "$audit.created_at"},
-                "gender": {
-                    "$switch": {
-                        "branches": [
-                            {"case": {"$in": ["$basic_info.gender", ["VB", "male"]]}, "then": "male"},
-                            {"case": {"$in": ["$basic_info.gender", ["FVB", "female"]]}, "then": "female"},
-                            {"case": {"$in": ["$basic_info.gender", ["MVB", "Mfvb", "kids_7_11", "female_minor", "male_minor"]]}, "then": "minor"}
-                        ],
-                        "default": "unknown"
-                    }
-                }
+                # Raw value for documents not yet backfilled; normalized below
+                "gender": {"$ifNull": ["$gender_norm", "$basic_info.gender"]}
             }
         },
         {"$group": {
@@ -192,7 +196,12 @@ async def get_yearly_gender_stats(filter_query: dict) -> list:
         }},
         {"$sort": {"year": 1}}
     ]
-    raw = await db.volunteers_master.aggregate(pipline).to_list(None)
+    rows = await dashboard_db.volunteers_master.aggregate(pipline).to_list(None)
+    merged: Dict[Tuple, int] = {}
+    for row in rows:
+        key = (row["year"], normalize_gender(row.get("gender")))
+        merged[key] = merged.get(key, 0) + row["count"]
+    raw = [{"year": year, "gender": gender, "count": count} for (year, gender), count in merged.items()]
     
     # Process dictionary logic outside repo or keep it here if it's data shaping? 
     # Repos should return raw data preferably, but shaping for chart is okay.
@@ -206,19 +215,66 @@ async def get_location_stats(filter_query: dict, limit: int = 10) -> list:
         {"$limit": limit},
         {"$project": {"name": "$_id", "value": "$count", "_id": 0}}
     ]
-    return await db.volunteers_master.aggregate(pipeline).to_list(limit)
+    return await dashboard_db.volunteers_master.aggregate(pipeline).to_list(limit)
+
+# Newest first; _id breaks ties so keyset pages never skip or repeat rows.
+# Every writer sets audit.created_at, so the keyset never meets a null key.
+VOLUNTEER_SORT = [("audit.created_at", -1), ("_id", -1)]
+
+# Filtered totals are approximate: cached briefly instead of counted per page
+_total_cache: Dict[str, Tuple[float, int]] = {}
+_TOTAL_CACHE_MAX = 256
+
+
+async def approximate_volunteer_total(filter_query: dict) -> int:
+    """
+    Total for a volunteer listing without counting on every page:
+    collection metadata when unfiltered, otherwise a short-lived cached count.
+    """
+    if not filter_query:
+        return await dashboard_db.volunteers_master.estimated_document_count()
+
+    key = json_util.dumps(filter_query, sort_keys=True)
+    now = time.monotonic()
+    hit = _total_cache.get(key)
+    if hit and hit[0] > now:
+        return hit[1]
+
+    total = await dashboard_db.volunteers_master.count_documents(filter_query)
+    if len(_total_cache) >= _TOTAL_CACHE_MAX:
+        _total_cache.clear()
+    _total_cache[key] = (now + settings.VOLUNTEER_TOTAL_CACHE_SECONDS, total)
+    return total
+
+
+async def search_volunteers(
+    filter_query: dict,
+    skip: int = 0,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+) -> dict:
+    """
+    One page of the volunteer list, newest first, keyset-paginated on
+    (audit.created_at, _id). Pass the returned next_cursor back as `cursor`.
+    `skip` is still honoured for first-page requests from older clients.
+    Raises InvalidPageCursor for a malformed cursor.
+    """
+    after = decode_cursor(cursor)
+    query = filter_query
+    seek = keyset_filter(VOLUNTEER_SORT, after)
+    if seek:
+        query = {"$and": [filter_query, seek]} if filter_query else seek
 
-async def search_volunteers(filter_query: dict, skip: int = 0, limit: int = 20) -> dict:
-    match_stage = {"$match": filter_query}
-    
-    # Text search if 'search' query is present in filter_query (handled by caller constructing regex usually)
-    # But here we assume filter_query is already a proper mongo query
-    
     pipeline = [
-        match_stage,
-        {"$sort": {"audit.created_at": -1}},
-        {"$skip": skip},
-        {"$limit": limit},
+        {"$match": query},
+        {"$sort": dict(VOLUNTEER_SORT)},
+    ]
+    if skip and after is None:
+        pipeline.append({"$skip": skip})
+    pipeline += [
+        # One extra row tells whether another page exists; the lookup only runs for this page
+        {"$limit": limit + 1},
         {"$lookup": {
             "from": "prescreening_forms",
             "localField": "volunteer_id",
@@ -226,10 +282,10 @@ async def search_volunteers(filter_query: dict, skip: int = 0, limit: int = 20)
             "as": "prescreen_data"
         }},
         {"$unwind": {"path": "$prescreen_data", "preserveNullAndEmptyArrays": True}},
-        # Projection to match Frontend expectations
+        # Projection to match Frontend expectations (audit.created_at/_id feed the cursor)
         {"$project": {
-            "_id": 0,
-            "_id": 0,
+            "_id": 1,
+            "audit.created_at": 1,
             "volunteer_id": 1,
             "study_code": 1, 
             "legacy_id": 1,
@@ -243,42 +299,30 @@ async def search_volunteers(filter_query: dict, skip: int = 0, limit: int = 20)
             }
         }}
     ]
-    
-    volunteers = await db.volunteers_master.aggregate(pipeline).to_list(limit)
-    total = await db.volunteers_master.count_documents(filter_query)
-    
-    return {"volunteers": volunteers, "total": total}
+
+    rows = await dashboard_db.volunteers_master.aggregate(pipeline).to_list(limit + 1)
+    volunteers, next_cursor = split_page(rows, VOLUNTEER_SORT, limit)
+    for row in volunteers:
+        row.pop("_id", None)
+        row.pop("audit", None)
+
+    total = await approximate_volunteer_total(filter_query) if include_total else None
+    return {"volunteers": volunteers, "total": total, "next_cursor": next_cursor}
 
 async def get_unique_locations() -> list:
     """Get list of all unique locations from master collection"""
-    locations = await db.volunteers_master.distinct("basic_info.field_area")
+    locations = await dashboard_db.volunteers_master.distinct("basic_info.field_area")
     return sorted([l for l in locations if l])
 
 async def get_location_specific_stats(location: str) -> dict:
     """Get statistics for a specific location"""
     filter_query = {"basic_info.field_area": location}
     
-    total = await db.volunteers_master.count_documents(filter_query)
+    total = await dashboard_db.volunteers_master.count_documents(filter_query)
     
-    # Gender breakdown
-    pipeline = [
-        {"$match": filter_query},
-        {"$project": {
-            "normalized_gender": {
-                "$switch": {
-                    "branches": [
-                        {"case": {"$in": ["$basic_info.gender", ["VB", "male"]]}, "then": "Male"},
-                        {"case": {"$in": ["$basic_info.gender", ["FVB", "female"]]}, "then": "Female"},
-                        {"case": {"$in": ["$basic_info.gender", ["MVB", "Mfvb", "kids_7_11", "female_minor", "male_minor"]]}, "then": "Minor"}
-                    ],
-                    "default": "Unknown"
-                }
-            }
-        }},
-        {"$group": {"_id": "$normalized_gender", "count": {"$sum": 1}}},
-        {"$project": {"name": "$_id", "value": "$count", "_id": 0}}
-    ]
-    gender_stats = await db.volunteers_master.aggregate(pipeline).to_list(None)
+    # Gender breakdown (covered by the field_area + gender_norm index)
+    counts = await _count_by("gender_norm", filter_query, "unknown")
+    gender_stats = [{"name": name.capitalize(), "value": value} for name, value in counts.items()]
     
     return {
         "location": location,
@@ -286,15 +330,19 @@ async def get_location_specific_stats(location: str) -> dict:
         "gender_breakdown": gender_stats
     }
 
+async def find_study_instance(study_code: str) -> Optional[dict]:
+    """PRM study instance for an entered study code, any case."""
+    return await dashboard_db.study_instances.find_one(study_code_filter(study_code, "study_instances"))
+
 async def get_study_participation_details(study_code: str) -> list:
     """
     Fetch comprehensive participation details for a study from assigned_studies collection.
     Links assignment records with Master Profiles.
     Handles 'Legacy' IDs and Age Calculation.
     """
-    # Case insensitive search in assigned_studies collection
-    assignments = await db.assigned_studies.find(
-        {"study_code": {"$regex": f"^{study_code}$", "$options": "i"}}
+    # Case-insensitive via the indexed study_code_key (raw code until backfilled)
+    assignments = await dashboard_db.assigned_studies.find(
+        study_code_filter(study_code, "assigned_studies")
     ).sort("assigned_date", -1).to_list(None)
     
     if not assignments:
@@ -304,12 +352,14 @@ async def get_study_participation_details(study_code: str) -> list:
     vol_ids = [a.get("volunteer_id") for a in assignments if a.get("volunteer_id")]
     
     # Fetch master records
-    masters = await db.volunteers_master.find(
-        {"volunteer_id": {"$in": vol_ids}}
+    masters = await dashboard_db.volunteers_master.find(
+        {"volunteer_id": {"$in": vol_ids}},
+        {"volunteer_id": 1, "legacy_id": 1, "basic_info": 1, "address_info": 1, "dob_date": 1},
     ).to_list(None)
     
     master_map = {v["volunteer_id"]: v for v in masters}
     
+    today = datetime.now()
     results = []
     for a in assignments:
         vid = a.get("volunteer_id")
@@ -317,19 +367,12 @@ async def get_study_participation_details(study_code: str) -> list:
         basic = v_master.get("basic_info", {}) if v_master else {}
         address_info = v_master.get("address_info", {}) if v_master else {}
         
-        # Calculate Age
+        # Age from the typed dob_date written at ingest (parsed here only if not yet backfilled)
         dob = basic.get("dob")
-        age = "N/A"
-        if dob:
-            try:
-                # Assuming YYYY-MM-DD or datetime
-                dob_str = str(dob)[:10]
-                dob_date = datetime.strptime(dob_str, "%Y-%m-%d")
-                today = datetime.now()
-                age = today.year - dob_date.year - ((today.month, today.day) < (dob_date.month, dob_date.day))
-            except Exception as ex:
-                # Log error in age calc but don't fail
-                age = basic.get("age", "N/A")
+        dob_date = v_master.get("dob_date") if v_master else None
+        age = age_on(dob_date or parse_dob(dob), today)
+        if age is None:
+            age = basic.get("age", "N/A") if dob else "N/A"
 
         # Normalize Gender
         raw_gender = basic.get("gender", a.get("volunteer_gender", "N/A"))
@@ -0,0 +1,116 @@
+"""
+Repository for the person_keys identity index.
+
+One document per normalized identity key, owned by exactly one record:
+
+    {_id: "contact:9876543210", kind: "contact", value: "9876543210",
+     owner: {type: "draft" | "master", id: <field visit _id | volunteer_id>}}
+
+The key is the _id, so the unique constraint comes for free and a duplicate
+check for any number of keys is one `$in` query. One extra document,
+{_id: "backfill:complete"}, records that existing records have been indexed.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, List
+
+from pymongo import DeleteMany, UpdateOne
+
+from app.core.normalization import normalize_contact, normalize_id_proof
+from app.db.client import db
+from app.db.query_policy import search_db
+
+COLLECTION = "person_keys"
+
+CONTACT = "contact"
+ID_PROOF = "id_proof"
+
+DRAFT = "draft"
+MASTER = "master"
+
+BACKFILL_MARKER = "backfill:complete"
+
+
+def identity_keys(contacts: Iterable[Any] = (), id_proofs: Iterable[Any] = ()) -> List[str]:
+    """Normalized, de-duplicated keys for the given raw values (blanks skipped)."""
+    keys = []
+    for kind, values, normalize in ((CONTACT, contacts, normalize_contact), (ID_PROOF, id_proofs, normalize_id_proof)):
+        for value in values:
+            normalized = normalize(value)
+            key = f"{kind}:{normalized}" if normalized else None
+            if key and key not in keys:
+                keys.append(key)
+    return keys
+
+
+def key_kind(key: str) -> str:
+    return key.split(":", 1)[0]
+
+
+async def find_owners(keys: List[str]) -> Dict[str, Dict[str, Any]]:
+    """{key: owner} for the keys that are already taken."""
+    if not keys:
+        return {}
+    cursor = search_db[COLLECTION].find({"_id": {"$in": keys}}, {"owner": 1})
+    return {doc["_id"]: doc["owner"] async for doc in cursor}
+
+
+def claim_ops(
+    keys: List[str],
+    owner_type: str,
+    owner_id: str,
+    now: datetime,
+    replace_types: Iterable[str] = (),
+) -> List[UpdateOne]:
+    """
+    Upserts taking each key for the owner. A key already held by the same owner,
+    or by an owner of a type in `replace_types`, is taken over; a key held by
+    anyone else makes the upsert fail with a duplicate-key error.
+    """
+    allowed = [{"owner.type": owner_type, "owner.id": owner_id}]
+    allowed += [{"owner.type": t} for t in replace_types]
+    ops = []
+    for key in keys:
+        kind, value = key.split(":", 1)
+        ops.append(UpdateOne(
+            {"_id": key, "$or": allowed},
+            {
+                "$set": {"owner": {"type": owner_type, "id": owner_id}, "updated_at": now},
+                "$setOnInsert": {"kind": kind, "value": value, "created_at": now},
+            },
+            upsert=True,
+        ))
+    return ops
+
+
+def owned_by(owner_type: str, owner_id: str, keep: Iterable[str] = ()) -> Dict[str, Any]:
+    """Filter for the owner's keys, except `keep` (its current ones)."""
+    query: Dict[str, Any] = {"owner.type": owner_type, "owner.id": owner_id}
+    keep = list(keep)
+    if keep:
+        query["_id"] = {"$nin": keep}
+    return query
+
+
+def release_op(owner_type: str, owner_id: str, keep: Iterable[str] = ()) -> DeleteMany:
+    return DeleteMany(owned_by(owner_type, owner_id, keep))
+
+
+async def bulk_write(ops: list, session=None, ordered: bool = False):
+    return await db[COLLECTION].bulk_write(ops, ordered=ordered, session=session)
+
+
+async def delete_keys(keys: List[str], owner_type: str, owner_id: str) -> None:
+    if keys:
+        await db[COLLECTION].delete_many({"_id": {"$in": keys}, **owned_by(owner_type, owner_id)})
+
+
+async def release(owner_type: str, owner_id: str, session=None) -> None:
+    await db[COLLECTION].delete_many(owned_by(owner_type, owner_id), session=session)
+
+
+async def is_backfilled() -> bool:
+    return await search_db[COLLECTION].find_one({"_id": BACKFILL_MARKER}, {"_id": 1}) is not None
+
+
+async def mark_backfilled(now: datetime) -> None:
+    await db[COLLECTION].update_one({"_id": BACKFILL_MARKER}, {"$set": {"completed_at": now}}, upsert=True)
@@ -0,0 +1,55 @@
+"""
+Repository for request_profiles collection.
+Stores sampling-profiler output in a capped collection, so the newest profiles
+are kept and old ones roll off without any cleanup job.
+"""
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import CollectionInvalid
+
+from app.core.config import settings
+from app.db.client import db
+
+COLLECTION = "request_profiles"
+
+
+async def ensure_collection() -> None:
+    """Create the capped collection if it does not exist yet."""
+    try:
+        await db.create_collection(
+            COLLECTION,
+            capped=True,
+            size=settings.SAMPLING_PROFILER_STORAGE_BYTES,
+            max=settings.SAMPLING_PROFILER_MAX_PROFILES,
+        )
+    except CollectionInvalid:
+        pass  # Already exists
+
+
+async def insert_profile(profile: Dict[str, Any]) -> str:
+    """Store one profile. Returns the inserted ID."""
+    result = await db[COLLECTION].insert_one(profile)
+    return str(result.inserted_id)
+
+
+async def find_recent(limit: int = 50) -> List[Dict[str, Any]]:
+    """Most recent profiles, newest first, without the stack data."""
+    cursor = db[COLLECTION].find({}, {"stacks": 0}).sort("$natural", -1).limit(limit)
+    profiles = await cursor.to_list(length=limit)
+    for profile in profiles:
+        profile["_id"] = str(profile["_id"])
+    return profiles
+
+
+async def find_by_id(profile_id: str) -> Optional[Dict[str, Any]]:
+    """Full profile including folded stacks, or None."""
+    try:
+        oid = ObjectId(profile_id)
+    except InvalidId:
+        return None
+    profile = await db[COLLECTION].find_one({"_id": oid})
+    if profile:
+        profile["_id"] = str(profile["_id"])
+    return profile
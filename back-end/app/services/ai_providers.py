@@ -0,0 +1,336 @@
+"""
+AI provider layer.
+One long-lived client per provider, created in the app lifespan and shared by
+every report request, so calls reuse pooled keep-alive connections instead of
+paying a TCP+TLS handshake each time.
+
+Every provider offers the same interface (complete / stream / aclose), has a
+concurrency cap (AI_MAX_CONCURRENCY), a per-call timeout and retries transient
+failures (timeouts, connection errors, 429, 5xx) with full-jitter backoff.
+
+    AI_PROVIDER=openai|gemini|fake
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import time
+from contextlib import aclosing
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, TypeVar
+
+import aiohttp
+import httpx
+import openai
+from openai import AsyncOpenAI
+
+from app.core.config import settings
+from app.core.metrics import AI_LATENCY
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+SYSTEM_PROMPT = "You are a professional data analyst specializing in volunteer recruitment and study management systems."
+
+PROVIDER_NAMES = ("openai", "gemini", "fake")
+
+
+class TransientAIError(Exception):
+    """A provider failure worth retrying (timeout, connection reset, 429, 5xx)."""
+
+
+def backoff_delay(attempt: int, base: float, cap: float = 10.0) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2^attempt))."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+async def with_retries(
+    call: Callable[[], Awaitable[T]],
+    attempts: int,
+    base_delay: float,
+    label: str = "AI call",
+) -> T:
+    """Run `call`, retrying TransientAIError up to `attempts` extra times."""
+    for attempt in range(attempts + 1):
+        try:
+            return await call()
+        except TransientAIError as e:
+            if attempt >= attempts:
+                raise
+            delay = backoff_delay(attempt, base_delay)
+            logger.warning(f"{label} failed ({e}); retry {attempt + 1}/{attempts} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+
+class AIProvider:
+    """Provider-agnostic completion client."""
+
+    name = ""
+
+    def __init__(self, model: str, max_concurrency: Optional[int] = None):
+        self.model = model
+        self._semaphore = asyncio.Semaphore(max_concurrency or settings.AI_MAX_CONCURRENCY)
+
+    async def _complete_once(self, prompt: str) -> str:
+        raise NotImplementedError
+
+    def _stream_once(self, prompt: str) -> AsyncIterator[str]:
+        raise NotImplementedError
+
+    async def complete(self, prompt: str) -> str:
+        """Full completion text, with concurrency cap, retries and latency metric."""
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            async with self._semaphore:
+                result = await with_retries(
+                    lambda: self._complete_once(prompt),
+                    settings.AI_MAX_RETRIES, settings.AI_RETRY_BASE_DELAY, f"{self.name} completion",
+                )
+            outcome = "ok"
+            return result
+        finally:
+            AI_LATENCY.observe(time.perf_counter() - start, (self.name, outcome))
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Completion text as deltas. Transient failures are retried only until the
+        first delta has been yielded; after that the error propagates.
+        """
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            async with self._semaphore:
+                for attempt in range(settings.AI_MAX_RETRIES + 1):
+                    started = False
+                    try:
+                        # aclosing: a client disconnect closes the provider stream now, not at GC
+                        async with aclosing(self._stream_once(prompt)) as deltas:
+                            async for delta in deltas:
+                                started = True
+                                yield delta
+                        break
+                    except TransientAIError as e:
+                        if started or attempt >= settings.AI_MAX_RETRIES:
+                            raise
+                        delay = backoff_delay(attempt, settings.AI_RETRY_BASE_DELAY)
+                        logger.warning(f"{self.name} stream failed ({e}); retry {attempt + 1} in {delay:.2f}s")
+                        await asyncio.sleep(delay)
+            outcome = "ok"
+        finally:
+            AI_LATENCY.observe(time.perf_counter() - start, (self.name, outcome))
+
+    async def aclose(self) -> None:
+        pass
+
+
+class OpenAIProvider(AIProvider):
+    name = "openai"
+
+    def __init__(self, api_key: str, model: str, max_concurrency: Optional[int] = None):
+        super().__init__(model, max_concurrency)
+        # Pooled transport shared by every call; retries are handled by with_retries
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.AI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.AI_MAX_CONNECTIONS,
+            ),
+            timeout=httpx.Timeout(settings.AI_TIMEOUT_SECONDS, connect=10.0),
+        )
+        self.client = AsyncOpenAI(api_key=api_key, http_client=self._http, max_retries=0)
+
+    @staticmethod
+    def _translate(e: Exception) -> Exception:
+        if isinstance(e, (openai.APITimeoutError, openai.APIConnectionError, openai.RateLimitError)):
+            return TransientAIError(str(e))
+        if isinstance(e, openai.APIStatusError) and e.status_code >= 500:
+            return TransientAIError(str(e))
+        return Exception(f"OpenAI API error: {str(e)}")
+
+    def _request(self, prompt: str, stream: bool = False):
+        return self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=2000,
+            stream=stream,
+        )
+
+    async def _complete_once(self, prompt: str) -> str:
+        try:
+            response = await self._request(prompt)
+        except openai.OpenAIError as e:
+            raise self._translate(e) from e
+        return response.choices[0].message.content
+
+    async def _stream_once(self, prompt: str) -> AsyncIterator[str]:
+        try:
+            stream = await self._request(prompt, stream=True)
+        except openai.OpenAIError as e:
+            raise self._translate(e) from e
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except openai.OpenAIError as e:
+            raise self._translate(e) from e
+        finally:
+            # Return the HTTP connection to the pool even if the consumer stopped early
+            await stream.close()
+
+    async def aclose(self) -> None:
+        await self.client.close()
+
+
+class GeminiProvider(AIProvider):
+    name = "gemini"
+    BASE_URL = "https://generativelanguage.googleapis.com/v1beta/models"
+
+    def __init__(self, api_key: str, model: str, max_concurrency: Optional[int] = None):
+        super().__init__(model, max_concurrency)
+        self._api_key = api_key
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _client(self) -> aiohttp.ClientSession:
+        # Created on first use so it binds to the running loop
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=settings.AI_MAX_CONNECTIONS, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=settings.AI_TIMEOUT_SECONDS, connect=10),
+                # Key in a header so it never appears in URLs or access logs
+                headers={"x-goog-api-key": self._api_key},
+            )
+        return self._session
+
+    def _payload(self, prompt: str) -> Dict:
+        return {
+            "systemInstruction": {"parts": [{"text": SYSTEM_PROMPT}]},
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+            "generationConfig": {"temperature": 0.7, "maxOutputTokens": 2000},
+        }
+
+    @staticmethod
+    def _text(data: Dict) -> str:
+        candidates = data.get("candidates") or []
+        if not candidates:
+            return ""
+        parts = (candidates[0].get("content") or {}).get("parts") or []
+        return "".join(part.get("text", "") for part in parts)
+
+    @staticmethod
+    async def _check(response: aiohttp.ClientResponse) -> None:
+        if response.status == 200:
+            return
+        body = (await response.text())[:500]
+        if response.status == 429 or response.status >= 500:
+            raise TransientAIError(f"Gemini API {response.status}: {body}")
+        raise Exception(f"Gemini API error {response.status}: {body}")
+
+    async def _complete_once(self, prompt: str) -> str:
+        url = f"{self.BASE_URL}/{self.model}:generateContent"
+        try:
+            async with self._client().post(url, json=self._payload(prompt)) as response:
+                await self._check(response)
+                text = self._text(await response.json())
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            raise TransientAIError(f"Gemini network error: {e!r}") from e
+        if not text:
+            raise Exception("Gemini API returned no text")
+        return text
+
+    async def _stream_once(self, prompt: str) -> AsyncIterator[str]:
+        url = f"{self.BASE_URL}/{self.model}:streamGenerateContent?alt=sse"
+        try:
+            async with self._client().post(url, json=self._payload(prompt)) as response:
+                await self._check(response)
+                async for line in response.content:
+                    line = line.strip()
+                    if line.startswith(b"data:"):
+                        text = self._text(json.loads(line[5:]))
+                        if text:
+                            yield text
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            raise TransientAIError(f"Gemini network error: {e!r}") from e
+
+    async def aclose(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+
+
+class FakeProvider(AIProvider):
+    """
+    Deterministic local stand-in (AI_PROVIDER=fake).
+    Used by tests and offline development; never calls the network.
+    """
+    name = "fake"
+
+    def __init__(self, delay: float = 0.0, max_concurrency: Optional[int] = None):
+        super().__init__("fake-model", max_concurrency)
+        self.delay = delay
+
+    def _reply(self, prompt: str) -> str:
+        digest = hashlib.sha256(prompt.encode()).hexdigest()[:8]
+        return f"Fake report {digest}: {len(prompt)} prompt characters summarized."
+
+    async def _complete_once(self, prompt: str) -> str:
+        return self._reply(prompt)
+
+    async def _stream_once(self, prompt: str) -> AsyncIterator[str]:
+        for i, word in enumerate(self._reply(prompt).split(" ")):
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            yield word if i == 0 else " " + word
+
+
+# ============ Registry ============
+_providers: Dict[str, AIProvider] = {}
+
+
+def _is_placeholder(key: str) -> bool:
+    return not key or key.startswith("your_") or "your_open" in key
+
+
+def create_provider(name: str) -> AIProvider:
+    """Build a provider from settings; raises ValueError when it is not configured."""
+    if name == "openai":
+        if _is_placeholder(settings.OPENAI_API_KEY):
+            raise ValueError("OPENAI_API_KEY not configured in .env file")
+        return OpenAIProvider(settings.OPENAI_API_KEY, settings.OPENAI_MODEL)
+    if name == "gemini":
+        if _is_placeholder(settings.GEMINI_API_KEY):
+            raise ValueError("GEMINI_API_KEY not configured in .env file")
+        return GeminiProvider(settings.GEMINI_API_KEY, settings.GEMINI_MODEL)
+    if name == "fake":
+        return FakeProvider()
+    raise ValueError(f"Unknown AI provider: {name} (expected one of {', '.join(PROVIDER_NAMES)})")
+
+
+def get_provider(name: Optional[str] = None) -> AIProvider:
+    """Shared provider instance; created on first use if the lifespan did not."""
+    name = name or settings.AI_PROVIDER
+    provider = _providers.get(name)
+    if provider is None:
+        provider = _providers[name] = create_provider(name)
+    return provider
+
+
+def start_ai_providers() -> None:
+    """Create the configured default provider at startup (AI stays optional)."""
+    try:
+        provider = get_provider()
+        logger.info(f"AI provider ready: {provider.name} ({provider.model})")
+    except ValueError as e:
+        logger.warning(f"AI features disabled: {e}")
+
+
+async def stop_ai_providers() -> None:
+    for provider in list(_providers.values()):
+        try:
+            await provider.aclose()
+        except Exception as e:
+            logger.warning(f"Error closing AI provider {provider.name}: {e}")
+    _providers.clear()
@@ -1,65 +1,51 @@
 """
-AI Service for Report Generation using OpenAI
-Handles interaction with OpenAI API to generate intelligent summaries and reports
+AI Service for Report Generation
+Builds report prompts and sends them to the configured AI provider (OpenAI or Gemini)
 """
 
-from openai import AsyncOpenAI
-from typing import Dict, Optional
-from datetime import datetime
-import json
-from app.core.config import settings
-
-def serialize_datetime(obj):
-    """Helper to serialize datetime objects to ISO format"""
-    if isinstance(obj, datetime):
-        return obj.isoformat()
-    elif isinstance(obj, dict):
-        return {k: serialize_datetime(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [serialize_datetime(item) for item in obj]
-    return obj
+import logging
+from typing import AsyncIterator, Dict, Optional
+from app.core.metrics import AI_PROMPT_TOKENS
+from app.services.ai_providers import AIProvider, get_provider
+from app.services.prompt_budget import compact_for_prompt, estimate_tokens
+
+logger = logging.getLogger(__name__)
 
 class AIReportService:
-    def __init__(self):
-        self.api_key = settings.OPENAI_API_KEY
-        
-        if not self.api_key or self.api_key == "your_api_key_here":
-            raise ValueError("OPENAI_API_KEY not configured in .env file")
-        
-        # Initialize OpenAI client
-        print(f"[DEBUG] Loading OpenAI API Key: {self.api_key[:10]}...{self.api_key[-4:] if self.api_key else 'None'}")
-        if not self.api_key or self.api_key == "your_api_key_here" or "your_open" in self.api_key:
-             print(f"[ERROR] Invalid API Key detected: {self.api_key}")
-             raise ValueError(f"Invalid OPENAI_API_KEY confgured: {self.api_key}")
-        
-        self.client = AsyncOpenAI(api_key=self.api_key)
-        self.model = settings.OPENAI_MODEL  # e.g., "gpt-3.5-turbo" or "gpt-4"
-    
+    """
+    Report prompts on top of a provider-agnostic AI client (app.services.ai_providers).
+    The provider, and its pooled connection, is shared across requests.
+    """
+
+    def __init__(self, provider: Optional[AIProvider] = None):
+        self.provider = provider or get_provider()
+        self.model = self.provider.model
+
     async def _generate_content(self, prompt: str) -> str:
-        """Make API request to OpenAI"""
+        """Full completion from the configured provider"""
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a professional data analyst specializing in volunteer recruitment and study management systems."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=2000
-            )
-            return response.choices[0].message.content
+            return await self.provider.complete(prompt)
         except Exception as e:
-            print(f"[ERROR] OpenAI API Failed: {str(e)}")
-            raise Exception(f"OpenAI API error: {str(e)}")
-    
-    async def generate_overall_summary(self, data: Dict) -> str:
-        """Generate overall system summary report"""
-        serialized_data = serialize_datetime(data)
+            logger.error(f"{self.provider.name} API Failed: {str(e)}")
+            raise
+
+    async def stream_content(self, prompt: str) -> AsyncIterator[str]:
+        """Stream the completion as text deltas as soon as the model produces them"""
+        try:
+            async for delta in self.provider.stream(prompt):
+                yield delta
+        except Exception as e:
+            logger.error(f"{self.provider.name} streaming API Failed: {str(e)}")
+            raise
+
+    def _overall_summary_prompt(self, data: Dict) -> str:
+        """Prompt for the overall system summary report"""
+        compact_data = compact_for_prompt(data, "overall_summary")
         prompt = f"""
 You are a professional data analyst creating an executive summary report for a volunteer recruitment management system.
 
 **System Data:**
-{json.dumps(serialized_data, indent=2)}
+{compact_data}
 
 **Instructions:**
 - Provide a concise executive summary (3-5 paragraphs)
@@ -71,16 +57,16 @@ You are a professional data analyst creating an executive summary report for a v
 
 Generate a comprehensive summary report:
 """
-        return await self._generate_content(prompt)
+        return prompt
     
-    async def generate_volunteer_insights(self, data: Dict) -> str:
-        """Generate volunteer-focused insights"""
-        serialized_data = serialize_datetime(data)
+    def _volunteer_insights_prompt(self, data: Dict) -> str:
+        """Prompt for volunteer-focused insights"""
+        compact_data = compact_for_prompt(data, "volunteer_insights")
         prompt = f"""
 You are a volunteer recruitment analyst analyzing volunteer data for insights.
 
 **Volunteer Data:**
-{json.dumps(serialized_data, indent=2)}
+{compact_data}
 
 **Analysis Focus:**
 1. Volunteer demographics and distribution
@@ -98,16 +84,16 @@ You are a volunteer recruitment analyst analyzing volunteer data for insights.
 
 Generate a detailed volunteer insights report:
 """
-        return await self._generate_content(prompt)
+        return prompt
     
-    async def generate_study_performance(self, data: Dict) -> str:
-        """Generate study performance analysis"""
-        serialized_data = serialize_datetime(data)
+    def _study_performance_prompt(self, data: Dict) -> str:
+        """Prompt for study performance analysis"""
+        compact_data = compact_for_prompt(data, "study_performance")
         prompt = f"""
 You are analyzing study/project performance for a research volunteer management system.
 
 **Study Data:**
-{json.dumps(serialized_data, indent=2)}
+{compact_data}
 
 **Analysis Focus:**
 1. Study completion rates and timeline adherence
@@ -125,11 +111,11 @@ You are analyzing study/project performance for a research volunteer management
 
 Generate a comprehensive study performance report:
 """
-        return await self._generate_content(prompt)
+        return prompt
     
-    async def generate_custom_report(self, custom_prompt: str, data: Dict) -> str:
-        """Generate custom report based on user's specific question"""
-        serialized_data = serialize_datetime(data)
+    def _custom_report_prompt(self, custom_prompt: str, data: Dict) -> str:
+        """Prompt for a custom report answering the user's specific question"""
+        compact_data = compact_for_prompt(data, "custom")
         prompt = f"""
 You are a data analyst for a volunteer recruitment management system. Answer the following question based on the provided data.
 
@@ -137,7 +123,7 @@ You are a data analyst for a volunteer recruitment management system. Answer the
 {custom_prompt}
 
 **Available Data:**
-{json.dumps(serialized_data, indent=2)}
+{compact_data}
 
 **Instructions:**
 - Answer the question directly and concisely
@@ -147,14 +133,50 @@ You are a data analyst for a volunteer recruitment management system. Answer the
 
 Your answer:
 """
-        return await self._generate_content(prompt)
+        return prompt
+
+    def build_prompt(self, report_type: str, data: Dict, custom_prompt: Optional[str] = None) -> str:
+        """Prompt for a report type (values of reports.ReportType)."""
+        if report_type == "overall_summary":
+            prompt = self._overall_summary_prompt(data)
+        elif report_type == "volunteer_insights":
+            prompt = self._volunteer_insights_prompt(data)
+        elif report_type == "study_performance":
+            prompt = self._study_performance_prompt(data)
+        elif report_type == "custom":
+            prompt = self._custom_report_prompt(custom_prompt or "", data)
+        else:
+            raise ValueError(f"Invalid report type: {report_type}")
+        tokens = estimate_tokens(prompt)
+        AI_PROMPT_TOKENS.observe(tokens, (report_type,))
+        logger.debug(f"{report_type} prompt: ~{tokens} tokens")
+        return prompt
+
+    async def generate_report(self, report_type: str, data: Dict, custom_prompt: Optional[str] = None) -> str:
+        """Generate the full report text for a report type"""
+        return await self._generate_content(self.build_prompt(report_type, data, custom_prompt))
+
+    def stream_report(self, report_type: str, data: Dict, custom_prompt: Optional[str] = None) -> AsyncIterator[str]:
+        """Stream the report text for a report type as it is generated"""
+        return self.stream_content(self.build_prompt(report_type, data, custom_prompt))
+
+    async def generate_overall_summary(self, data: Dict) -> str:
+        """Generate overall system summary report"""
+        return await self._generate_content(self._overall_summary_prompt(data))
+
+    async def generate_volunteer_insights(self, data: Dict) -> str:
+        """Generate volunteer-focused insights"""
+        return await self._generate_content(self._volunteer_insights_prompt(data))
+
+    async def generate_study_performance(self, data: Dict) -> str:
+        """Generate study performance analysis"""
+        return await self._generate_content(self._study_performance_prompt(data))
+
+    async def generate_custom_report(self, custom_prompt: str, data: Dict) -> str:
+        """Generate custom report based on user's specific question"""
+        return await self._generate_content(self._custom_report_prompt(custom_prompt, data))
 
-# Singleton instance
-ai_service = None
 
-def get_ai_service() -> AIReportService:
-    """Get or create AI service instance"""
-    global ai_service
-    if ai_service is None:
-        ai_service = AIReportService()
-    return ai_service
+def get_ai_service(provider: Optional[str] = None) -> AIReportService:
+    """Report service on the shared provider client (default AI_PROVIDER); raises ValueError if not configured"""
+    return AIReportService(get_provider(provider))
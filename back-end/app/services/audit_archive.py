@@ -0,0 +1,103 @@
+"""
+Audit log archival.
+Moves audit entries older than AUDIT_HOT_RETENTION_DAYS out of the hot
+audit_logs collection into compressed monthly archive collections, so the hot
+collection and its indexes stay small enough to remain in memory.
+audit_service queries the archive tier transparently when a search reaches
+past the hot window.
+
+Runs periodically from the app lifespan, or on demand:
+    python -m app.services.audit_archive             # archive now
+    python -m app.services.audit_archive --days 90   # custom retention
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.db.indexes import _to_index_model
+from app.db.odm.audit_log import AuditLog
+from app.repositories import audit_repo
+
+logger = logging.getLogger(__name__)
+
+
+def _next_month(month_start: datetime) -> datetime:
+    if month_start.month == 12:
+        return month_start.replace(year=month_start.year + 1, month=1)
+    return month_start.replace(month=month_start.month + 1)
+
+
+async def archive_older_than(days: int) -> Dict[str, int]:
+    """
+    Archive every hot entry older than `days`, one month at a time.
+    Returns {archive collection: entries moved}.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    index_models = [_to_index_model(spec) for spec in AuditLog.Settings.indexes]
+    moved = {}
+    for month_start in await audit_repo.months_before(cutoff):
+        name = audit_repo.archive_collection_name(month_start)
+        await audit_repo.ensure_archive_collection(name, index_models)
+        # The month containing the cutoff is only partly archived this run
+        moved[name] = await audit_repo.move_to_archive(name, month_start, min(_next_month(month_start), cutoff))
+        logger.info(f"Archived {moved[name]} audit entries into {name}")
+    return moved
+
+
+async def _run_periodically():
+    interval = settings.AUDIT_ARCHIVE_INTERVAL_HOURS * 3600
+    while True:
+        try:
+            await archive_older_than(settings.AUDIT_HOT_RETENTION_DAYS)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Audit archival failed: {e}")
+        await asyncio.sleep(interval)
+
+
+_task: Optional[asyncio.Task] = None
+
+
+def start_audit_archiver() -> Optional[asyncio.Task]:
+    """Schedule periodic archival if enabled. Called from the lifespan."""
+    global _task
+    if settings.AUDIT_ARCHIVE_ENABLED and _task is None:
+        _task = asyncio.get_running_loop().create_task(_run_periodically())
+    return _task
+
+
+async def stop_audit_archiver() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+
+
+# ============ CLI ============
+async def _main(days: int):
+    from app.db.client import close_db
+
+    try:
+        moved = await archive_older_than(days)
+    finally:
+        await close_db()
+    if not moved:
+        print("[OK] Nothing to archive")
+    for name, count in moved.items():
+        print(f"[OK] {name}: {count} entries archived")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Move old audit logs into monthly archive collections.")
+    parser.add_argument("--days", type=int, default=settings.AUDIT_HOT_RETENTION_DAYS, help="Keep this many days in the hot collection")
+    args = parser.parse_args()
+    asyncio.run(_main(args.days))
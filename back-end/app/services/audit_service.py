@@ -2,10 +2,16 @@
 Audit service.
 Centralized audit writing for all data mutations and important events.
 Called on every change to maintain immutable audit trail.
+Entries are buffered and batch-inserted by audit_writer unless marked critical.
 """
-from datetime import datetime
+import json
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from bson import ObjectId
 from app.core.logging import AuditAction, log_audit
+from app.core.pagination import decode_cursor, keyset_filter, split_page
 from app.repositories import audit_repo
+from app.services.audit_writer import get_audit_writer
 
 
 async def write_audit_log(
@@ -15,27 +21,22 @@ async def write_audit_log(
     user_id: str,
     changes: dict = None,
     metadata: dict = None,
+    critical: bool = False,
 ) -> str:
     """
     Write an immutable audit log entry.
-    Returns the audit log ID.
+    Returns the audit log ID (assigned up front, so it is known before the flush).
+    critical=True writes synchronously, so the entry is stored before returning.
     """
-    audit_entry = {
-        "action": action.value,
-        "entity_type": entity_type,
-        "entity_id": entity_id,
-        "user_id": user_id,
-        "timestamp": datetime.utcnow(),
-        "changes": changes or {},
-        "metadata": metadata or {},
-    }
+    audit_entry = log_audit(action, entity_type, entity_id, user_id, changes, metadata)
+    audit_entry["_id"] = ObjectId()
 
-    # Log to stdout for visibility
-    log_audit(action, entity_type, entity_id, user_id, changes, metadata)
+    writer = get_audit_writer()
+    if critical or writer is None:
+        return await audit_repo.insert_audit_log(audit_entry)
 
-    # Persist to database
-    audit_id = await audit_repo.insert_audit_log(audit_entry)
-    return audit_id
+    writer.enqueue(audit_entry)
+    return str(audit_entry["_id"])
 
 
 async def get_audit_trail(entity_type: str, entity_id: str, limit: int = 100) -> list:
@@ -46,3 +47,95 @@ async def get_audit_trail(entity_type: str, entity_id: str, limit: int = 100) ->
 async def get_user_actions(user_id: str, limit: int = 100) -> list:
     """Retrieve all actions performed by a user."""
     return await audit_repo.find_by_user(user_id, limit)
+
+
+def build_audit_filter(
+    entity_type: Optional[str] = None,
+    entity_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    action: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """Mongo filter for the supported audit query fields (time range is [since, until))."""
+    query: Dict[str, Any] = {}
+    if entity_type:
+        query["entity_type"] = entity_type
+    if entity_id:
+        query["entity_id"] = entity_id
+    if user_id:
+        query["user_id"] = user_id
+    if action:
+        query["action"] = action
+    if since or until:
+        query["timestamp"] = {}
+        if since:
+            query["timestamp"]["$gte"] = since
+        if until:
+            query["timestamp"]["$lt"] = until
+    return query
+
+
+def _serialize(entry: Dict[str, Any]) -> Dict[str, Any]:
+    entry["_id"] = str(entry["_id"])
+    return entry
+
+
+def _sort_key(entry: Dict[str, Any]):
+    return entry["timestamp"], entry["_id"]
+
+
+async def _tiers(filters: Dict[str, Any], before: Optional[datetime] = None) -> List[Tuple[str, Optional[datetime]]]:
+    """
+    Collections to search, newest first: the hot collection, then archive months
+    overlapping the filter's time range (and not newer than the page cursor).
+    Each comes with the newest timestamp it can hold (None for the hot collection).
+    """
+    window = filters.get("timestamp", {})
+    until = window.get("$lt")
+    if before is not None and (until is None or before < until):
+        until = before + timedelta(microseconds=1)  # the cursor row's own month still qualifies
+    ranges = await audit_repo.find_archive_ranges(since=window.get("$gte"), until=until)
+    return [(audit_repo.HOT_COLLECTION, None)] + [(r["collection"], r["end"]) for r in ranges]
+
+
+async def query_audit_logs(filters: Dict[str, Any], cursor: Optional[str] = None, limit: int = 100) -> Dict[str, Any]:
+    """
+    One page of audit entries, newest first, across the hot and archive tiers.
+    Raises InvalidPageCursor for a malformed cursor.
+    """
+    last = decode_cursor(cursor)
+    after = keyset_filter(audit_repo.AUDIT_SORT, last)
+    query = {"$and": [filters, after]} if filters and after else (filters or after)
+
+    # Tiers are read newest first until the page is full and no later tier can
+    # hold a newer row. An archive run that crashed before deleting can leave an
+    # entry in both the hot and the archive tier; it is kept once.
+    rows: List[Dict[str, Any]] = []
+    seen = set()
+    for collection, newest in await _tiers(filters, before=last["timestamp"] if last else None):
+        if len(rows) > limit and rows[limit]["timestamp"] > newest:
+            break
+        for entry in await audit_repo.find_page(query, limit + 1, collection=collection):
+            if entry["_id"] not in seen:
+                seen.add(entry["_id"])
+                rows.append(entry)
+        rows.sort(key=_sort_key, reverse=True)
+
+    items, next_cursor = split_page(rows, audit_repo.AUDIT_SORT, limit)
+    return {"items": [_serialize(e) for e in items], "next_cursor": next_cursor}
+
+
+async def export_audit_logs_ndjson(filters: Dict[str, Any]) -> AsyncIterator[str]:
+    """Stream matching entries from every tier as newline-delimited JSON for compliance pulls."""
+    tiers = await _tiers(filters)
+    archived_through = max((newest for _, newest in tiers[1:]), default=None)
+    # Hot entries this old may also sit in an archive (crashed archive run); export those once
+    exported = set()
+    for collection, _ in tiers:
+        async for entry in audit_repo.iter_matching(filters, collection=collection):
+            if entry["_id"] in exported:
+                continue
+            if collection == audit_repo.HOT_COLLECTION and archived_through and entry["timestamp"] <= archived_through:
+                exported.add(entry["_id"])
+            yield json.dumps(_serialize(entry), default=str) + "\n"
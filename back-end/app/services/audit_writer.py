@@ -0,0 +1,172 @@
+"""
+Buffered audit writer.
+Mutations enqueue audit entries; a background task persists them with
+insert_many when AUDIT_BATCH_SIZE entries are waiting or every
+AUDIT_FLUSH_INTERVAL_MS, whichever comes first.
+
+Durability:
+- stop() (called from the app lifespan) flushes everything still buffered.
+- When the writer is not running (scripts, tests, startup) entries are
+  written synchronously, exactly as before.
+- Callers can always force a synchronous write for critical actions.
+- Entries carry their _id, so a retried batch is idempotent: rows rejected
+  as duplicate keys were written by an earlier attempt. Rows the server
+  rejects for any other non-transient reason are logged and dropped.
+- enqueue() never waits on the database. Above AUDIT_BUFFER_MAX (database
+  unreachable for a while) new entries are not buffered but written to the
+  log instead. Both drops are counted in audit_entries_dropped_total.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from pymongo.errors import BulkWriteError
+
+from app.core.config import settings
+from app.core.metrics import AUDIT_DROPPED
+from app.repositories import audit_repo
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY = 11000
+# Server errors worth retrying (pymongo's retryable write codes)
+TRANSIENT_ERRORS = {6, 7, 64, 89, 91, 189, 262, 9001, 10107, 11600, 11602, 13435, 13436}
+
+
+class AuditWriter:
+    """In-process audit buffer flushed by a background task."""
+
+    def __init__(self, batch_size: int, flush_interval_ms: int, max_buffer: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_buffer = max_buffer
+        self._buffer: List[Dict[str, Any]] = []
+        self._overflowed = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> "AuditWriter":
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    async def stop(self) -> None:
+        """Stop the background task and flush whatever is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self._buffer:
+            logger.error(f"{len(self._buffer)} audit entries could not be written at shutdown")
+            for entry in self._buffer:
+                logger.error("Audit entry not written", extra={"audit_entry": entry})
+
+    def enqueue(self, entry: Dict[str, Any]) -> None:
+        """Buffer one entry for the background task. Never waits on the database."""
+        if len(self._buffer) >= self.max_buffer:
+            # Flushes keep failing; bound memory and keep the entry in the log instead
+            AUDIT_DROPPED.inc(("overflow",))
+            if not self._overflowed:
+                logger.error(f"Audit buffer full ({len(self._buffer)} entries), logging new entries until it drains")
+            self._overflowed += 1
+            logger.warning("Audit entry not buffered", extra={"audit_entry": entry})
+            return
+        if self._overflowed:
+            logger.warning(f"Audit buffer has room again; {self._overflowed} entries went to the log only")
+            self._overflowed = 0
+        self._buffer.append(entry)
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """Write all buffered entries. Returns how many were written."""
+        written = 0
+        async with self._flush_lock:
+            while self._buffer:
+                batch = self._buffer[:self.batch_size]
+                try:
+                    await audit_repo.insert_audit_logs(batch)
+                except BulkWriteError as e:
+                    done, retry = self._settle(batch, e)
+                    # The batch is still at the front: only what needs another attempt stays
+                    self._buffer[:len(batch)] = retry
+                    written += done
+                    if retry:
+                        break
+                    continue
+                except Exception as e:
+                    # Keep the entries for the next attempt; the server may be briefly unavailable
+                    logger.error(f"Audit flush of {len(batch)} entries failed: {e}")
+                    break
+                del self._buffer[:len(batch)]
+                written += len(batch)
+        return written
+
+    def _settle(self, batch: List[Dict[str, Any]], error: BulkWriteError):
+        """
+        Sort a partially failed unordered insert into (rows now stored, rows to retry).
+        Rows without a write error were inserted; duplicate keys were inserted by
+        an earlier attempt; other errors are permanent and the row is dropped.
+        """
+        retry, dropped = [], 0
+        for err in error.details.get("writeErrors", []):
+            code = err.get("code")
+            if code == DUPLICATE_KEY:
+                continue
+            entry = batch[err["index"]]
+            if code in TRANSIENT_ERRORS:
+                retry.append(entry)
+                continue
+            dropped += 1
+            AUDIT_DROPPED.inc(("rejected",))
+            logger.error(
+                f"Audit entry rejected by the server (code {code}): {err.get('errmsg')}",
+                extra={"audit_entry": entry},
+            )
+        if retry:
+            logger.error(f"Audit flush: {len(retry)} of {len(batch)} entries will be retried")
+        return len(batch) - len(retry) - dropped, retry
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+
+_writer: Optional[AuditWriter] = None
+
+
+def get_audit_writer() -> Optional[AuditWriter]:
+    """The running writer, or None when audit entries should be written inline."""
+    return _writer if _writer is not None and _writer.running else None
+
+
+def start_audit_writer() -> Optional[AuditWriter]:
+    """Start the app-wide writer if buffering is enabled. Called from the lifespan."""
+    global _writer
+    if settings.AUDIT_BUFFER_ENABLED and get_audit_writer() is None:
+        _writer = AuditWriter(
+            settings.AUDIT_BATCH_SIZE,
+            settings.AUDIT_FLUSH_INTERVAL_MS,
+            settings.AUDIT_BUFFER_MAX,
+        ).start()
+    return get_audit_writer()
+
+
+async def stop_audit_writer() -> None:
+    global _writer
+    if _writer is not None:
+        await _writer.stop()
+        _writer = None
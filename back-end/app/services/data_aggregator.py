@@ -1,105 +1,207 @@
 """
 Data Aggregation Service for Report Generation
 Collects and aggregates data from MongoDB for AI analysis
+
+Each section is a single $facet pipeline over its collection, and
+aggregate_all_data runs the sections concurrently. Which physical collection
+backs a logical one (volunteers_master vs the legacy volunteers) is resolved
+at startup and cached once the preferred collection has data. An optional date_range {"start", "end"} (either
+bound may be None) restricts every section to documents created / events
+scheduled inside it.
 """
 
-from typing import Dict, Optional, List
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
 from datetime import datetime, timedelta
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from bson import ObjectId
+
+logger = logging.getLogger(__name__)
+
+# Logical name -> candidate collections; the first non-empty one wins
+COLLECTION_CANDIDATES: Dict[str, tuple] = {
+    "volunteers": ("volunteers_master", "volunteers"),
+}
+
+# Fields that hold the creation time of a volunteer (current and legacy layouts)
+VOLUNTEER_DATE_FIELDS = ("audit.created_at", "created_at", "createdAt")
+
+_resolved_collections: Dict[str, str] = {}
+_resolve_lock = asyncio.Lock()
+
+
+async def resolve_collections(db) -> Dict[str, str]:
+    """
+    Pick the backing collection for each logical name.
+    Called at startup; a preferred (non-empty) collection is cached and reused
+    by every aggregator. The legacy fallback is not cached, so the check runs
+    again on the next report and picks up a master collection filled since.
+    """
+    resolved = {}
+    async with _resolve_lock:
+        for logical, candidates in COLLECTION_CANDIDATES.items():
+            if logical in _resolved_collections:
+                resolved[logical] = _resolved_collections[logical]
+                continue
+            chosen = candidates[-1]
+            for name in candidates[:-1]:
+                if await db[name].find_one({}, {"_id": 1}) is not None:
+                    chosen = name
+                    _resolved_collections[logical] = chosen
+                    logger.info(f"Report data source for {logical}: {chosen}")
+                    break
+            resolved[logical] = chosen
+    return resolved
+
+
+async def warm_collection_cache(db) -> None:
+    """Startup hook: resolve collections now; on failure retry lazily on first report."""
+    try:
+        await resolve_collections(db)
+    except Exception as e:
+        logger.warning(f"Could not resolve report collections at startup: {e}")
+
+
+def reset_collection_cache() -> None:
+    _resolved_collections.clear()
+
+
+def date_range_match(fields, date_range: Optional[Dict]) -> Dict:
+    """$match body restricting any of `fields` to the range; {} when unbounded"""
+    bounds = {}
+    if date_range:
+        if date_range.get("start"):
+            bounds["$gte"] = date_range["start"]
+        if date_range.get("end"):
+            bounds["$lte"] = date_range["end"]
+    if not bounds:
+        return {}
+    if len(fields) == 1:
+        return {fields[0]: bounds}
+    return {"$or": [{field: dict(bounds)} for field in fields]}
+
+
+def event_overlap_match(date_range: Optional[Dict]) -> Dict:
+    """$match body for calendar events overlapping the range; {} when unbounded"""
+    match = {}
+    if date_range:
+        if date_range.get("start"):
+            match["end"] = {"$gte": date_range["start"]}
+        if date_range.get("end"):
+            match["start"] = {"$lte": date_range["end"]}
+    return match
+
+
+def _gender_match(value: str) -> Dict:
+    return {"$or": [
+        {"gender": value},
+        {"pre_screening.gender": value},
+        {"basic_info.gender": value}
+    ]}
+
+
+def _count(facet: Dict[str, List[Dict]], name: str) -> int:
+    rows = facet.get(name) or []
+    return rows[0]["n"] if rows else 0
+
+
+def volunteer_pipeline(date_range: Optional[Dict], now: datetime) -> List[Dict]:
+    thirty_days_ago = now - timedelta(days=30)
+    pipeline = []
+    match = date_range_match(VOLUNTEER_DATE_FIELDS, date_range)
+    if match:
+        pipeline.append({"$match": match})
+    pipeline.append({"$facet": {
+        "total": [{"$count": "n"}],
+        "male": [{"$match": _gender_match("Male")}, {"$count": "n"}],
+        "female": [{"$match": _gender_match("Female")}, {"$count": "n"}],
+        "recent": [
+            {"$match": date_range_match(VOLUNTEER_DATE_FIELDS, {"start": thirty_days_ago})},
+            {"$count": "n"}
+        ],
+        "age": [{
+            "$bucket": {
+                "groupBy": "$age",
+                "boundaries": [18, 25, 35, 45, 55, 100],
+                "default": "Unknown",
+                "output": {"count": {"$sum": 1}}
+            }
+        }],
+    }})
+    return pipeline
+
+
+def study_pipeline(date_range: Optional[Dict], now: datetime) -> List[Dict]:
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(seconds=1)
+    pipeline = []
+    match = event_overlap_match(date_range)
+    if match:
+        pipeline.append({"$match": match})
+    pipeline.append({"$facet": {
+        "total": [{"$count": "n"}],
+        "upcoming": [{"$match": {"start": {"$gt": now}}}, {"$count": "n"}],
+        "ongoing": [{"$match": {"start": {"$lte": now}, "end": {"$gte": now}}}, {"$count": "n"}],
+        "completed": [{"$match": {"end": {"$lt": now}}}, {"$count": "n"}],
+        "this_month": [{"$match": {"start": {"$gte": month_start, "$lte": month_end}}}, {"$count": "n"}],
+        "assigned": [{"$group": {
+            "_id": None,
+            "total_male": {"$sum": "$male_count"},
+            "total_female": {"$sum": "$female_count"},
+            "total_volunteers": {"$sum": {"$add": ["$male_count", "$female_count"]}}
+        }}],
+    }})
+    return pipeline
+
 
 class DataAggregator:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
-    
+
+    async def _collection(self, logical: str):
+        name = _resolved_collections.get(logical)
+        if name is None:
+            # Startup resolution failed, or only the legacy fallback had data
+            name = (await resolve_collections(self.db))[logical]
+        return self.db[name]
+
+    async def _facet(self, collection, pipeline: List[Dict]) -> Dict[str, Any]:
+        rows = await collection.aggregate(pipeline).to_list(1)
+        return rows[0] if rows else {}
+
     async def get_volunteer_statistics(self, date_range: Optional[Dict] = None) -> Dict:
         """Aggregate volunteer statistics"""
         try:
-            # Try volunteers_master first (actual collection name), fall back to volunteers
-            try:
-                volunteer_collection = self.db["volunteers_master"]
-                test_count = await volunteer_collection.count_documents({})
-                if test_count == 0:
-                    # Try alternative name
-                    volunteer_collection = self.db["volunteers"]
-            except:
-                volunteer_collection = self.db["volunteers"]
-            
+            volunteer_collection = await self._collection("volunteers")
             pre_screening = self.db["pre_screenings"]
-            
-            # Build date filter if provided
-            date_filter = {}
-            if date_range:
-                start_date = date_range.get("start")
-                end_date = date_range.get("end")
-                if start_date and end_date:
-                    date_filter["created_at"] = {"$gte": start_date, "$lte": end_date}
-            
-            # Get all volunteers
-            all_volunteers = await volunteer_collection.count_documents({})
-            
-            # Get pre-screening volunteers
-            pre_screening_count = await pre_screening.count_documents({})
-            
-            # Get approved volunteers (those in main volunteers collection)
+
+            facet, pre_screening_count = await asyncio.gather(
+                self._facet(volunteer_collection, volunteer_pipeline(date_range, datetime.now())),
+                pre_screening.count_documents(date_range_match(("created_at",), date_range)),
+            )
+
+            all_volunteers = _count(facet, "total")
+            # Approved volunteers are those in the main volunteers collection
             approved_count = all_volunteers
-            
-            # Get volunteers by gender - try multiple field names
-            male_count = await volunteer_collection.count_documents({"$or": [
-                {"gender": "Male"},
-                {"pre_screening.gender": "Male"},
-                {"basic_info.gender": "Male"}
-            ]})
-            female_count = await volunteer_collection.count_documents({"$or": [
-                {"gender": "Female"},
-                {"pre_screening.gender": "Female"},
-                {"basic_info.gender": "Female"}
-            ]})
-            
-            # Get recent enrollments (last 30 days)
-            thirty_days_ago = datetime.now() - timedelta(days=30)
-            recent_enrollments = await volunteer_collection.count_documents({
-                "$or": [
-                    {"createdAt": {"$gte": thirty_days_ago}},
-                    {"created_at": {"$gte": thirty_days_ago}}
-                ]
-            })
-            
-            # Get volunteers by age groups
-            age_distribution = []
-            try:
-                age_pipeline = [
-                    {
-                        "$bucket": {
-                            "groupBy": "$age",
-                            "boundaries": [18, 25, 35, 45, 55, 100],
-                            "default": "Unknown",
-                            "output": {"count": {"$sum": 1}}
-                        }
-                    }
-                ]
-                age_distribution = await volunteer_collection.aggregate(age_pipeline).to_list(None)
-            except:
-                pass
-            
+
             # Calculate conversion rate
             total_applicants = pre_screening_count + approved_count
             conversion_rate = (approved_count / total_applicants * 100) if total_applicants > 0 else 0
-            
+
             return {
                 "total_volunteers": all_volunteers,
                 "pre_screening": pre_screening_count,
                 "approved": approved_count,
-                "male_count": male_count,
-                "female_count": female_count,
-                "recent_enrollments_30days": recent_enrollments,
+                "male_count": _count(facet, "male"),
+                "female_count": _count(facet, "female"),
+                "recent_enrollments_30days": _count(facet, "recent"),
                 "conversion_rate_percentage": round(conversion_rate, 2),
-                "age_distribution": age_distribution,
+                "age_distribution": facet.get("age", []),
                 "total_applicants": total_applicants
             }
         except Exception as e:
             # Return empty stats if database access fails
-            print(f"Error fetching volunteer statistics: {str(e)}")
+            logger.error(f"Error fetching volunteer statistics: {str(e)}")
             return {
                 "total_volunteers": 0,
                 "pre_screening": 0,
@@ -112,89 +214,30 @@ class DataAggregator:
                 "total_applicants": 0,
                 "error": "Unable to fetch volunteer data"
             }
-    
+
     async def get_study_metrics(self, date_range: Optional[Dict] = None) -> Dict:
         """Aggregate study/calendar metrics"""
         try:
-            calendar_collection = self.db["calendar_events"]
-            
-            # Get all studies
-            all_studies = await calendar_collection.count_documents({})
-            
-            # Get studies by status
-            now = datetime.now()
-            
-            # Upcoming studies (start date in future)
-            upcoming_pipeline = [
-                {"$match": {"start": {"$gt": now}}},
-                {"$count": "count"}
-            ]
-            
-            # Ongoing studies (start date passed but end date not reached)
-            ongoing_pipeline = [
-                {"$match": {
-                    "start": {"$lte": now},
-                    "end": {"$gte": now}
-                }},
-                {"$count": "count"}
-            ]
-            
-            # Completed studies (end date passed)
-            completed_pipeline = [
-                {"$match": {"end": {"$lt": now}}},
-                {"$count": "count"}
-            ]
-            
-            upcoming_result = await calendar_collection.aggregate(upcoming_pipeline).to_list(None)
-            ongoing_result = await calendar_collection.aggregate(ongoing_pipeline).to_list(None)
-            completed_result = await calendar_collection.aggregate(completed_pipeline).to_list(None)
-            
-            upcoming_count = upcoming_result[0]["count"] if upcoming_result else 0
-            ongoing_count = ongoing_result[0]["count"] if ongoing_result else 0
-            completed_count = completed_result[0]["count"] if completed_result else 0
-            
-            # Get total volunteers assigned across all studies
-            total_assigned_pipeline = [
-                {"$group": {
-                    "_id": None,
-                    "total_male": {"$sum": "$male_count"},
-                    "total_female": {"$sum": "$female_count"},
-                    "total_volunteers": {"$sum": {"$add": ["$male_count", "$female_count"]}}
-                }}
-            ]
-            
-            assigned_result = await calendar_collection.aggregate(total_assigned_pipeline).to_list(None)
-            
-            total_assigned = 0
-            total_male_assigned = 0
-            total_female_assigned = 0
-            if assigned_result:
-                total_assigned = assigned_result[0].get("total_volunteers", 0)
-                total_male_assigned = assigned_result[0].get("total_male", 0)
-                total_female_assigned = assigned_result[0].get("total_female", 0)
-            
-            # Get studies this month
-            month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(seconds=1)
-            
-            studies_this_month = await calendar_collection.count_documents({
-                "start": {"$gte": month_start, "$lte": month_end}
-            })
-            
+            facet = await self._facet(self.db["calendar_events"], study_pipeline(date_range, datetime.now()))
+
+            all_studies = _count(facet, "total")
+            completed_count = _count(facet, "completed")
+            assigned = (facet.get("assigned") or [{}])[0]
+
             return {
                 "total_studies": all_studies,
-                "upcoming_studies": upcoming_count,
-                "ongoing_studies": ongoing_count,
+                "upcoming_studies": _count(facet, "upcoming"),
+                "ongoing_studies": _count(facet, "ongoing"),
                 "completed_studies": completed_count,
-                "studies_this_month": studies_this_month,
-                "total_volunteers_assigned": total_assigned,
-                "male_assigned": total_male_assigned,
-                "female_assigned": total_female_assigned,
+                "studies_this_month": _count(facet, "this_month"),
+                "total_volunteers_assigned": assigned.get("total_volunteers", 0),
+                "male_assigned": assigned.get("total_male", 0),
+                "female_assigned": assigned.get("total_female", 0),
                 "completion_rate_percentage": round((completed_count / all_studies * 100), 2) if all_studies > 0 else 0
             }
         except Exception as e:
             # Return empty metrics if database access fails
-            print(f"Error fetching study metrics: {str(e)}")
+            logger.error(f"Error fetching study metrics: {str(e)}")
             return {
                 "total_studies": 0,
                 "upcoming_studies": 0,
@@ -207,20 +250,20 @@ class DataAggregator:
                 "completion_rate_percentage": 0,
                 "error": "Unable to fetch study data"
             }
-    
+
     async def get_calendar_summary(self, days_ahead: int = 30) -> Dict:
         """Get calendar summary for upcoming period"""
         try:
             calendar_collection = self.db["calendar_events"]
-            
+
             now = datetime.now()
             future_date = now + timedelta(days=days_ahead)
-            
+
             # Get upcoming events
             upcoming_events = await calendar_collection.find({
                 "start": {"$gte": now, "$lte": future_date}
             }).sort("start", 1).limit(10).to_list(None)
-            
+
             # Format events for AI
             formatted_events = []
             for event in upcoming_events:
@@ -231,7 +274,7 @@ class DataAggregator:
                     "volunteers_needed": event.get("male_count", 0) + event.get("female_count", 0),
                     "remarks": event.get("remarks", "")
                 })
-            
+
             return {
                 "upcoming_events_count": len(upcoming_events),
                 "next_events": formatted_events,
@@ -239,20 +282,22 @@ class DataAggregator:
             }
         except Exception as e:
             # Return empty calendar if database access fails
-            print(f"Error fetching calendar summary: {str(e)}")
+            logger.error(f"Error fetching calendar summary: {str(e)}")
             return {
                 "upcoming_events_count": 0,
                 "next_events": [],
                 "days_ahead": days_ahead,
                 "error": "Unable to fetch calendar data"
             }
-    
+
     async def aggregate_all_data(self, date_range: Optional[Dict] = None) -> Dict:
-        """Aggregate all data for comprehensive report"""
-        volunteer_stats = await self.get_volunteer_statistics(date_range)
-        study_metrics = await self.get_study_metrics(date_range)
-        calendar_summary = await self.get_calendar_summary()
-        
+        """Aggregate all data for comprehensive report (sections run concurrently)"""
+        volunteer_stats, study_metrics, calendar_summary = await asyncio.gather(
+            self.get_volunteer_statistics(date_range),
+            self.get_study_metrics(date_range),
+            self.get_calendar_summary(),
+        )
+
         return {
             "generated_at": datetime.now().isoformat(),
             "date_range": date_range,
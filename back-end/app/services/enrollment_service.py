@@ -9,7 +9,8 @@ from app.core.invariants import is_immutable_field, is_valid_transition, Volunte
 from app.core.logging import AuditAction
 from app.utils.id_generation import generate_unique_subject_code
 from app.repositories import volunteer_repo, counter_repo, audit_repo
-from app.services import audit_service
+from app.repositories.person_keys_repo import DRAFT, MASTER
+from app.services import audit_service, identity_service
 from app.db.client import db
 
 
@@ -45,10 +46,21 @@ async def convert_field_draft_to_master(
          full_name = f"{basic_info.get('first_name', '')} {basic_info.get('middle_name', '')} {basic_info.get('surname', '')}"
          basic_info["name"] = " ".join(full_name.split())
 
+    volunteer_id = str(uuid.uuid4())  # Generates internal ID
+    draft_id = field_visit_data.get("_id", field_visit_data.get("id"))
+
+    # Take over the draft's identity keys; raises DuplicateIdentity if another
+    # volunteer already owns the contact
+    await identity_service.reserve(
+        MASTER, volunteer_id,
+        contacts=[field_visit_data.get("contact"), field_visit_data.get("contact_number")],
+        replace_types=(DRAFT,),
+    )
+
     volunteer_data = {
-        "volunteer_id": str(uuid.uuid4()), # Generates internal ID
+        "volunteer_id": volunteer_id,
         "subject_code": subject_code,      # Generates human-readable ID
-        "field_visit_ref": str(field_visit_data.get("_id", field_visit_data.get("id"))),
+        "field_visit_ref": str(draft_id),
         "created_by": user_id,
         "created_at": datetime.utcnow(),
         "basic_info": basic_info, # Contains {first_name, surname, name (clubbed), location...}
@@ -66,7 +78,13 @@ async def convert_field_draft_to_master(
     }
 
     # Step 3: Persist to master collection
-    master_id = await volunteer_repo.create(volunteer_data)
+    try:
+        master_id = await volunteer_repo.create(volunteer_data)
+    except Exception:
+        await identity_service.release(MASTER, volunteer_id)
+        raise
+    if draft_id:
+        await identity_service.release(DRAFT, draft_id)
 
     # Step 4: Write audit log
     await audit_service.write_audit_log(
@@ -0,0 +1,278 @@
+"""
+Identity keys for duplicate detection.
+
+Every field visit draft and volunteer master record owns its normalized contact
+and ID proof keys in person_keys (see person_keys_repo). A duplicate check for
+any combination of values is one indexed `$in` lookup, instead of a find_one per
+collection, field and spelling. Because the key is the document _id, two
+concurrent creates for the same person cannot both win.
+
+Owners:
+    draft  - field_visits, owner id is the draft's _id (str)
+    master - volunteers_master, owner id is volunteer_id
+
+A master claiming a key held by a draft takes it over (draft -> master is the
+normal path); any other foreign owner raises DuplicateIdentity.
+
+Existing records are indexed once with:
+    python -m app.services.identity_service --backfill
+
+Until that has completed (it leaves a marker document), keys missing from
+person_keys are also looked up on volunteers_master and field_visits
+directly, so records created before the index existed are still found.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo.errors import BulkWriteError
+
+from app.core.domain_errors import DuplicateIdentity
+from app.db.client import db
+from app.db.query_policy import search_db
+from app.repositories import person_keys_repo
+from app.repositories.person_keys_repo import CONTACT, DRAFT, ID_PROOF, MASTER, identity_keys, key_kind
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY = 11000
+BACKFILL_BATCH_SIZE = 1000
+
+# Records that own identity keys: (owner type, collection, contact fields, ID proof fields)
+RECORD_SOURCES = (
+    (MASTER, "volunteers_master", ("contact", "contact_number", "basic_info.contact"), ("id_proof_number",)),
+    (DRAFT, "field_visits", ("contact", "contact_number"), ()),
+)
+RECORD_PROJECTION = {
+    "volunteer_id": 1, "contact": 1, "contact_number": 1, "basic_info.contact": 1, "id_proof_number": 1,
+}
+FALLBACK_LIMIT = 50
+
+_backfilled = False
+
+
+def find_conflict(
+    owners: Dict[str, Dict[str, Any]],
+    owner_type: str,
+    owner_id: str,
+    replace_types: Iterable[str] = (),
+) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """First (key, owner) held by someone the caller may not take it from."""
+    replace_types = tuple(replace_types)
+    for key, owner in owners.items():
+        if owner.get("type") == owner_type and owner.get("id") == owner_id:
+            continue
+        if owner.get("type") in replace_types:
+            continue
+        return key, owner
+    return None
+
+
+def duplicate_error(key: str, owner: Dict[str, Any]) -> DuplicateIdentity:
+    kind = key_kind(key)
+    label = "contact number" if kind == CONTACT else "ID proof number"
+    where = "a field visit draft" if owner.get("type") == DRAFT else "a registered volunteer"
+    return DuplicateIdentity(
+        f"This {label} already belongs to {where}",
+        kind=kind,
+        owner_type=owner.get("type"),
+        owner_id=owner.get("id"),
+    )
+
+
+def record_owner(owner_type: str, doc: Dict[str, Any]) -> Optional[str]:
+    return doc.get("volunteer_id") if owner_type == MASTER else str(doc["_id"])
+
+
+def record_keys(doc: Dict[str, Any]) -> List[str]:
+    """Keys a volunteers_master or field_visits document owns."""
+    contacts = [doc.get("contact"), doc.get("contact_number"), (doc.get("basic_info") or {}).get("contact")]
+    return identity_keys(contacts, [doc.get("id_proof_number")])
+
+
+def record_keys_after(doc: Dict[str, Any], set_fields: Dict[str, Any]) -> List[str]:
+    """Keys a record owns once the `$set` paths in `set_fields` are applied."""
+    basic_info = doc.get("basic_info") or {}
+    return record_keys({
+        "contact": set_fields.get("contact", doc.get("contact")),
+        "contact_number": set_fields.get("contact_number", doc.get("contact_number")),
+        "basic_info": {"contact": set_fields.get("basic_info.contact", basic_info.get("contact"))},
+        "id_proof_number": set_fields.get("id_proof_number", doc.get("id_proof_number")),
+    })
+
+
+async def index_is_complete() -> bool:
+    """True once a backfill has finished; remembered for the life of the process."""
+    global _backfilled
+    if not _backfilled:
+        _backfilled = await person_keys_repo.is_backfilled()
+    return _backfilled
+
+
+async def _unindexed_owners(keys: List[str], raw_values: Iterable[Any] = ()) -> Dict[str, Dict[str, Any]]:
+    """
+    {key: owner} found on the records themselves, for keys person_keys does not
+    hold. Pre-index records match on their stored spelling, so both the
+    normalized values and the values as entered are looked up.
+    """
+    if not keys or await index_is_complete():
+        return {}
+    values = {CONTACT: set(), ID_PROOF: set()}
+    for key in keys:
+        kind, value = key.split(":", 1)
+        values[kind].add(value)
+    raw = [str(v).strip() for v in raw_values if v]
+    for kind in values:
+        if values[kind]:
+            values[kind].update(raw)
+
+    owners: Dict[str, Dict[str, Any]] = {}
+    # Masters first, so that they, not drafts, are reported for a shared key
+    for owner_type, collection, contact_fields, id_proof_fields in RECORD_SOURCES:
+        clauses = [{field: {"$in": sorted(values[CONTACT])}} for field in contact_fields if values[CONTACT]]
+        clauses += [{field: {"$in": sorted(values[ID_PROOF])}} for field in id_proof_fields if values[ID_PROOF]]
+        if not clauses:
+            continue
+        cursor = search_db[collection].find({"$or": clauses}, RECORD_PROJECTION).limit(FALLBACK_LIMIT)
+        async for doc in cursor:
+            owner_id = record_owner(owner_type, doc)
+            for key in record_keys(doc):
+                if owner_id and key in keys and key not in owners:
+                    owners[key] = {"type": owner_type, "id": owner_id}
+    return owners
+
+
+async def find_owners(keys: List[str], raw_values: Iterable[Any] = ()) -> Dict[str, Dict[str, Any]]:
+    """{key: owner} for the keys that are taken, in the index or (before the backfill) on a record."""
+    owners = await person_keys_repo.find_owners(keys)
+    missing = [key for key in keys if key not in owners]
+    if missing:
+        owners.update(await _unindexed_owners(missing, raw_values))
+    return owners
+
+
+async def find_duplicates(contacts: Iterable[Any] = (), id_proofs: Iterable[Any] = ()) -> Dict[str, Dict[str, Any]]:
+    """{key: owner} for every given value that is already taken."""
+    contacts, id_proofs = list(contacts), list(id_proofs)
+    return await find_owners(identity_keys(contacts, id_proofs), contacts + id_proofs)
+
+
+async def ensure_available(
+    keys: List[str],
+    owner_type: str,
+    owner_id: str,
+    replace_types: Iterable[str] = (),
+    raw_values: Iterable[Any] = (),
+) -> None:
+    """Raise DuplicateIdentity if any key is held by a foreign owner."""
+    conflict = find_conflict(await find_owners(keys, raw_values), owner_type, owner_id, replace_types)
+    if conflict:
+        raise duplicate_error(*conflict)
+
+
+def is_duplicate_key_error(exc: BulkWriteError) -> bool:
+    return any(err.get("code") == DUPLICATE_KEY for err in exc.details.get("writeErrors", []))
+
+
+async def reserve(
+    owner_type: str,
+    owner_id: str,
+    contacts: Iterable[Any] = (),
+    id_proofs: Iterable[Any] = (),
+    replace_types: Iterable[str] = (),
+) -> List[str]:
+    """
+    Claim the keys for the owner before its record is written.
+    Returns the claimed keys. Raises DuplicateIdentity (nothing is left claimed).
+    """
+    contacts, id_proofs = list(contacts), list(id_proofs)
+    keys = identity_keys(contacts, id_proofs)
+    if not keys:
+        return keys
+    await ensure_available(keys, owner_type, owner_id, replace_types, contacts + id_proofs)
+
+    ops = person_keys_repo.claim_ops(keys, owner_type, owner_id, datetime.utcnow(), replace_types)
+    try:
+        await person_keys_repo.bulk_write(ops)
+    except BulkWriteError as exc:
+        if not is_duplicate_key_error(exc):
+            raise
+        # Lost a race for at least one key: undo the keys taken by this call
+        upserted = [row["_id"] for row in exc.details.get("upserted", [])]
+        await person_keys_repo.delete_keys(upserted, owner_type, owner_id)
+        conflict = find_conflict(await person_keys_repo.find_owners(keys), owner_type, owner_id, replace_types)
+        if conflict:
+            raise duplicate_error(*conflict) from exc
+        raise
+    return keys
+
+
+async def release(owner_type: str, owner_id: str) -> None:
+    """Drop every key owned by a record (draft deleted, insert failed, ...)."""
+    await person_keys_repo.release(owner_type, str(owner_id))
+
+
+# ============ Backfill ============
+async def _claim_batch(batch: List[Any]) -> int:
+    """Write a batch of claims; returns how many keys were already held by another owner."""
+    if not batch:
+        return 0
+    try:
+        await person_keys_repo.bulk_write(batch)
+    except BulkWriteError as exc:
+        errors = exc.details.get("writeErrors", [])
+        if any(err.get("code") != DUPLICATE_KEY for err in errors):
+            raise
+        return len(errors)
+    return 0
+
+
+async def backfill() -> Dict[str, int]:
+    """
+    Index existing records. Masters go first so that they, not drafts, own a
+    shared key. Safe to re-run: existing claims by the same owner are no-ops.
+    Records the backfill marker when done.
+    """
+    counts = {MASTER: 0, DRAFT: 0, "collisions": 0}
+    now = datetime.utcnow()
+    for owner_type, collection, _, _ in RECORD_SOURCES:
+        batch = []
+        async for doc in db[collection].find({}, RECORD_PROJECTION):
+            owner_id = record_owner(owner_type, doc)
+            if not owner_id:
+                continue
+            batch.extend(person_keys_repo.claim_ops(record_keys(doc), owner_type, owner_id, now))
+            counts[owner_type] += 1
+            if len(batch) >= BACKFILL_BATCH_SIZE:
+                counts["collisions"] += await _claim_batch(batch)
+                batch = []
+        counts["collisions"] += await _claim_batch(batch)
+    # Duplicate checks stop falling back to the records once this exists
+    await person_keys_repo.mark_backfilled(now)
+    logger.info(f"person_keys backfill: {counts}")
+    return counts
+
+
+# ============ CLI ============
+async def _main():
+    from app.db.client import close_db
+
+    try:
+        counts = await backfill()
+    finally:
+        await close_db()
+    print(f"[OK] Indexed {counts[MASTER]} volunteers and {counts[DRAFT]} drafts")
+    if counts["collisions"]:
+        print(f"[WARN] {counts['collisions']} keys already belonged to another record (duplicates to review)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Maintain the person_keys identity index.")
+    parser.add_argument("--backfill", action="store_true", help="Index all existing volunteers and field drafts")
+    args = parser.parse_args()
+    if not args.backfill:
+        parser.error("nothing to do (use --backfill)")
+    asyncio.run(_main())
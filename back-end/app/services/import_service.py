@@ -1,10 +1,14 @@
 
+import logging
 import pandas as pd
 import re
 from datetime import datetime
 from pymongo import UpdateOne
+from app.core.normalization import study_code_key
 from app.db import db
 
+logger = logging.getLogger(__name__)
+
 # ================= UTILS =================
 def clean_string(val):
     if pd.isna(val):
@@ -57,7 +61,7 @@ async def process_legacy_excel(file_content: bytes):
         if sheet in IGNORED_SHEETS:
             continue
             
-        print(f"Processing Study: {sheet}...")
+        logger.info(f"Processing Study: {sheet}...")
         
         # 1. Register Study
         code, name = normalize_study_name(sheet)
@@ -127,6 +131,7 @@ async def process_legacy_excel(file_content: bytes):
                     "study_code": code,
                     "study_name": name
                 },
+                "study_code_key": study_code_key(code),
                 "clinical_info": {
                     "date": clinical_date,
                     "sex": sex,
@@ -0,0 +1,101 @@
+"""
+Prompt data compaction.
+Turns aggregated report data into a compact, token-budgeted JSON string before
+it is embedded in an AI prompt:
+
+- one pass over the data (no separate datetime-serialization copy)
+- floats rounded, datetimes shortened to the minute, long strings clipped
+- lists cut to their first N items with a count of what was dropped
+- empty values and volatile keys (generated_at) removed
+- no indentation or spaces between separators
+
+Each report type has a hard token budget. Compaction gets progressively
+tighter until the data fits; as a last resort the text is truncated.
+"""
+import json
+import math
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Tuple
+
+# Conservative for compact JSON (digits and punctuation tokenize densely)
+CHARS_PER_TOKEN = 3.0
+
+# Hard budget for the data section of each report type's prompt
+REPORT_TOKEN_BUDGETS: Dict[str, int] = {
+    "overall_summary": 1500,
+    "volunteer_insights": 800,
+    "study_performance": 1000,
+    "custom": 1500,
+}
+DEFAULT_TOKEN_BUDGET = 1000
+
+# Keys that carry no information for the model
+_DROPPED_KEYS = {"generated_at"}
+
+# (max list items, max string length, float decimals), loosest first
+_LEVELS: Tuple[Tuple[int, int, int], ...] = (
+    (10, 200, 2),
+    (5, 120, 1),
+    (3, 60, 1),
+    (1, 30, 0),
+)
+
+TRUNCATION_MARK = "...(truncated)"
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap upper-leaning token estimate; no tokenizer dependency."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def compact(value: Any, top_n: int = 10, max_str: int = 200, decimals: int = 2) -> Any:
+    """Compact copy of `value` (see module docstring)."""
+    if isinstance(value, dict):
+        out = {}
+        for key, item in value.items():
+            if key in _DROPPED_KEYS:
+                continue
+            item = compact(item, top_n, max_str, decimals)
+            if item is None or item == "" or item == [] or item == {}:
+                continue
+            out[key] = item
+        return out
+    if isinstance(value, (list, tuple)):
+        items = [compact(item, top_n, max_str, decimals) for item in value[:top_n]]
+        if len(value) > top_n:
+            items.append({"more": len(value) - top_n})
+        return items
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, float):
+        rounded = round(value, decimals)
+        return int(rounded) if rounded.is_integer() else rounded
+    if isinstance(value, datetime):
+        return value.isoformat(timespec="minutes")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, str):
+        if len(value) > 16 and value[4:5] == "-" and value[10:11] == "T":
+            return value[:16]  # ISO datetime string -> minutes
+        return value if len(value) <= max_str else value[:max_str] + "..."
+    return value
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def budget_for(report_type: Optional[str]) -> int:
+    return REPORT_TOKEN_BUDGETS.get(report_type or "", DEFAULT_TOKEN_BUDGET)
+
+
+def compact_for_prompt(data: Any, report_type: Optional[str] = None, budget: Optional[int] = None) -> str:
+    """Compact JSON of `data` that fits the report type's token budget."""
+    budget = budget or budget_for(report_type)
+    text = ""
+    for top_n, max_str, decimals in _LEVELS:
+        text = _dumps(compact(data, top_n, max_str, decimals))
+        if estimate_tokens(text) <= budget:
+            return text
+    max_chars = int(budget * CHARS_PER_TOKEN) - len(TRUNCATION_MARK)
+    return text[:max(max_chars, 0)] + TRUNCATION_MARK
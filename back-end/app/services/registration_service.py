@@ -0,0 +1,264 @@
+"""
+Registration workflow (PATCH /registration/{volunteer_id}).
+
+The request is turned into a write plan, {collection: [pymongo write ops]}, with
+at most one merged $set per document. Participation and assignment rows are
+upserts, so the plan can be built from two concurrent reads. The plan is then
+applied inside one transaction, so a failed registration leaves nothing
+half-written:
+
+    reads:  master + prescreening form, then clinical_studies ($in)
+    writes: volunteers_master, prescreening_forms, registration_forms,
+            clinical_participation (bulk), assigned_studies (bulk),
+            person_keys (when contact / ID proof change)
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pymongo import DeleteMany, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.core.domain_errors import VolunteerNotFound
+from app.core.normalization import canonical_fields, study_code_key
+from app.db.client import db
+from app.db.session import run_in_transaction
+from app.repositories import person_keys_repo
+from app.repositories.person_keys_repo import DRAFT, MASTER
+from app.services import identity_service
+
+logger = logging.getLogger(__name__)
+
+# Order the plan is applied in
+PLAN_COLLECTIONS = (
+    "volunteers_master",
+    "prescreening_forms",
+    "registration_forms",
+    "clinical_participation",
+    "assigned_studies",
+    "person_keys",
+)
+
+
+def _volunteer_ref(data, master: Dict[str, Any], prescreening: Optional[Dict[str, Any]], now: datetime) -> Dict[str, Any]:
+    """Denormalized volunteer details for participation/assignment rows."""
+    if prescreening:
+        age = data.age
+        if not age:
+            age = "N/A"
+            dob = prescreening.get("dob")
+            if dob:
+                try:
+                    age = now.year - int(dob.split('-')[0])
+                except (ValueError, AttributeError):
+                    age = "N/A"
+        return {
+            "name": prescreening.get("name"),
+            "contact": prescreening.get("contact"),
+            "location": prescreening.get("field_area", prescreening.get("address", "Unknown")),
+            "sex": prescreening.get("gender", "N/A"),
+            "age": age,
+        }
+
+    basic_info = master.get("basic_info", {})
+    return {
+        "name": basic_info.get("name", "Unknown"),
+        "contact": master.get("contact", "N/A"),
+        "location": basic_info.get("field_area", "Unknown"),
+        "sex": basic_info.get("gender", basic_info.get("sex", "N/A")),
+        "age": data.age if data.age else basic_info.get("age", "N/A"),
+    }
+
+
+def identity_keys_after(data, master: Dict[str, Any]) -> Optional[List[str]]:
+    """The volunteer's identity keys after this registration, or None if unchanged."""
+    if not (data.contact or data.id_proof_number):
+        return None
+    return person_keys_repo.identity_keys(
+        [data.contact or master.get("contact")],
+        [data.id_proof_number or master.get("id_proof_number")],
+    )
+
+
+def build_registration_plan(
+    volunteer_id: str,
+    data,
+    master: Dict[str, Any],
+    prescreening: Optional[Dict[str, Any]],
+    studies_by_code: Dict[str, Dict[str, Any]],
+    recruiter_name: str,
+    now: datetime,
+) -> Dict[str, List[Any]]:
+    """
+    Every write a registration needs, grouped per collection.
+    Pure function: all reads happen before, all writes after.
+    """
+    # Correct three-stage workflow: prescreening → screening (on fit) → approved (manual)
+    # If fit: move to screening, if unfit: reject
+    status_val = "screening" if data.fit_status == "yes" else "rejected"
+    plan: Dict[str, List[Any]] = {name: [] for name in PLAN_COLLECTIONS}
+
+    master_set = {
+        "current_stage": "registered",
+        "current_status": status_val,
+        "audit.updated_at": now,
+        "audit.updated_by": recruiter_name,
+    }
+    prescreening_set = {}
+    if data.gender:
+        master_set["basic_info.gender"] = data.gender
+        prescreening_set["gender"] = data.gender
+    if data.dob:
+        master_set["basic_info.dob"] = data.dob
+        prescreening_set["dob"] = data.dob
+    if data.contact:
+        master_set["contact"] = data.contact
+        master_set["basic_info.contact"] = data.contact
+        prescreening_set["contact"] = data.contact
+    if data.address:
+        master_set["basic_info.address"] = data.address
+        prescreening_set["address"] = data.address
+    if data.id_proof_type:
+        master_set["id_proof_type"] = data.id_proof_type
+    if data.id_proof_number:
+        master_set["id_proof_number"] = data.id_proof_number
+
+    master_set.update(canonical_fields(master_set))
+    plan["volunteers_master"].append(UpdateOne({"volunteer_id": volunteer_id}, {"$set": master_set}))
+
+    # Identity index: claim the new keys, drop the ones they replace
+    keys = identity_keys_after(data, master)
+    if keys is not None:
+        plan["person_keys"].extend(
+            person_keys_repo.claim_ops(keys, MASTER, volunteer_id, now, replace_types=(DRAFT,))
+        )
+        plan["person_keys"].append(person_keys_repo.release_op(MASTER, volunteer_id, keep=keys))
+    if prescreening_set:
+        plan["prescreening_forms"].append(UpdateOne(
+            {"volunteer_id": volunteer_id},
+            {"$set": {**prescreening_set, "audit.updated_at": now}},
+        ))
+
+    # Upsert in case of re-registration attempts
+    plan["registration_forms"].append(UpdateOne(
+        {"volunteer_id": volunteer_id},
+        {"$set": {
+            "volunteer_id": volunteer_id,
+            **data.dict(),
+            "audit": {"created_at": now, "created_by": recruiter_name},
+        }},
+        upsert=True,
+    ))
+
+    # Participation: drop studies no longer assigned, upsert the rest
+    plan["clinical_participation"].append(DeleteMany({
+        "volunteer_id": volunteer_id,
+        "study.study_code": {"$nin": data.study_assigned},
+    }))
+    if not data.study_assigned:
+        return plan
+
+    # Details as they will be after this registration's prescreening update
+    updated_prescreening = {**prescreening, **prescreening_set} if prescreening else None
+    ref = _volunteer_ref(data, master, updated_prescreening, now)
+    fitness = "fit" if data.fit_status == "yes" else "unfit"
+    assignment_status = "assigned" if status_val == "screening" else "rejected"
+    has_contact = bool(ref["contact"]) and ref["contact"] != "N/A"
+
+    for study_code in data.study_assigned:
+        study_info = studies_by_code.get(study_code)
+        study_name = study_info["study_name"] if study_info else study_code
+
+        plan["clinical_participation"].append(UpdateOne(
+            {"volunteer_id": volunteer_id, "study.study_code": study_code},
+            {"$set": {
+                "volunteer_id": volunteer_id,
+                "volunteer_ref": ref,
+                "study": {"study_code": study_code, "study_name": study_name},
+                "study_code_key": study_code_key(study_code),
+                "status": status_val,
+                "date": data.date_of_registration,
+                "audit": {"updated_at": now, "recruiter": recruiter_name},
+            }},
+            upsert=True,
+        ))
+
+        # assigned_studies: refresh status on an existing assignment, create it otherwise
+        assignment_set = {
+            "fitness_status": fitness,
+            "status": assignment_status,
+            "remarks": data.remarks or "",
+            "updated_at": now,
+        }
+        on_insert = {
+            "visit_id": f"REG-{volunteer_id}-{study_code}",  # Simple unique ID
+            "assigned_by": recruiter_name,
+            "assignment_date": now,
+            "study_id": str(study_info.get("_id") if study_info else "manual"),
+            "study_name": study_name,
+            "study_code_key": study_code_key(study_code),
+            "volunteer_name": ref["name"] or "Unknown",
+            "volunteer_gender": ref["sex"],
+            "volunteer_location": ref["location"],
+            "created_at": now,
+        }
+        # Only overwrite contact on existing assignments when we have a real one
+        if has_contact:
+            assignment_set["volunteer_contact"] = ref["contact"]
+        else:
+            on_insert["volunteer_contact"] = ref["contact"] or "N/A"
+
+        plan["assigned_studies"].append(UpdateOne(
+            {"volunteer_id": volunteer_id, "study_code": study_code},
+            {"$set": assignment_set, "$setOnInsert": on_insert},
+            upsert=True,
+        ))
+
+    return plan
+
+
+async def apply_plan(plan: Dict[str, List[Any]], session=None) -> None:
+    """Send each collection's ops as one bulk_write, in PLAN_COLLECTIONS order."""
+    for name in PLAN_COLLECTIONS:
+        ops = plan.get(name)
+        if ops:
+            await db[name].bulk_write(ops, ordered=True, session=session)
+
+
+async def register_volunteer(volunteer_id: str, data, recruiter_name: str) -> str:
+    """
+    Apply a registration update atomically. Returns the new status.
+    Raises VolunteerNotFound if the volunteer is not in volunteers_master,
+    DuplicateIdentity if the new contact / ID proof belongs to someone else.
+    """
+    master, prescreening = await asyncio.gather(
+        db.volunteers_master.find_one({"volunteer_id": volunteer_id}),
+        db.prescreening_forms.find_one({"volunteer_id": volunteer_id}),
+    )
+    if not master:
+        raise VolunteerNotFound(f"Volunteer '{volunteer_id}' not found")
+
+    keys = identity_keys_after(data, master)
+    if keys:
+        await identity_service.ensure_available(keys, MASTER, volunteer_id, replace_types=(DRAFT,))
+
+    studies_by_code = {}
+    if data.study_assigned:
+        async for study in db.clinical_studies.find(
+            {"study_code": {"$in": list(data.study_assigned)}},
+            {"study_code": 1, "study_name": 1},
+        ):
+            studies_by_code.setdefault(study["study_code"], study)
+
+    plan = build_registration_plan(
+        volunteer_id, data, master, prescreening, studies_by_code, recruiter_name, datetime.utcnow()
+    )
+    try:
+        await run_in_transaction(lambda session: apply_plan(plan, session))
+    except BulkWriteError as exc:
+        # Another record claimed one of the keys since the pre-check; nothing was committed
+        if keys and identity_service.is_duplicate_key_error(exc):
+            await identity_service.ensure_available(keys, MASTER, volunteer_id, replace_types=(DRAFT,))
+        raise
+    return "screening" if data.fit_status == "yes" else "rejected"
@@ -0,0 +1,135 @@
+"""
+AI report cache.
+A report is identified by its type, date range, custom prompt, the AI model and a
+fingerprint of the aggregated raw_data, so a summary is reused only while the
+underlying numbers are unchanged.
+
+Two tiers:
+- in-process LRU (instant, per worker)
+- report_cache collection shared by all workers, expired by a TTL index on expires_at
+
+Honors ENABLE_REPORT_CACHING and REPORT_CACHE_DURATION (seconds).
+"""
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from pymongo.errors import PyMongoError
+
+from app.core.config import settings
+from app.db.client import db
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "report_cache"
+
+# Keys whose values change on every aggregation without the data changing
+_VOLATILE_KEYS = {"generated_at"}
+
+
+def _strip_volatile(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _strip_volatile(v) for k, v in value.items() if k not in _VOLATILE_KEYS}
+    if isinstance(value, list):
+        return [_strip_volatile(v) for v in value]
+    return value
+
+
+def fingerprint(raw_data: Dict[str, Any]) -> str:
+    """Stable hash of aggregated data, ignoring generation timestamps."""
+    canonical = json.dumps(_strip_volatile(raw_data), sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def report_cache_key(
+    report_type: str,
+    date_range: Optional[Dict[str, Any]],
+    custom_prompt: Optional[str],
+    raw_data: Dict[str, Any],
+    model: str,
+) -> str:
+    prompt = (custom_prompt or "").strip().lower()
+    parts = {
+        "type": report_type,
+        "range": {k: v.isoformat() if v else None for k, v in (date_range or {}).items()},
+        "prompt": hashlib.sha256(prompt.encode()).hexdigest() if prompt else None,
+        "data": fingerprint(raw_data),
+        "model": model,
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+
+class _LRU:
+    """Small in-process LRU with per-entry expiry (monotonic clock)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        item = self._items.get(key)
+        if item is None:
+            return None
+        summary, expires = item
+        if expires < time.monotonic():
+            del self._items[key]
+            return None
+        self._items.move_to_end(key)
+        return summary
+
+    def put(self, key: str, summary: str, ttl: float) -> None:
+        self._items[key] = (summary, time.monotonic() + ttl)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+
+_lru = _LRU(settings.REPORT_CACHE_MAX_ENTRIES)
+
+
+async def get_cached_summary(key: str) -> Optional[str]:
+    """Cached summary for a key, or None."""
+    if not settings.ENABLE_REPORT_CACHING:
+        return None
+    summary = _lru.get(key)
+    if summary is not None:
+        return summary
+    try:
+        doc = await db[COLLECTION].find_one({"_id": key, "expires_at": {"$gt": datetime.utcnow()}})
+    except PyMongoError as e:
+        logger.warning(f"Report cache lookup failed: {e}")
+        return None
+    if not doc:
+        return None
+    remaining = (doc["expires_at"] - datetime.utcnow()).total_seconds()
+    _lru.put(key, doc["summary"], remaining)
+    return doc["summary"]
+
+
+async def store_summary(key: str, summary: str, report_type: str) -> None:
+    """Cache a freshly generated summary in both tiers."""
+    if not settings.ENABLE_REPORT_CACHING:
+        return
+    ttl = settings.REPORT_CACHE_DURATION
+    _lru.put(key, summary, ttl)
+    now = datetime.utcnow()
+    try:
+        await db[COLLECTION].replace_one(
+            {"_id": key},
+            {
+                "summary": summary,
+                "report_type": report_type,
+                "created_at": now,
+                "expires_at": now + timedelta(seconds=ttl),
+            },
+            upsert=True,
+        )
+    except PyMongoError as e:
+        logger.warning(f"Report cache write failed: {e}")
@@ -48,7 +48,8 @@ async def create_user(
             "username": username,
             "full_name": full_name,
             "role": role,
-        }
+        },
+        critical=True,  # Account changes are security-relevant
     )
 
     return user_id
@@ -76,7 +77,8 @@ async def disable_user(username: str, disabled_by: str) -> bool:
         entity_type="user",
         entity_id=username,
         user_id=disabled_by,
-        changes={"is_active": False}
+        changes={"is_active": False},
+        critical=True,
     )
 
     return True
@@ -104,7 +106,8 @@ async def enable_user(username: str, enabled_by: str) -> bool:
         entity_type="user",
         entity_id=username,
         user_id=enabled_by,
-        changes={"is_active": True}
+        changes={"is_active": True},
+        critical=True,
     )
 
     return True
@@ -132,7 +135,8 @@ async def update_user_role(username: str, new_role: str, updated_by: str) -> boo
         entity_type="user",
         entity_id=username,
         user_id=updated_by,
-        changes={"role": new_role}
+        changes={"role": new_role},
+        critical=True,
     )
 
     return True
@@ -0,0 +1,20 @@
+"""
+Benchmark and load-test tooling. Not imported by the application.
+
+    benchmarks.synthetic_data  - deterministic dataset generator
+    benchmarks.bench_endpoints - per-endpoint timings (pytest)
+    benchmarks.loadtest        - mixed concurrent traffic scenarios
+"""
+import os
+
+
+def use_bench_database() -> str:
+    """
+    Point the app at the benchmark database.
+    Must run before app.core.config is imported.
+    """
+    name = os.getenv("BENCH_DATABASE_NAME", "enrollment_bench")
+    os.environ["DATABASE_NAME"] = name
+    os.environ.setdefault("ENABLE_INDEX_SYNC", "true")
+    os.environ.setdefault("INDEX_SYNC_IN_BACKGROUND", "false")
+    return name
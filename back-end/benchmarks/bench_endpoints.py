@@ -0,0 +1,34 @@
+"""
+Endpoint benchmarks against the synthetic dataset.
+
+    python -m benchmarks.synthetic_data --scale 0.1
+    python -m pytest benchmarks/bench_endpoints.py -s
+
+The file is named bench_*.py so a plain `pytest` run never picks it up.
+"""
+import pytest
+
+from benchmarks.synthetic_data import EPOCH
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+CALENDAR_START = EPOCH.strftime("%Y-%m-%d")
+CALENDAR_END = EPOCH.replace(month=2).strftime("%Y-%m-%d")
+
+BENCHMARKS = [
+    ("dashboard_stats", "/api/v1/dashboard/stats"),
+    ("volunteer_stats", "/api/v1/volunteers/stats"),
+    ("volunteers_approved", "/api/v1/volunteers/approved"),
+    ("volunteers_approved_active", "/api/v1/volunteers/approved?study_id=ACTIVE_STUDIES"),
+    ("calendar_events", f"/api/v1/calendar-events?start={CALENDAR_START}&end={CALENDAR_END}"),
+    ("search_master", "/api/v1/volunteers/search/master?id=MUV2025001"),
+    ("export_attendance", "/api/v1/prm/attendance/export/BS00001"),
+    ("export_study_volunteers", "/api/v1/assigned-studies/export/BS00001"),
+    ("export_clinical", "/api/v1/dashboard/clinical/export?study_code=BS00001"),
+]
+
+
+@pytest.mark.parametrize("name,url", BENCHMARKS, ids=[b[0] for b in BENCHMARKS])
+async def test_endpoint(bench_app, recorder, name, url):
+    result = await recorder.measure(name, bench_app, "GET", url)
+    print(f"\n{name}: p50={result['p50_ms']}ms p95={result['p95_ms']}ms ({result['response_bytes']} bytes)")
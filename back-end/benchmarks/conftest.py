@@ -0,0 +1,56 @@
+"""
+Benchmark fixtures.
+
+The app is pointed at the benchmark database before it is imported, and is
+driven in-process through httpx's ASGI transport (no network, no uvicorn).
+Populate the database first with `python -m benchmarks.synthetic_data`.
+"""
+from benchmarks import use_bench_database
+
+# Must happen before app.core.config is imported anywhere
+use_bench_database()
+
+import httpx
+import pytest
+import pytest_asyncio
+from pymongo.errors import PyMongoError
+
+from benchmarks.runner import BenchmarkRecorder
+from benchmarks.synthetic_data import BENCH_DATABASE_NAME, BENCH_USERNAME
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def bench_app():
+    from app.core.security import create_access_token
+    from app.db import init_db
+    from app.db.client import db
+    from app.main import app
+
+    try:
+        await db.command("ping")
+        seeded = await db.volunteers_master.estimated_document_count()
+    except PyMongoError as e:
+        pytest.skip(f"MongoDB not reachable for benchmarks: {e}")
+    if not seeded:
+        pytest.skip(f"'{BENCH_DATABASE_NAME}' is empty; run python -m benchmarks.synthetic_data first")
+
+    await init_db()
+    token = create_access_token(data={"sub": BENCH_USERNAME})
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport,
+        base_url="http://bench",
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=None,
+    ) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def recorder():
+    recorder = BenchmarkRecorder()
+    yield recorder
+    if recorder.results:
+        path = recorder.save()
+        print(f"\n[OK] Benchmark results written to {path}")
+        print(recorder.comparison_table())
@@ -0,0 +1,285 @@
+"""
+Load-test scenarios modelling a clinic rush hour.
+
+Drives the app in-process (httpx ASGI transport) with concurrent virtual users
+whose mix matches real usage:
+
+    front_desk_checkin   bulk check-in / check-out of arriving volunteers (writes
+                         attendance records into the benchmark database)
+    front_desk_search    volunteer lookups at the desk
+    prm_calendar         PRM staff browsing the visit calendar
+    recruiter_dashboard  recruiters polling dashboard stats
+    exporter             one or two large Excel exports running alongside
+
+Because the app shares this process's event loop, a lag probe measures how
+long the loop is blocked while serving the traffic - the number that matters
+most for an async server.
+
+    python -m benchmarks.synthetic_data --scale 0.1
+    python -m benchmarks.loadtest --duration 60
+    python -m benchmarks.loadtest --duration 30 --users front_desk_checkin=20,exporter=0
+    python -m benchmarks.loadtest --dry-run            # print the mix and connection, run nothing
+
+Reports throughput and p50/p95/p99 per route plus loop lag, and saves them to
+benchmarks/results/load-<timestamp>-<commit>.json.
+"""
+from benchmarks import use_bench_database
+
+use_bench_database()
+
+import argparse
+import asyncio
+import random
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.runner import percentile, save_result
+from benchmarks.synthetic_data import BENCH_USERNAME, EPOCH
+
+
+@dataclass
+class Scenario:
+    """A kind of virtual user: how many run concurrently and how long they pause."""
+    name: str
+    users: int
+    think_time: float  # seconds between iterations
+    action: Callable[["LoadContext", random.Random], Awaitable[None]]
+
+
+class LoadContext:
+    """Shared client, reference data and latency samples for one run."""
+
+    def __init__(self, client: httpx.AsyncClient, volunteer_ids: List[str], study_codes: List[str]):
+        self.client = client
+        self.volunteer_ids = volunteer_ids
+        self.study_codes = study_codes
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def call(self, route: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        """Issue one request and record its latency under a route label."""
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[route] += 1
+            return None
+        self.samples[route].append((time.perf_counter() - start) * 1000)
+        if response.status_code >= 400:
+            self.errors[route] += 1
+        return response
+
+
+# ============ Scenario Actions ============
+async def front_desk_checkin(ctx: LoadContext, rng: random.Random):
+    batch = rng.sample(ctx.volunteer_ids, min(20, len(ctx.volunteer_ids)))
+    for action in ("IN", "OUT"):
+        await ctx.call(
+            "POST /volunteers/attendance/bulk-toggle", "POST",
+            "/api/v1/volunteers/attendance/bulk-toggle",
+            json={"volunteer_ids": batch, "action": action},
+        )
+
+
+async def front_desk_search(ctx: LoadContext, rng: random.Random):
+    volunteer_id = rng.choice(ctx.volunteer_ids)
+    await ctx.call("GET /volunteers/search/master", "GET", "/api/v1/volunteers/search/master",
+                   params={"id": volunteer_id})
+
+
+async def prm_calendar(ctx: LoadContext, rng: random.Random):
+    month = rng.randrange(1, 13)
+    start = EPOCH.replace(month=month)
+    end = start.replace(day=28)
+    await ctx.call("GET /calendar-events", "GET", "/api/v1/calendar-events",
+                   params={"start": start.strftime("%Y-%m-%d"), "end": end.strftime("%Y-%m-%d")})
+    await ctx.call("GET /calendar/metrics", "GET", "/api/v1/calendar/metrics")
+
+
+async def recruiter_dashboard(ctx: LoadContext, rng: random.Random):
+    await ctx.call("GET /dashboard/stats", "GET", "/api/v1/dashboard/stats")
+    await ctx.call("GET /volunteers/stats", "GET", "/api/v1/volunteers/stats")
+
+
+async def exporter(ctx: LoadContext, rng: random.Random):
+    study_code = rng.choice(ctx.study_codes)
+    await ctx.call("GET /prm/attendance/export/{study_code}", "GET",
+                   f"/api/v1/prm/attendance/export/{study_code}")
+    await ctx.call("GET /assigned-studies/export/{study_code}", "GET",
+                   f"/api/v1/assigned-studies/export/{study_code}")
+
+
+DEFAULT_SCENARIOS = [
+    Scenario("front_desk_checkin", users=10, think_time=2.0, action=front_desk_checkin),
+    Scenario("front_desk_search", users=8, think_time=1.0, action=front_desk_search),
+    Scenario("prm_calendar", users=4, think_time=3.0, action=prm_calendar),
+    Scenario("recruiter_dashboard", users=6, think_time=5.0, action=recruiter_dashboard),
+    Scenario("exporter", users=2, think_time=10.0, action=exporter),
+]
+
+
+# ============ Runner ============
+async def _virtual_user(ctx: LoadContext, scenario: Scenario, seed: int, deadline: float):
+    rng = random.Random(seed)
+    # Stagger start so users don't fire in lockstep
+    await asyncio.sleep(rng.uniform(0, scenario.think_time))
+    while time.perf_counter() < deadline:
+        await scenario.action(ctx, rng)
+        await asyncio.sleep(rng.uniform(0.5, 1.5) * scenario.think_time)
+
+
+async def _measure_loop_lag(samples: List[float], stop: asyncio.Event, interval: float = 0.01):
+    """Record how late each wake-up is; lateness = time the loop was blocked."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, (loop.time() - expected) * 1000))
+
+
+def _stats(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50), 2),
+        "p95_ms": round(percentile(samples, 95), 2),
+        "p99_ms": round(percentile(samples, 99), 2),
+        "max_ms": round(max(samples), 2),
+    }
+
+
+async def run_load(scenarios: List[Scenario], duration: float, seed: int = 1) -> Dict:
+    """Run all scenarios concurrently for `duration` seconds and return the report."""
+    from app.core.security import create_access_token
+    from app.db import init_db
+    from app.db.client import close_db, db
+    from app.main import app
+
+    await init_db()
+    volunteer_ids = [d["volunteer_id"] async for d in db.volunteers_master.find(
+        {"current_status": "approved"}, {"volunteer_id": 1}).limit(5000)]
+    study_codes = [d["studyInstanceCode"] async for d in db.study_instances.find(
+        {}, {"studyInstanceCode": 1}).limit(200)]
+    if not volunteer_ids or not study_codes:
+        raise SystemExit("Benchmark database is empty; run python -m benchmarks.synthetic_data first")
+
+    token = create_access_token(data={"sub": BENCH_USERNAME})
+    lag_samples: List[float] = []
+    stop = asyncio.Event()
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://load",
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=None,
+        ) as client:
+            ctx = LoadContext(client, volunteer_ids, study_codes)
+            lag_task = asyncio.create_task(_measure_loop_lag(lag_samples, stop))
+            started = time.perf_counter()
+            deadline = started + duration
+            await asyncio.gather(*[
+                _virtual_user(ctx, scenario, seed * 1000 + i * 100 + n, deadline)
+                for i, scenario in enumerate(scenarios)
+                for n in range(scenario.users)
+            ])
+            elapsed = time.perf_counter() - started
+            stop.set()
+            await lag_task
+    finally:
+        await close_db()
+
+    routes = {}
+    for route, samples in sorted(ctx.samples.items()):
+        routes[route] = {
+            **_stats(samples),
+            "errors": ctx.errors.get(route, 0),
+            "throughput_rps": round(len(samples) / elapsed, 2),
+        }
+    total = sum(len(s) for s in ctx.samples.values())
+    return {
+        "duration_s": round(elapsed, 1),
+        "users": {s.name: s.users for s in scenarios},
+        "throughput_rps": round(total / elapsed, 2),
+        "routes": routes,
+        "loop_lag": _stats(lag_samples),
+    }
+
+
+def format_report(report: Dict) -> str:
+    lines = [
+        f"{'route':44} {'reqs':>6} {'err':>4} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8}",
+    ]
+    for route, r in report["routes"].items():
+        lines.append(
+            f"{route:44} {r['count']:>6} {r['errors']:>4} {r['throughput_rps']:>7.2f} "
+            f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f}"
+        )
+    lag = report["loop_lag"]
+    lines.append(f"\nTotal throughput: {report['throughput_rps']} req/s over {report['duration_s']}s")
+    if lag["count"]:
+        lines.append(
+            f"Event-loop lag: p50={lag['p50_ms']}ms p99={lag['p99_ms']}ms max={lag['max_ms']}ms"
+        )
+    return "\n".join(lines)
+
+
+def describe_plan(scenarios: List[Scenario], duration: float) -> Dict:
+    """What a run would do, without touching the database (--dry-run)."""
+    from app.core.config import settings
+    from app.db.client import build_client_options
+
+    options = build_client_options()
+    return {
+        "database": settings.DATABASE_NAME,
+        "tls": options["tls"],
+        "duration_s": duration,
+        "scenarios": {
+            s.name: {
+                "users": s.users,
+                "think_time_s": s.think_time,
+                # Each user pauses ~think_time between iterations
+                "approx_iterations": int(s.users * duration / s.think_time),
+            }
+            for s in scenarios
+        },
+    }
+
+
+def _apply_user_overrides(scenarios: List[Scenario], overrides: str) -> List[Scenario]:
+    """--users name=N,name=N adjusts concurrency; N=0 disables a scenario."""
+    counts = {}
+    for part in filter(None, overrides.split(",")):
+        name, _, value = part.partition("=")
+        counts[name.strip()] = int(value)
+    unknown = set(counts) - {s.name for s in scenarios}
+    if unknown:
+        raise SystemExit(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+    return [
+        Scenario(s.name, counts.get(s.name, s.users), s.think_time, s.action)
+        for s in scenarios if counts.get(s.name, s.users) > 0
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run rush-hour load scenarios against the app.")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds to run")
+    parser.add_argument("--users", default="", help="Override users per scenario, e.g. exporter=1,prm_calendar=8")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--dry-run", action="store_true", help="Print the scenario mix and connection, then exit")
+    args = parser.parse_args()
+
+    scenarios = _apply_user_overrides(DEFAULT_SCENARIOS, args.users)
+    if args.dry_run:
+        plan = describe_plan(scenarios, args.duration)
+        print(f"database={plan['database']} tls={plan['tls']} duration={plan['duration_s']}s")
+        for name, s in plan["scenarios"].items():
+            print(f"  {name:22} users={s['users']:<3} think={s['think_time_s']}s ~{s['approx_iterations']} iterations")
+        raise SystemExit(0)
+    report = asyncio.run(run_load(scenarios, args.duration, args.seed))
+    print(format_report(report))
+    print(f"\n[OK] Results written to {save_result('load', report)}")
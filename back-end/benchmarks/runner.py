@@ -0,0 +1,130 @@
+"""
+Timing, result storage and comparison for the benchmark suite.
+
+Each run is saved as benchmarks/results/<kind>-<timestamp>-<commit>.json. The newest
+earlier result is used as the baseline for the comparison table, or compare
+any two files directly:
+
+    python -m benchmarks.runner results/a.json results/b.json
+"""
+import json
+import math
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    return {
+        "runs": len(samples_ms),
+        "min_ms": round(min(samples_ms), 2),
+        "p50_ms": round(percentile(samples_ms, 50), 2),
+        "p95_ms": round(percentile(samples_ms, 95), 2),
+        "max_ms": round(max(samples_ms), 2),
+        "mean_ms": round(statistics.fmean(samples_ms), 2),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class BenchmarkRecorder:
+    """Collects per-endpoint timings for one benchmark session."""
+
+    def __init__(self, warmup: int = 1, runs: int = 5):
+        self.warmup = warmup
+        self.runs = runs
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    async def measure(self, name: str, client, method: str, url: str, **kwargs) -> Dict[str, Any]:
+        """Time `runs` requests after `warmup` untimed ones; fails on non-2xx."""
+        for _ in range(self.warmup):
+            response = await client.request(method, url, **kwargs)
+            response.raise_for_status()
+
+        samples = []
+        size = 0
+        for _ in range(self.runs):
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            samples.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+            size = len(response.content)
+
+        result = {"method": method, "url": url, "response_bytes": size, **summarize(samples)}
+        self.results[name] = result
+        return result
+
+    def save(self) -> Path:
+        self._baseline = latest_result("bench")
+        return save_result("bench", {"results": self.results})
+
+    def comparison_table(self) -> str:
+        baseline = getattr(self, "_baseline", None)
+        return compare(load(baseline)["results"] if baseline else {}, self.results)
+
+
+def load(path: Path) -> Dict[str, Any]:
+    return json.loads(Path(path).read_text())
+
+
+def save_result(kind: str, payload: Dict[str, Any]) -> Path:
+    """Write a result file tagged with the current commit. Returns its path."""
+    RESULTS_DIR.mkdir(exist_ok=True)
+    commit = _git_commit()
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = RESULTS_DIR / f"{kind}-{stamp}-{commit}.json"
+    path.write_text(json.dumps({
+        "commit": commit,
+        "created_at": stamp,
+        "python": sys.version.split()[0],
+        **payload,
+    }, indent=2))
+    return path
+
+
+def latest_result(kind: str) -> Optional[Path]:
+    """Newest saved result of a kind ("bench" or "load"), if any."""
+    if not RESULTS_DIR.exists():
+        return None
+    files = sorted(RESULTS_DIR.glob(f"{kind}-*.json"))
+    return files[-1] if files else None
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> str:
+    """Plain-text table of p50/p95 with the change against a baseline run."""
+    lines = [f"{'benchmark':32} {'p50 ms':>10} {'p95 ms':>10} {'p50 vs base':>12}"]
+    for name, result in sorted(current.items()):
+        change = ""
+        base = baseline.get(name)
+        if base and base["p50_ms"]:
+            change = f"{(result['p50_ms'] - base['p50_ms']) / base['p50_ms'] * 100:+.1f}%"
+        lines.append(f"{name:32} {result['p50_ms']:>10.1f} {result['p95_ms']:>10.1f} {change:>12}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: python -m benchmarks.runner BASELINE.json CURRENT.json")
+        sys.exit(1)
+    print(compare(load(sys.argv[1])["results"], load(sys.argv[2])["results"]))
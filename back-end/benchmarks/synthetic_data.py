@@ -0,0 +1,302 @@
+"""
+Deterministic synthetic data generator for benchmarks.
+
+Populates a dedicated MongoDB database with realistic volumes shaped like the
+documents the API writes (volunteers_master, prescreening/registration forms,
+study instances and visits, assignments, attendance sessions). The same seed
+and scale always produce the same documents, so timings are comparable
+across commits.
+
+    python -m benchmarks.synthetic_data                # scale 1.0 into BENCH_DATABASE_NAME
+    python -m benchmarks.synthetic_data --scale 0.1    # 10k volunteers, 100k visits
+    python -m benchmarks.synthetic_data --drop         # wipe the bench DB first
+
+Scale 1.0 = 100k volunteers, 5k study instances, 1M visits.
+"""
+import argparse
+import asyncio
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.db.client import build_client_options
+
+DEFAULT_SEED = 42
+BENCH_DATABASE_NAME = os.getenv("BENCH_DATABASE_NAME", "enrollment_bench")
+BENCH_USERNAME = "bench_admin"
+BENCH_PASSWORD = "bench-password"
+
+# Base volumes at scale 1.0
+VOLUNTEERS = 100_000
+STUDY_INSTANCES = 5_000
+VISITS_PER_INSTANCE = 200
+ASSIGNMENTS_PER_INSTANCE = 20
+INSERT_BATCH = 5_000
+
+# All dates are relative to a fixed epoch so runs are reproducible
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+FIRST_NAMES = ["Rahul", "Priya", "Amit", "Sneha", "Vikram", "Anjali", "Rohan", "Pooja", "Arjun", "Kavya",
+               "Suresh", "Meera", "Karan", "Divya", "Nikhil", "Isha", "Manoj", "Ritu", "Sanjay", "Neha"]
+SURNAMES = ["Sharma", "Patel", "Kumar", "Singh", "Reddy", "Iyer", "Gupta", "Nair", "Joshi", "Mehta",
+            "Rao", "Das", "Verma", "Shah", "Pillai"]
+LOCATIONS = ["Andheri", "Bandra", "Borivali", "Dadar", "Thane", "Kurla", "Powai", "Vashi", "Malad", "Goregaon"]
+GENDERS = ["male", "female", "male", "female", "minor"]
+STUDY_TYPES = ["Patch Test", "Sun Protection", "Moisturizer", "Anti-Ageing", "Hair Care"]
+VISIT_LABELS = ["T0", "T1", "T2", "T7", "T14", "T21", "T28"]
+
+# (current_stage, current_status, weight)
+STAGE_MIX = [
+    ("pre_screening", "screening", 15),
+    ("pre_screening", "prescreening", 25),
+    ("registered", "approved", 55),
+    ("registered", "rejected", 5),
+]
+
+
+def scaled(base: int, scale: float) -> int:
+    return max(1, int(base * scale))
+
+
+def _volunteer_id(n: int) -> str:
+    return f"MUV{EPOCH.year}{n:06d}"
+
+
+def _contact(rng: random.Random) -> str:
+    return f"9{rng.randrange(100_000_000, 999_999_999)}"
+
+
+def generate_volunteers(rng: random.Random, count: int) -> Iterator[Dict[str, Dict[str, Any]]]:
+    """Yield {"master", "prescreening", "registration"?} document sets."""
+    stages = [s for s in STAGE_MIX for _ in range(s[2])]
+    for n in range(1, count + 1):
+        first, surname = rng.choice(FIRST_NAMES), rng.choice(SURNAMES)
+        gender = rng.choice(GENDERS)
+        location = rng.choice(LOCATIONS)
+        contact = _contact(rng)
+        dob = (EPOCH - timedelta(days=rng.randrange(18 * 365, 50 * 365))).strftime("%Y-%m-%d")
+        created_at = EPOCH - timedelta(days=rng.randrange(0, 730), minutes=rng.randrange(0, 1440))
+        stage, status, _ = rng.choice(stages)
+        volunteer_id = _volunteer_id(n)
+        name = f"{first} {surname}"
+
+        master = {
+            "volunteer_id": volunteer_id,
+            "subject_code": f"{first[:2].upper()}{surname[:2].upper()}{n % 1000:03d}",
+            "legacy_id": f"FVB{n:06d}" if n % 10 == 0 else None,
+            "current_stage": stage,
+            "current_status": status,
+            "basic_info": {
+                "first_name": first, "surname": surname, "name": name,
+                "contact": contact, "gender": gender, "is_minor": gender == "minor",
+                "dob": dob, "location": location, "field_area": location,
+            },
+            "contact": contact,
+            "field_area": location,
+            "audit": {"created_at": created_at, "updated_at": created_at, "updated_by": BENCH_USERNAME},
+        }
+        prescreening = {
+            "volunteer_id": volunteer_id,
+            "first_name": first, "surname": surname, "name": name,
+            "contact": contact, "gender": gender, "dob": dob,
+            "location": location, "field_area": location,
+            "recruiter": {"id": "bench", "name": BENCH_USERNAME},
+            "audit": {"created_at": created_at},
+        }
+        docs = {"master": master, "prescreening": prescreening}
+        if stage == "registered":
+            docs["registration"] = {
+                "volunteer_id": volunteer_id,
+                "gender": gender, "dob": dob, "contact": contact,
+                "study_assigned": [],
+                "audit": {"created_at": created_at + timedelta(days=3), "created_by": BENCH_USERNAME},
+            }
+        yield docs
+
+
+def generate_study_instances(rng: random.Random, count: int) -> List[Dict[str, Any]]:
+    instances = []
+    for n in range(1, count + 1):
+        start = EPOCH + timedelta(days=rng.randrange(-365, 180))
+        code = f"BS{n:05d}"
+        status = "COMPLETED" if start < EPOCH - timedelta(days=60) else (
+            "ONGOING" if start <= EPOCH else "UPCOMING")
+        instances.append({
+            "_id": ObjectId(f"{n:024x}"),
+            "studyID": f"STUDY-{n % 250:03d}",
+            "studyName": f"{rng.choice(STUDY_TYPES)} {n}",
+            "enteredStudyCode": code,
+            "studyInstanceCode": code,
+            "startDate": start.strftime("%Y-%m-%d"),
+            "volunteersPlanned": ASSIGNMENTS_PER_INSTANCE,
+            "genderRatio": {"male": 50, "female": 50},
+            "status": status,
+            "clientName": f"Client {n % 40}",
+            "createdAt": start - timedelta(days=14),
+        })
+    return instances
+
+
+def generate_visits(rng: random.Random, instances: List[Dict[str, Any]], per_instance: int) -> Iterator[Dict[str, Any]]:
+    for inst in instances:
+        start = datetime.strptime(inst["startDate"], "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        for i in range(per_instance):
+            planned = start + timedelta(days=i // 4)
+            yield {
+                "studyInstanceId": str(inst["_id"]),
+                "visitLabel": VISIT_LABELS[i % len(VISIT_LABELS)],
+                "visitType": "visit",
+                "plannedDate": planned,
+                "color": "purple",
+                "status": "COMPLETED" if planned < EPOCH else "UPCOMING",
+            }
+
+
+def generate_assignments(
+    rng: random.Random,
+    instances: List[Dict[str, Any]],
+    approved: List[Dict[str, Any]],
+    per_instance: int,
+) -> Iterator[Dict[str, Any]]:
+    seq = 0
+    for inst in instances:
+        for vol in rng.sample(approved, min(per_instance, len(approved))):
+            seq += 1
+            info = vol["basic_info"]
+            assigned_at = datetime.strptime(inst["startDate"], "%Y-%m-%d") - timedelta(days=2)
+            yield {
+                "visit_id": f"CV-{EPOCH.year}-{seq:07d}",
+                "assigned_by": BENCH_USERNAME,
+                "assignment_date": assigned_at,
+                "status": "assigned" if inst["status"] != "COMPLETED" else "completed",
+                "study_id": str(inst["_id"]),
+                "study_code": inst["studyInstanceCode"],
+                "study_name": inst["studyName"],
+                "start_date": inst["startDate"],
+                "volunteer_id": vol["volunteer_id"],
+                "volunteer_name": info["name"],
+                "volunteer_contact": info["contact"],
+                "volunteer_gender": info["gender"],
+                "volunteer_dob": info["dob"],
+                "volunteer_location": info["location"],
+                "fitness_status": rng.choice(["pending", "fit", "fit", "fit", "unfit"]),
+                "remarks": "",
+                "created_at": assigned_at,
+                "updated_at": assigned_at,
+            }
+
+
+def generate_attendance(rng: random.Random, assignment: Dict[str, Any], assigned_study_id: str) -> Dict[str, Any]:
+    """One attendance record with a few completed sessions."""
+    logs = []
+    day = assignment["assignment_date"] + timedelta(days=2)
+    for i in range(rng.randrange(1, 6)):
+        check_in = day + timedelta(days=i, hours=9, minutes=rng.randrange(0, 60))
+        check_out = check_in + timedelta(hours=rng.randrange(2, 8))
+        logs.append({
+            "check_in": check_in,
+            "check_out": check_out,
+            "duration_hours": round((check_out - check_in).total_seconds() / 3600, 2),
+            "logged_at": check_out,
+        })
+    return {
+        "volunteer_id": assignment["volunteer_id"],
+        "volunteer_name": assignment["volunteer_name"],
+        "assigned_study_id": assigned_study_id,
+        "study_code": assignment["study_code"],
+        "study_name": assignment["study_name"],
+        "is_active": False,
+        "check_in_time": logs[-1]["check_in"],
+        "check_out_time": logs[-1]["check_out"],
+        "attendance_logs": logs,
+        "created_at": assignment["assignment_date"],
+        "updated_at": logs[-1]["logged_at"],
+    }
+
+
+async def _insert_batched(collection, docs, batch_size: int = INSERT_BATCH) -> List[Any]:
+    ids = []
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            ids.extend((await collection.insert_many(batch, ordered=False)).inserted_ids)
+            batch = []
+    if batch:
+        ids.extend((await collection.insert_many(batch, ordered=False)).inserted_ids)
+    return ids
+
+
+async def populate(db, scale: float = 1.0, seed: int = DEFAULT_SEED) -> Dict[str, int]:
+    """Generate the full dataset into `db`. Returns document counts per collection."""
+    rng = random.Random(seed)
+    counts: Dict[str, int] = {}
+
+    await db.users.update_one(
+        {"username": BENCH_USERNAME},
+        {"$set": {
+            "username": BENCH_USERNAME,
+            "full_name": "Benchmark Admin",
+            "role": "game_master",
+            "hashed_password": get_password_hash(BENCH_PASSWORD),
+            "is_active": True,
+        }},
+        upsert=True,
+    )
+
+    masters, prescreens, registrations = [], [], []
+    for docs in generate_volunteers(rng, scaled(VOLUNTEERS, scale)):
+        masters.append(docs["master"])
+        prescreens.append(docs["prescreening"])
+        if "registration" in docs:
+            registrations.append(docs["registration"])
+    counts["volunteers_master"] = len(await _insert_batched(db.volunteers_master, masters))
+    counts["prescreening_forms"] = len(await _insert_batched(db.prescreening_forms, prescreens))
+    counts["registration_forms"] = len(await _insert_batched(db.registration_forms, registrations))
+    await db.counters.update_one({"_id": "volunteer_id"}, {"$set": {"seq": len(masters)}}, upsert=True)
+
+    instances = generate_study_instances(rng, scaled(STUDY_INSTANCES, scale))
+    counts["study_instances"] = len(await _insert_batched(db.study_instances, instances))
+    counts["study_visits"] = len(await _insert_batched(
+        db.study_visits, generate_visits(rng, instances, VISITS_PER_INSTANCE)
+    ))
+
+    approved = [m for m in masters if m["current_status"] == "approved"]
+    assignments = list(generate_assignments(rng, instances, approved, ASSIGNMENTS_PER_INSTANCE))
+    assignment_ids = await _insert_batched(db.assigned_studies, assignments)
+    counts["assigned_studies"] = len(assignment_ids)
+
+    # Roughly half of the assigned volunteers have attendance sessions
+    counts["volunteer_attendance"] = len(await _insert_batched(db.volunteer_attendance, (
+        generate_attendance(rng, a, str(_id))
+        for a, _id in zip(assignments, assignment_ids)
+        if rng.random() < 0.5
+    )))
+    return counts
+
+
+async def _main(scale: float, seed: int, drop: bool):
+    client = AsyncIOMotorClient(settings.MONGODB_URL, **build_client_options())
+    try:
+        if drop:
+            await client.drop_database(BENCH_DATABASE_NAME)
+        counts = await populate(client[BENCH_DATABASE_NAME], scale=scale, seed=seed)
+    finally:
+        client.close()
+    for collection, count in counts.items():
+        print(f"[OK] {collection}: {count}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Populate the benchmark database with synthetic data.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Volume multiplier (1.0 = 100k volunteers, 1M visits)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--drop", action="store_true", help="Drop the benchmark database first")
+    args = parser.parse_args()
+    asyncio.run(_main(args.scale, args.seed, args.drop))
@@ -0,0 +1,75 @@
+"""
+Shared batch-join helpers for migration scripts.
+
+Migrations process source rows in batches. For each batch:
+  1. collect every lookup key,
+  2. resolve them with ONE `$in` query into a dict (prefetch_map),
+  3. allocate any new sequential IDs in ONE counter update (allocate_id_block),
+  4. emit the resulting writes with ONE bulk_write per collection (flush_bulk).
+
+This replaces the per-row find_one / $inc round-trips the scripts used to do.
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Yield lists of at most `size` items from any iterable."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def prefetch_map(
+    collection,
+    field: str,
+    keys: Iterable[Any],
+    projection: Optional[Dict[str, Any]] = None,
+) -> Dict[Any, Dict[str, Any]]:
+    """
+    Resolve many keys in a single `$in` query.
+    Returns {key: document}. When several documents share a key the first one wins,
+    which matches the previous find_one() behaviour.
+    """
+    unique_keys = list({k for k in keys if k is not None})
+    if not unique_keys:
+        return {}
+
+    result = {}
+    cursor = collection.find({field: {"$in": unique_keys}}, projection)
+    async for doc in cursor:
+        result.setdefault(doc.get(field), doc)
+    return result
+
+
+async def allocate_id_block(counter_col, counter_id: str, count: int) -> List[int]:
+    """
+    Reserve `count` consecutive sequence numbers with one atomic $inc.
+    Returns the reserved numbers in ascending order.
+    """
+    if count <= 0:
+        return []
+
+    doc = await counter_col.find_one_and_update(
+        {"_id": counter_id},
+        {"$inc": {"seq": count}},
+        upsert=True,
+        return_document=True
+    )
+    last = doc["seq"]
+    return list(range(last - count + 1, last + 1))
+
+
+async def flush_bulk(collection, ops: list, ordered: bool = False) -> int:
+    """
+    Send queued write operations in one bulk_write call.
+    Returns the number of documents upserted or modified.
+    """
+    if not ops:
+        return 0
+    result = await collection.bulk_write(ops, ordered=ordered)
+    return result.upserted_count + result.modified_count + result.inserted_count
@@ -0,0 +1,135 @@
+"""
+Database Migration Script: Canonical Volunteer Fields
+=====================================================
+
+Writes the canonical fields that every volunteer write path now stores next
+to the raw values:
+
+- gender_norm  (male / female / minor / unknown) from basic_info.gender
+- status_norm  (lower-case, typo-corrected) from current_status
+- dob_date     (datetime) from basic_info.dob, else the pre-screening form's dob
+
+on volunteers_master, and gender_norm / dob_date on field_visits. Values come
+from app.core.normalization, the same code the API uses. Documents that are
+already up to date are skipped, so the script can be re-run at any time.
+
+Run this script ONCE after deploying the backend code changes, then run
+`python -m app.db.indexes` to build the new indexes.
+
+Usage:
+    python migrations/canonical_fields_migration.py
+    python migrations/canonical_fields_migration.py --dry-run
+"""
+
+import asyncio
+import os
+import sys
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+from batch_join import flush_bulk, prefetch_map
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.core.normalization import canonical_fields, parse_dob
+
+BATCH_SIZE = 1000
+
+MASTER_PROJECTION = {
+    "volunteer_id": 1, "basic_info.gender": 1, "basic_info.dob": 1, "current_status": 1,
+    "gender_norm": 1, "status_norm": 1, "dob_date": 1,
+}
+DRAFT_PROJECTION = {"basic_info.gender": 1, "basic_info.dob": 1, "gender_norm": 1, "dob_date": 1}
+
+
+def _source(doc: dict, with_status: bool) -> dict:
+    """The raw values canonical_fields() derives from, always present."""
+    basic_info = doc.get("basic_info") or {}
+    source = {"basic_info.gender": basic_info.get("gender"), "basic_info.dob": basic_info.get("dob")}
+    if with_status:
+        source["current_status"] = doc.get("current_status")
+    return source
+
+
+def pending_updates(doc: dict, with_status: bool = True, fallback_dob=None) -> dict:
+    """Canonical fields that are missing or stale on `doc`."""
+    wanted = canonical_fields(_source(doc, with_status))
+    if wanted["dob_date"] is None and fallback_dob:
+        wanted["dob_date"] = parse_dob(fallback_dob)
+    return {field: value for field, value in wanted.items() if field not in doc or doc[field] != value}
+
+
+async def _batches(cursor, size: int):
+    batch = []
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def backfill_collection(db, name: str, dry_run: bool) -> tuple:
+    """Returns (documents scanned, documents needing updates) for one collection."""
+    is_master = name == "volunteers_master"
+    collection = db[name]
+    projection = MASTER_PROJECTION if is_master else DRAFT_PROJECTION
+    scanned = changed = 0
+
+    async for batch in _batches(collection.find({}, projection), BATCH_SIZE):
+        scanned += len(batch)
+        prescreen = {}
+        if is_master:
+            # Legacy imports keep the DOB only on the pre-screening form
+            missing_dob = [d.get("volunteer_id") for d in batch if not (d.get("basic_info") or {}).get("dob")]
+            prescreen = await prefetch_map(db.prescreening_forms, "volunteer_id", missing_dob, {"volunteer_id": 1, "dob": 1})
+
+        ops = []
+        for doc in batch:
+            fallback = (prescreen.get(doc.get("volunteer_id")) or {}).get("dob")
+            updates = pending_updates(doc, with_status=is_master, fallback_dob=fallback)
+            if updates:
+                ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": updates}))
+        changed += len(ops)
+        if not dry_run:
+            await flush_bulk(collection, ops)
+    return scanned, changed
+
+
+async def migrate_canonical_fields(dry_run: bool = False):
+    print("=" * 70)
+    print("Starting Canonical Fields Migration" + (" (dry run)" if dry_run else ""))
+    print("=" * 70)
+
+    print(f"\nConnecting to MongoDB...")
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    db = client[settings.DATABASE_NAME]
+
+    try:
+        for name in ("volunteers_master", "field_visits"):
+            scanned, changed = await backfill_collection(db, name, dry_run)
+            verb = "would update" if dry_run else "updated"
+            print(f"✓ {name}: {scanned} scanned, {changed} {verb}")
+
+        unknown = await db.volunteers_master.count_documents({"gender_norm": "unknown"})
+        if unknown:
+            print(f"\n⚠ {unknown} volunteer(s) have an unrecognised gender value (gender_norm = 'unknown')")
+    except Exception as e:
+        print(f"\n✗ Error during migration: {e}")
+        raise
+    finally:
+        client.close()
+        print("\nDatabase connection closed.")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Backfill canonical volunteer fields')
+    parser.add_argument('--dry-run', action='store_true', help='Only report how many documents would change')
+    args = parser.parse_args()
+
+    asyncio.run(migrate_canonical_fields(dry_run=args.dry_run))
@@ -1,11 +1,18 @@
 import asyncio
 import argparse
+import os
+import sys
 import pandas as pd
 from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime
 import re
 from pymongo import UpdateOne
 
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.normalization import study_code_key
+
 # ================= CONFIG =================
 MONGODB_URL = "mongodb://localhost:27017"
 DATABASE_NAME = "live_enrollment_db"
@@ -165,6 +172,7 @@ async def migrate_data(file_path):
                     "study_code": code,
                     "study_name": name
                 },
+                "study_code_key": study_code_key(code),
                 "clinical_info": {
                     "date": clinical_date,
                     "sex": sex,
@@ -1,8 +1,17 @@
 import asyncio
+import os
+import sys
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo import UpdateOne
 from datetime import datetime
 
+from batch_join import prefetch_map, allocate_id_block, flush_bulk
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.normalization import canonical_fields, parse_dob
+
 # ================= CONFIG =================
 MONGO_URL = "mongodb://localhost:27017"
 
@@ -26,15 +35,7 @@ prescreen_col = live_db[PRESCREEN_COLLECTION]
 registration_col = live_db[REGISTRATION_COLLECTION]
 
 # ================= VOLUNTEER ID GENERATOR =================
-async def generate_volunteer_id(counter_col):
-    doc = await counter_col.find_one_and_update(
-        {"_id": "volunteer_id"},
-        {"$inc": {"seq": 1}},
-        upsert=True,
-        return_document=True
-    )
-    seq = doc["seq"]
-    year = datetime.utcnow().year
+def format_volunteer_id(seq, year):
     return f"VOL-{year}-{str(seq).zfill(6)}"
 
 # ================= MIGRATION =================
@@ -63,18 +64,29 @@ async def process_batch(records, counter_col):
 
     now = datetime.utcnow()
 
+    # Check which records were already migrated (one $in query per batch)
+    already_migrated = await prefetch_map(
+        master_col,
+        "legacy_id",
+        [legacy.get("uid") for legacy in records],
+        projection={"legacy_id": 1},
+    )
+
+    pending = []
+    seen = set()
     for legacy in records:
         legacy_uid = legacy.get("uid")
-
-        if not legacy_uid:
+        if not legacy_uid or legacy_uid in already_migrated or legacy_uid in seen:
             continue
+        seen.add(legacy_uid)
+        pending.append(legacy)
 
-        # Check if already migrated
-        exists = await master_col.find_one({"legacy_id": legacy_uid})
-        if exists:
-            continue
+    # Reserve all volunteer IDs for this batch in one counter update
+    sequences = await allocate_id_block(counter_col, "volunteer_id", len(pending))
 
-        volunteer_id = await generate_volunteer_id(counter_col)
+    for legacy, seq in zip(pending, sequences):
+        legacy_uid = legacy.get("uid")
+        volunteer_id = format_volunteer_id(seq, now.year)
 
         # ---------- MASTER ----------
         master_doc = {
@@ -98,6 +110,10 @@ async def process_batch(records, counter_col):
             }
         }
 
+        # Canonical gender/status; the DOB lives on the pre-screening form
+        master_doc.update(canonical_fields(master_doc))
+        master_doc["dob_date"] = parse_dob(legacy.get("personal_info", {}).get("dob"))
+
         master_ops.append(
             UpdateOne(
                 {"legacy_id": legacy_uid},
@@ -158,14 +174,11 @@ async def process_batch(records, counter_col):
             )
 
     # ---------- BULK WRITE ----------
-    if master_ops:
-        await master_col.bulk_write(master_ops, ordered=False)
-    if prescreen_ops:
-        await prescreen_col.bulk_write(prescreen_ops, ordered=False)
-    if registration_ops:
-        await registration_col.bulk_write(registration_ops, ordered=False)
-
-    print(f"Migrated batch of {len(records)} records")
+    await flush_bulk(master_col, master_ops)
+    await flush_bulk(prescreen_col, prescreen_ops)
+    await flush_bulk(registration_col, registration_ops)
+
+    print(f"Migrated batch of {len(records)} records ({len(pending)} new)")
 
 # ================= RUN =================
 if __name__ == "__main__":
@@ -1,12 +1,23 @@
 import asyncio
+import os
+import sys
 import pandas as pd
 from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime
 import re
+from pymongo import UpdateOne
+
+from batch_join import chunked, prefetch_map, flush_bulk
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.normalization import study_code_key
 
 MONGODB_URL = "mongodb://localhost:27017"
 DATABASE_NAME = "live_enrollment_db"
 EXCEL_FILE = "Clinical_data1.xlsx"
+BATCH_SIZE = 500
 
 # Sheets to ignore explicitly
 IGNORE_SHEETS = ['Sheet1', 'Study Updates']
@@ -58,7 +69,7 @@ async def import_studies():
         
         # 2. Read Data
         try:
-            df = pd.read_excel(EXCEL_FILE, sheet_name=sheet)
+            df = xl.parse(sheet)  # Reuse the opened workbook instead of re-reading the file
         except Exception as e:
             print(f"  Error reading sheet {sheet}: {e}")
             continue
@@ -66,7 +77,8 @@ async def import_studies():
         # Clean headers
         df.columns = [str(c).strip().replace('\n', ' ') for c in df.columns]
         
-        count = 0
+        # Parse every row first so demographics can be resolved in one query per batch
+        parsed_rows = []
         for _, row in df.iterrows():
             # Extract basic info
             name_val = str(row.get('Name', '')).strip()
@@ -97,62 +109,69 @@ async def import_studies():
                 status = 'approved'
             else:
                 status = 'pending'
-                
-            # Location/Demographics Lookup (Try to find in Master by Contact)
-            location = "Unknown"
-            sex = "N/A"
-            age = "N/A"
-            
-            if contact_val != "N/A":
-                master_rec = await db.volunteers_master.find_one({"contact": contact_val})
+
+            rejection = str(row.get('Reason of Rejection', '')) if pd.notna(row.get('Reason of Rejection')) else "N/A"
+            parsed_rows.append((name_val, contact_val, reg_date, status, rejection))
+
+        count = 0
+        for batch in chunked(parsed_rows, BATCH_SIZE):
+            # Location/Demographics Lookup (one $in query on Master by Contact)
+            masters = await prefetch_map(
+                db.volunteers_master,
+                "contact",
+                [contact for _, contact, _, _, _ in batch if contact != "N/A"],
+                projection={"volunteer_id": 1, "contact": 1, "basic_info": 1},
+            )
+
+            ops = []
+            for name_val, contact_val, reg_date, status, rejection in batch:
+                location = "Unknown"
+                sex = "N/A"
+                age = "N/A"
+                # Placeholder ID for volunteers not present in Master
+                v_id = "LEGACY_" + re.sub(r'[^A-Z0-9]', '', name_val)[:5] + "_" + contact_val[-4:]
+
+                master_rec = masters.get(contact_val) if contact_val != "N/A" else None
                 if master_rec:
                     basic = master_rec.get("basic_info", {})
                     location = basic.get("village_town_city", "Unknown")
                     sex = basic.get("sex", "N/A")
                     age = basic.get("age", "N/A")
-            
-            # Construct Doc
-            # ID generation strategy: VOL-{Last4Contact}-{code} to avoid collision but persistent? 
-            # Or just rely on upsert by contact+study
-            
-            # Using find_one to get existing ID if present, else generate generic?
-            # Actually, let's look up volunteer_id from master if matches, else create placeholder
-            v_id = "LEGACY_" + re.sub(r'[^A-Z0-9]', '', name_val)[:5] + "_" + contact_val[-4:]
-            
-            if contact_val != "N/A":
-                 master = await db.volunteers_master.find_one({"contact": contact_val})
-                 if master:
-                     v_id = master["volunteer_id"]
-            
-            doc = {
-                "volunteer_id": v_id,
-                "volunteer_ref": {
-                    "name": name_val,
-                    "contact": contact_val,
-                    "location": location,
-                    "sex": sex,
-                    "age": age
-                },
-                "study": {
-                    "study_code": study_code,
-                    "study_name": study_name
-                },
-                "status": status,
-                "date": reg_date,
-                "audit": {
-                    "recruiter": "Legacy Import",
-                    "updated_at": datetime.utcnow()
-                },
-                "rejection_reason": str(row.get('Reason of Rejection', '')) if pd.notna(row.get('Reason of Rejection')) else "N/A"
-            }
-            
-            # Upsert
-            await db.clinical_participation.update_one(
-                {"volunteer_ref.name": name_val, "study.study_code": study_code}, # Match by name + study for legacy consistency
-                {"$set": doc},
-                upsert=True
-            )
-            count += 1
+                    v_id = master_rec["volunteer_id"]
+
+                doc = {
+                    "volunteer_id": v_id,
+                    "volunteer_ref": {
+                        "name": name_val,
+                        "contact": contact_val,
+                        "location": location,
+                        "sex": sex,
+                        "age": age
+                    },
+                    "study": {
+                        "study_code": study_code,
+                        "study_name": study_name
+                    },
+                    "study_code_key": study_code_key(study_code),
+                    "status": status,
+                    "date": reg_date,
+                    "audit": {
+                        "recruiter": "Legacy Import",
+                        "updated_at": datetime.utcnow()
+                    },
+                    "rejection_reason": rejection
+                }
+
+                # Upsert - match by name + study for legacy consistency
+                ops.append(UpdateOne(
+                    {"volunteer_ref.name": name_val, "study.study_code": study_code},
+                    {"$set": doc},
+                    upsert=True
+                ))
+
+            # Ordered so repeated names within a sheet keep last-row-wins semantics
+            await flush_bulk(db.clinical_participation, ops, ordered=True)
+            count += len(ops)
             
         print(f"  -> Imported {count} records for {study_name}")
         total_imported += count
@@ -0,0 +1,100 @@
+"""
+Database Migration Script: study_code_key
+=========================================
+
+Study drill-downs match study codes on an indexed, upper-cased study_code_key
+instead of a case-insensitive anchored regex. New writes store the key; this
+script adds it to existing documents:
+
+- assigned_studies        from study_code
+- study_instances         from enteredStudyCode
+- clinical_participation  from study.study_code
+
+Keys come from app.core.normalization.study_code_key, the same code the API
+uses. Documents that already carry the right key are skipped, so the script
+can be re-run at any time.
+
+Run this script ONCE after deploying the backend code changes, then run
+`python -m app.db.indexes` to build the new indexes.
+
+Usage:
+    python migrations/study_code_key_migration.py
+    python migrations/study_code_key_migration.py --dry-run
+"""
+
+import asyncio
+import os
+import sys
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+from batch_join import flush_bulk
+
+# Add parent directory to path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.core.normalization import STUDY_CODE_SOURCES, study_code_key
+
+BATCH_SIZE = 1000
+
+# collection -> dotted path of the study code the key is derived from
+SOURCES = STUDY_CODE_SOURCES
+
+
+def _get(doc: dict, path: str):
+    for part in path.split("."):
+        doc = doc.get(part) if isinstance(doc, dict) else None
+    return doc
+
+
+async def backfill_collection(collection, source: str, dry_run: bool) -> tuple:
+    """Returns (documents scanned, documents needing updates) for one collection."""
+    scanned = changed = 0
+    ops = []
+    async for doc in collection.find({}, {source: 1, "study_code_key": 1}):
+        scanned += 1
+        key = study_code_key(_get(doc, source))
+        if "study_code_key" not in doc or doc["study_code_key"] != key:
+            ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"study_code_key": key}}))
+        if len(ops) >= BATCH_SIZE:
+            changed += len(ops)
+            if not dry_run:
+                await flush_bulk(collection, ops)
+            ops = []
+    changed += len(ops)
+    if not dry_run:
+        await flush_bulk(collection, ops)
+    return scanned, changed
+
+
+async def migrate_study_code_keys(dry_run: bool = False):
+    print("=" * 70)
+    print("Starting study_code_key Migration" + (" (dry run)" if dry_run else ""))
+    print("=" * 70)
+
+    print(f"\nConnecting to MongoDB...")
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    db = client[settings.DATABASE_NAME]
+
+    try:
+        for name, source in SOURCES.items():
+            scanned, changed = await backfill_collection(db[name], source, dry_run)
+            verb = "would update" if dry_run else "updated"
+            print(f"✓ {name}: {scanned} scanned, {changed} {verb}")
+    except Exception as e:
+        print(f"\n✗ Error during migration: {e}")
+        raise
+    finally:
+        client.close()
+        print("\nDatabase connection closed.")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Backfill study_code_key')
+    parser.add_argument('--dry-run', action='store_true', help='Only report how many documents would change')
+    args = parser.parse_args()
+
+    asyncio.run(migrate_study_code_keys(dry_run=args.dry_run))
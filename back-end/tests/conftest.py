@@ -0,0 +1,116 @@
+"""
+Shared in-memory stand-ins for Motor collections and databases.
+
+Each FakeCollection returns canned results and records every call, so tests can
+assert on the queries and pipelines a repository sends without a live MongoDB:
+
+    coll = FakeCollection(results=[[{"_id": "approved", "count": 4}]])
+    monkeypatch.setattr(dashboard_repo, "dashboard_db", FakeDB(volunteers_master=coll))
+    ...
+    assert coll.pipelines[0][0] == {"$match": {...}}
+"""
+from types import SimpleNamespace
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = list(rows)
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    async def to_list(self, length=None):
+        return self.rows[:length] if length else self.rows
+
+    async def __aiter__(self):
+        for row in self.rows:
+            yield row
+
+
+class FakeCollection:
+    """
+    rows:    documents returned by find() (narrowed by an {"_id": {"$in": ...}}
+             filter); their number is the document count
+    results: aggregate() rows, one list per call (the last one repeats), or a
+             callable(pipeline) -> rows for tests that evaluate the pipeline
+    first:   find_one() result
+    count:   count_documents() / estimated_document_count() result, if not len(rows)
+    """
+
+    def __init__(self, rows=(), *, results=None, first=None, count=None):
+        self.rows = list(rows)
+        self.results = results
+        self.first = first
+        self.count = count
+        self.calls = []
+        self.updates = []
+
+    def calls_of(self, method):
+        return [arg for name, arg in self.calls if name == method]
+
+    @property
+    def pipelines(self):
+        return self.calls_of("aggregate")
+
+    @property
+    def queries(self):
+        return self.calls_of("find")
+
+    def _count(self):
+        return len(self.rows) if self.count is None else self.count
+
+    def aggregate(self, pipeline, **kwargs):
+        self.calls.append(("aggregate", pipeline))
+        if callable(self.results):
+            return FakeCursor(self.results(pipeline))
+        results = self.results or [[]]
+        return FakeCursor(results[min(len(self.pipelines), len(results)) - 1])
+
+    def find(self, query=None, projection=None, **kwargs):
+        self.calls.append(("find", query))
+        ids = (query or {}).get("_id")
+        if isinstance(ids, dict) and "$in" in ids:
+            return FakeCursor(row for row in self.rows if row["_id"] in ids["$in"])
+        return FakeCursor(self.rows)
+
+    async def find_one(self, query=None, projection=None, **kwargs):
+        self.calls.append(("find_one", query))
+        return self.first
+
+    async def count_documents(self, filter, **kwargs):
+        self.calls.append(("count_documents", filter))
+        return self._count()
+
+    async def estimated_document_count(self, **kwargs):
+        return self._count()
+
+    async def update_one(self, query, update, **kwargs):
+        self.calls.append(("update_one", query))
+        self.updates.append(update["$set"])
+        return SimpleNamespace(matched_count=1, modified_count=1)
+
+    async def delete_many(self, query, **kwargs):
+        self.calls.append(("delete_many", query))
+        ids = set(query["_id"]["$in"])  # repositories delete by _id
+        before = len(self.rows)
+        self.rows = [row for row in self.rows if row["_id"] not in ids]
+        return SimpleNamespace(deleted_count=before - len(self.rows))
+
+
+class FakeDB:
+    """Collections by attribute (db.volunteers_master) or by name (db["volunteers_master"])."""
+
+    def __init__(self, **collections):
+        self.collections = collections
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__["collections"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, name):
+        return self.collections[name]
@@ -0,0 +1,99 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.routes import admin
+from app.repositories import person_keys_repo
+from app.services import identity_service
+
+
+class FakeVolunteers:
+    def __init__(self, doc):
+        self.doc = doc
+        self.updates = []
+        self.deleted = []
+
+    async def find_one(self, query):
+        return self.doc
+
+    async def update_one(self, query, update, session=None):
+        self.updates.append(update["$set"])
+        return SimpleNamespace(modified_count=1)
+
+    async def delete_one(self, query):
+        self.deleted.append(query)
+        return SimpleNamespace(deleted_count=1)
+
+
+@pytest.fixture
+def master_db(monkeypatch):
+    """A legacy-schema master V1 owning contact 9000000000 and ID proof AB12."""
+    volunteers = FakeVolunteers({
+        "volunteer_id": "V1", "stage": "pre-screening", "contact": "9000000000",
+        "basic_info": {"contact": "9000000000"}, "id_proof_number": "AB12",
+    })
+    state = {"owners": {}, "writes": [], "released": []}
+
+    async def find_owners(keys):
+        return {k: o for k, o in state["owners"].items() if k in keys}
+
+    async def bulk_write(ops, session=None, ordered=False):
+        state["writes"].append(ops)
+
+    async def release(owner_type, owner_id, session=None):
+        state["released"].append((owner_type, owner_id))
+
+    async def run_in_transaction(callback):
+        return await callback(None)
+
+    monkeypatch.setattr(admin, "db", {"volunteers_master": volunteers})
+    monkeypatch.setattr(admin, "run_in_transaction", run_in_transaction)
+    monkeypatch.setattr(person_keys_repo, "find_owners", find_owners)
+    monkeypatch.setattr(person_keys_repo, "bulk_write", bulk_write)
+    monkeypatch.setattr(person_keys_repo, "release", release)
+    monkeypatch.setattr(identity_service, "_backfilled", True)
+    return volunteers, state
+
+
+@pytest.mark.asyncio
+async def test_contact_change_moves_identity_keys(master_db):
+    volunteers, state = master_db
+    await admin.update_volunteer_details("V1", {"pre_screening": {"contact": "+91 98765 43210"}}, {})
+
+    assert volunteers.updates[0]["basic_info.contact"] == "+91 98765 43210"
+    assert volunteers.updates[0]["contact"] == "+91 98765 43210"
+    ops = state["writes"][0]
+    claimed = [op._filter["_id"] for op in ops[:-1]]
+    assert claimed == ["contact:9876543210", "id_proof:AB12"]
+    # The old contact key is released, the current ones are kept
+    assert ops[-1]._filter == {
+        "owner.type": "master", "owner.id": "V1", "_id": {"$nin": ["contact:9876543210", "id_proof:AB12"]},
+    }
+
+
+@pytest.mark.asyncio
+async def test_contact_owned_by_another_volunteer_is_rejected(master_db):
+    volunteers, state = master_db
+    state["owners"]["contact:9876543210"] = {"type": "master", "id": "V2"}
+
+    with pytest.raises(HTTPException) as exc:
+        await admin.update_volunteer_details("V1", {"pre_screening": {"contact": "9876543210"}}, {})
+    assert exc.value.status_code == 400
+    assert volunteers.updates == [] and state["writes"] == []
+
+
+@pytest.mark.asyncio
+async def test_other_fields_leave_identity_keys_alone(master_db):
+    volunteers, state = master_db
+    await admin.update_volunteer_details("V1", {"pre_screening": {"name": "A B"}}, {})
+    assert volunteers.updates == [{"basic_info.name": "A B"}]
+    assert state["writes"] == []
+
+
+@pytest.mark.asyncio
+async def test_delete_releases_identity_keys(master_db):
+    volunteers, state = master_db
+    await admin.delete_volunteer("V1", {})
+    assert volunteers.deleted == [{"volunteer_id": "V1"}]
+    assert state["released"] == [("master", "V1")]
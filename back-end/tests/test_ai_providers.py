@@ -0,0 +1,120 @@
+import pytest
+
+from app.core.config import settings
+from app.services import ai_providers
+from app.services.ai_providers import FakeProvider, TransientAIError, backoff_delay, with_retries
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    async def instant(delay):
+        pass
+    monkeypatch.setattr(ai_providers.asyncio, "sleep", instant)
+
+
+def test_backoff_delay_is_jittered_within_cap():
+    for attempt in range(6):
+        delay = backoff_delay(attempt, base=0.5, cap=4.0)
+        assert 0 <= delay <= min(4.0, 0.5 * 2 ** attempt)
+
+
+@pytest.mark.asyncio
+async def test_with_retries_retries_only_transient_errors():
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise TransientAIError("503")
+        return "ok"
+
+    assert await with_retries(flaky, attempts=2, base_delay=0.1) == "ok"
+    assert len(calls) == 3
+
+    async def broken():
+        calls.append(1)
+        raise ValueError("bad request")
+
+    calls.clear()
+    with pytest.raises(ValueError):
+        await with_retries(broken, attempts=2, base_delay=0.1)
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_retries_before_first_token_only(monkeypatch):
+    monkeypatch.setattr(settings, "AI_MAX_RETRIES", 2)
+
+    class FlakyStart(FakeProvider):
+        attempts = 0
+
+        async def _stream_once(self, prompt):
+            FlakyStart.attempts += 1
+            if FlakyStart.attempts == 1:
+                raise TransientAIError("connection reset")
+            yield "hello"
+
+    assert [d async for d in FlakyStart().stream("p")] == ["hello"]
+    assert FlakyStart.attempts == 2
+
+    class MidStream(FakeProvider):
+        async def _stream_once(self, prompt):
+            yield "partial"
+            raise TransientAIError("connection reset")
+
+    received = []
+    with pytest.raises(TransientAIError):
+        async for delta in MidStream().stream("p"):
+            received.append(delta)
+    assert received == ["partial"]
+
+
+@pytest.mark.asyncio
+async def test_registry_shares_one_provider_and_closes_it(monkeypatch):
+    monkeypatch.setattr(settings, "AI_PROVIDER", "fake")
+    await ai_providers.stop_ai_providers()
+    first = ai_providers.get_provider()
+    assert ai_providers.get_provider("fake") is first
+    await ai_providers.stop_ai_providers()
+    assert ai_providers.get_provider() is not first
+    await ai_providers.stop_ai_providers()
+
+
+def test_unconfigured_provider_is_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "GEMINI_API_KEY", "")
+    with pytest.raises(ValueError):
+        ai_providers.create_provider("gemini")
+    with pytest.raises(ValueError):
+        ai_providers.create_provider("unknown")
+
+
+@pytest.mark.asyncio
+async def test_openai_stream_is_closed_when_consumer_stops_early(monkeypatch):
+    from types import SimpleNamespace
+
+    class FakeStream:
+        closed = False
+
+        def __aiter__(self):
+            return self._chunks()
+
+        async def _chunks(self):
+            for text in ("one", "two", "three"):
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+        async def close(self):
+            FakeStream.closed = True
+
+    provider = ai_providers.OpenAIProvider("key", "model", max_concurrency=1)
+
+    async def fake_request(prompt, stream=False):
+        return FakeStream()
+
+    monkeypatch.setattr(provider, "_request", fake_request)
+
+    deltas = provider.stream("p")
+    assert await deltas.__anext__() == "one"
+    # e.g. the SSE client disconnected
+    await deltas.aclose()
+    assert FakeStream.closed
+    await provider.aclose()
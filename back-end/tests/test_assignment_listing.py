@@ -0,0 +1,55 @@
+import json
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.core.pagination import encode_cursor
+from app.repositories import assignment_repo
+from app.repositories.assignment_repo import assigned_studies_pipeline, search_filter
+from tests.conftest import FakeCollection, FakeDB
+
+
+def _stages(pipeline):
+    return [next(iter(stage)) for stage in pipeline]
+
+
+def test_search_is_regex_free():
+    query = search_filter(" cv-2025-001 ")
+    assert "$regex" not in json.dumps(query)
+    assert {"visit_id": {"$in": ["CV-2025-001", "cv-2025-001"]}} in query["$or"]
+    assert {"$text": {"$search": "cv-2025-001"}} in query["$or"]
+
+
+def test_join_and_filter_happen_before_paging():
+    pipeline = assigned_studies_pipeline({"study_id": "abc"}, None, skip=100, limit=50)
+    assert _stages(pipeline) == ["$match", "$sort", "$addFields", "$lookup", "$match", "$facet"]
+    facet = pipeline[-1]["$facet"]
+    assert facet["total"] == [{"$count": "n"}]
+    assert facet["page"][:2] == [{"$skip": 100}, {"$limit": 51}]
+
+
+def test_cursor_replaces_skip():
+    after = {"created_at": datetime(2025, 1, 1), "_id": ObjectId()}
+    page = assigned_studies_pipeline({}, after, skip=100, limit=10)[-1]["$facet"]["page"]
+    assert "$match" in page[0] and all("$skip" not in stage for stage in page)
+
+
+@pytest.mark.asyncio
+async def test_result_carries_exact_total_prm_code_and_next_cursor(monkeypatch):
+    rows = [
+        {"_id": ObjectId(), "created_at": datetime(2025, 1, 3 - i), "study_code": "S1",
+         "_instance": [{"enteredStudyCode": "PRM-1"} if i == 0 else {"studyInstanceCode": "INST-2"}]}
+        for i in range(3)
+    ]
+    coll = FakeCollection(results=[[{"total": [{"n": 42}], "page": rows}]])
+    monkeypatch.setattr(assignment_repo, "search_db", FakeDB(assigned_studies=coll))
+
+    result = await assignment_repo.find_calendar_assignments(limit=2, cursor=encode_cursor({
+        "created_at": datetime(2025, 1, 5), "_id": ObjectId(),
+    }))
+
+    assert result["total"] == 42
+    assert [r["prm_study_code"] for r in result["items"]] == ["PRM-1", "INST-2"]
+    assert all("_instance" not in r for r in result["items"])
+    assert result["next_cursor"] is not None
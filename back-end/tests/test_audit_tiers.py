@@ -0,0 +1,157 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.repositories import audit_repo
+from app.services import audit_archive, audit_service
+
+BASE = datetime(2025, 6, 1)
+
+
+def _entries(days):
+    return [{"_id": ObjectId(), "timestamp": BASE - timedelta(days=d), "action": "update"} for d in days]
+
+
+def _matches(doc, query):
+    if "$and" in query:
+        return all(_matches(doc, q) for q in query["$and"])
+    if "$or" in query:
+        return any(_matches(doc, q) for q in query["$or"])
+    for field, cond in query.items():
+        value = doc[field]
+        if isinstance(cond, dict):
+            ops = {"$lt": value.__lt__, "$gte": value.__ge__}
+            if not all(ops[op](arg) for op, arg in cond.items()):
+                return False
+        elif value != cond:
+            return False
+    return True
+
+
+@pytest.fixture
+def data():
+    return {
+        "audit_logs": _entries([0, 1, 2]),
+        "audit_logs_archive_2025_04": _entries([40, 41, 42]),
+        "audit_logs_archive_2025_03": _entries([70, 71]),
+    }
+
+
+@pytest.fixture
+def tiers(monkeypatch, data):
+    ranges = [
+        {"collection": "audit_logs_archive_2025_04", "start": BASE - timedelta(days=42), "end": BASE - timedelta(days=40)},
+        {"collection": "audit_logs_archive_2025_03", "start": BASE - timedelta(days=71), "end": BASE - timedelta(days=70)},
+    ]
+    queried = []
+
+    async def find_page(query, limit, collection="audit_logs"):
+        queried.append(collection)
+        rows = [dict(d) for d in data[collection] if _matches(d, query)]
+        rows.sort(key=lambda d: (d["timestamp"], d["_id"]), reverse=True)
+        return rows[:limit]
+
+    async def iter_matching(query, collection="audit_logs", batch_size=1000):
+        for row in await find_page(query, len(data[collection]), collection):
+            yield row
+
+    async def find_archive_ranges(since=None, until=None):
+        return [r for r in ranges
+                if (since is None or r["end"] >= since) and (until is None or r["start"] < until)]
+
+    monkeypatch.setattr(audit_repo, "find_page", find_page)
+    monkeypatch.setattr(audit_repo, "iter_matching", iter_matching)
+    monkeypatch.setattr(audit_repo, "find_archive_ranges", find_archive_ranges)
+    return queried
+
+
+@pytest.mark.asyncio
+async def test_pages_continue_from_hot_into_archive(tiers):
+    seen = []
+    cursor = None
+    while True:
+        page = await audit_service.query_audit_logs({}, cursor=cursor, limit=3)
+        seen.extend(e["timestamp"] for e in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(seen) == 8
+    assert seen == sorted(seen, reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_recent_window_does_not_touch_archive(tiers):
+    filters = audit_service.build_audit_filter(since=BASE - timedelta(days=5))
+    page = await audit_service.query_audit_logs(filters, limit=10)
+
+    assert len(page["items"]) == 3
+    assert tiers == ["audit_logs"]
+
+
+@pytest.mark.asyncio
+async def test_entry_left_in_both_tiers_is_read_once(tiers, data):
+    # An archive run copied day 40 but crashed before deleting it from the hot tier
+    data["audit_logs"].append(dict(data["audit_logs_archive_2025_04"][0]))
+
+    seen, cursor = [], None
+    while True:
+        page = await audit_service.query_audit_logs({}, cursor=cursor, limit=2)
+        seen.extend(e["_id"] for e in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert len(seen) == len(set(seen)) == 8
+
+    lines = [line async for line in audit_service.export_audit_logs_ndjson({})]
+    assert len(lines) == 8
+
+
+@pytest.mark.asyncio
+async def test_archive_deletes_only_entries_the_archive_holds(monkeypatch):
+    from tests.conftest import FakeCollection, FakeDB
+
+    entries = _entries([40, 41, 42])
+    hot = FakeCollection(entries)
+    # The $merge copied two of the three entries before the server went away
+    archive = FakeCollection(entries[:2], results=[[{"start": BASE, "end": BASE, "count": 2}]])
+    ranges = FakeCollection()
+    monkeypatch.setattr(audit_repo, "db", FakeDB(
+        audit_logs=hot, audit_logs_archive_2025_04=archive, audit_archive_ranges=ranges,
+    ))
+
+    removed = await audit_repo.move_to_archive("audit_logs_archive_2025_04", BASE - timedelta(days=50), BASE)
+
+    assert removed == 2
+    assert hot.rows == [entries[2]]
+    assert ranges.updates[0]["count"] == 2
+
+
+def test_next_month_wraps_year():
+    assert audit_archive._next_month(datetime(2024, 12, 1)) == datetime(2025, 1, 1)
+    assert audit_archive._next_month(datetime(2025, 3, 1)) == datetime(2025, 4, 1)
+
+
+@pytest.mark.asyncio
+async def test_existing_archive_collection_still_gets_indexes(monkeypatch):
+    from pymongo.errors import CollectionInvalid
+
+    created = []
+
+    class FakeCollection:
+        async def create_indexes(self, models):
+            created.append(models)
+
+    class FakeDb:
+        async def create_collection(self, name, **kwargs):
+            raise CollectionInvalid(f"collection {name} already exists")
+
+        def __getitem__(self, name):
+            return FakeCollection()
+
+    monkeypatch.setattr(audit_repo, "db", FakeDb())
+    # e.g. a previous run crashed between create_collection and create_indexes
+    await audit_repo.ensure_archive_collection("audit_logs_archive_2024_01", ["timestamp_id"])
+    assert created == [["timestamp_id"]]
+
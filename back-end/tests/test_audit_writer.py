@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+
+from app.repositories import audit_repo
+from app.services.audit_writer import AuditWriter
+
+
+@pytest.fixture
+def inserted(monkeypatch):
+    batches = []
+
+    async def fake_insert_many(entries):
+        batches.append(list(entries))
+        return len(entries)
+
+    monkeypatch.setattr(audit_repo, "insert_audit_logs", fake_insert_many)
+    return batches
+
+
+@pytest.mark.asyncio
+async def test_batch_size_triggers_single_insert_many(inserted):
+    writer = AuditWriter(batch_size=50, flush_interval_ms=60_000, max_buffer=1000).start()
+    for n in range(50):
+        writer.enqueue({"n": n})
+    await asyncio.sleep(0.01)
+    await writer.stop()
+
+    assert len(inserted) == 1
+    assert len(inserted[0]) == 50
+
+
+@pytest.mark.asyncio
+async def test_interval_flushes_partial_batch(inserted):
+    writer = AuditWriter(batch_size=100, flush_interval_ms=20, max_buffer=1000).start()
+    writer.enqueue({"n": 1})
+    await asyncio.sleep(0.08)
+    assert inserted == [[{"n": 1}]]
+    await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_remaining_entries(inserted):
+    writer = AuditWriter(batch_size=100, flush_interval_ms=60_000, max_buffer=1000).start()
+    for n in range(250):
+        writer.enqueue({"n": n})
+    await writer.stop()
+
+    assert [len(b) for b in inserted] == [100, 100, 50]
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_entries_for_retry(monkeypatch):
+    calls = []
+
+    async def flaky(entries):
+        calls.append(len(entries))
+        if len(calls) == 1:
+            raise RuntimeError("primary stepped down")
+        return len(entries)
+
+    monkeypatch.setattr(audit_repo, "insert_audit_logs", flaky)
+    writer = AuditWriter(batch_size=10, flush_interval_ms=60_000, max_buffer=1000)
+    writer.enqueue({"n": 1})
+    assert await writer.flush() == 0
+    assert await writer.flush() == 1
+    assert calls == [1, 1]
+
+
+def _bulk_error(*write_errors):
+    from pymongo.errors import BulkWriteError
+
+    return BulkWriteError({"writeErrors": [
+        {"index": index, "code": code, "errmsg": f"error {code}"} for index, code in write_errors
+    ]})
+
+
+@pytest.mark.asyncio
+async def test_partial_failure_settles_batch(monkeypatch):
+    from app.core.metrics import AUDIT_DROPPED
+
+    calls = []
+
+    async def partial(entries):
+        calls.append([e["n"] for e in entries])
+        if len(calls) == 1:
+            # 1: written by an earlier attempt, 2: invalid document, 3: primary stepped down
+            raise _bulk_error((1, 11000), (2, 121), (3, 10107))
+        return len(entries)
+
+    monkeypatch.setattr(audit_repo, "insert_audit_logs", partial)
+    rejected = AUDIT_DROPPED.collect().get(("rejected",), 0)
+    writer = AuditWriter(batch_size=10, flush_interval_ms=60_000, max_buffer=1000)
+    for n in range(5):
+        writer.enqueue({"n": n})
+
+    # Rows 0, 1 and 4 are stored, row 2 is dropped, only row 3 is retried
+    assert await writer.flush() == 3
+    assert [e["n"] for e in writer._buffer] == [3]
+    assert AUDIT_DROPPED.collect()[("rejected",)] == rejected + 1
+
+    assert await writer.flush() == 1
+    assert calls == [[0, 1, 2, 3, 4], [3]]
+    assert writer._buffer == []
+
+
+@pytest.mark.asyncio
+async def test_duplicate_keys_do_not_block_later_batches(monkeypatch):
+    calls = []
+
+    async def replayed(entries):
+        calls.append(len(entries))
+        if len(calls) == 1:
+            raise _bulk_error(*[(i, 11000) for i in range(len(entries))])
+        return len(entries)
+
+    monkeypatch.setattr(audit_repo, "insert_audit_logs", replayed)
+    writer = AuditWriter(batch_size=2, flush_interval_ms=60_000, max_buffer=1000)
+    for n in range(5):
+        writer.enqueue({"n": n})
+    assert await writer.flush() == 5
+    assert calls == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_buffer_is_capped_while_database_is_down(monkeypatch, caplog):
+    from app.core.metrics import AUDIT_DROPPED
+
+    inserts = []
+
+    async def down(entries):
+        inserts.append(len(entries))
+        raise RuntimeError("no primary")
+
+    monkeypatch.setattr(audit_repo, "insert_audit_logs", down)
+    overflow = AUDIT_DROPPED.collect().get(("overflow",), 0)
+    writer = AuditWriter(batch_size=5, flush_interval_ms=60_000, max_buffer=20)
+    with caplog.at_level("WARNING", logger="app.services.audit_writer"):
+        for n in range(30):
+            writer.enqueue({"n": n})
+
+    # The request path never waits on the database
+    assert inserts == []
+    assert [e["n"] for e in writer._buffer] == list(range(20))
+    assert AUDIT_DROPPED.collect()[("overflow",)] == overflow + 10
+    spilled = [r.audit_entry["n"] for r in caplog.records if hasattr(r, "audit_entry")]
+    assert spilled == list(range(20, 30))
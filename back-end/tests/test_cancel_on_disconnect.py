@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+import uvicorn
+from fastapi import Depends, FastAPI
+
+from app.api.v1.deps import cancel_on_disconnect
+from app.core import middleware
+
+
+def _build_app(events):
+    app = FastAPI()
+
+    async def slow(seconds):
+        events["started"].set()
+        try:
+            await asyncio.sleep(seconds)
+            events["completed"].set()
+        except asyncio.CancelledError:
+            events["cancelled"].set()
+            raise
+        return {"ok": True}
+
+    @app.get("/watched", dependencies=[Depends(cancel_on_disconnect)])
+    async def watched():
+        return await slow(5)
+
+    @app.get("/unwatched")
+    async def unwatched():
+        return await slow(0.5)
+
+    # Same layering as app.main: BaseHTTPMiddleware inside, the ASGI watcher outermost
+    app.middleware("http")(middleware.add_request_context)
+    app.add_middleware(middleware.CancelOnDisconnectMiddleware)
+    return app
+
+
+async def _drop_mid_request(path, events):
+    server = uvicorn.Server(uvicorn.Config(_build_app(events), host="127.0.0.1", port=0, lifespan="off", log_level="warning"))
+    serve = asyncio.create_task(server.serve())
+    try:
+        while not server.started:
+            await asyncio.sleep(0.01)
+        port = server.servers[0].sockets[0].getsockname()[1]
+
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: test\r\n\r\n".encode())
+        await writer.drain()
+        await asyncio.wait_for(events["started"].wait(), 5)
+        writer.close()  # client gives up, like curl --max-time
+        await asyncio.wait_for(
+            asyncio.wait([asyncio.ensure_future(events["cancelled"].wait()), asyncio.ensure_future(events["completed"].wait())],
+                         return_when=asyncio.FIRST_COMPLETED),
+            5,
+        )
+    finally:
+        server.should_exit = True
+        await serve
+
+
+def _events():
+    return {name: asyncio.Event() for name in ("started", "completed", "cancelled")}
+
+
+@pytest.mark.asyncio
+async def test_real_disconnect_cancels_watched_route_and_kills_queries(monkeypatch):
+    killed = []
+
+    async def fake_kill(request_id):
+        killed.append(request_id)
+        return 0
+
+    monkeypatch.setattr(middleware, "kill_request_operations", fake_kill)
+    events = _events()
+
+    await _drop_mid_request("/watched", events)
+    await asyncio.sleep(0.05)  # let the kill task run
+
+    assert events["cancelled"].is_set() and not events["completed"].is_set()
+    assert len(killed) == 1 and killed[0]
+
+
+@pytest.mark.asyncio
+async def test_disconnect_does_not_cancel_routes_that_did_not_opt_in():
+    events = _events()
+
+    await _drop_mid_request("/unwatched", events)
+
+    assert events["completed"].is_set() and not events["cancelled"].is_set()
@@ -0,0 +1,120 @@
+from datetime import date, datetime
+
+import pytest
+
+from app.core.normalization import canonical_fields, canonical_filter, normalize_gender, normalize_status, parse_dob
+from app.api.v1.routes import enrollment
+from app.repositories import dashboard_repo
+from tests.conftest import FakeCollection, FakeDB
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("VB", "male"), ("Male", "male"), ("FVB", "female"), (" female ", "female"),
+    ("Mfvb", "minor"), ("kids_7_11", "minor"), ("male_minor", "minor"),
+    ("other", "unknown"), (None, "unknown"),
+])
+def test_gender_variants_fold_into_buckets(raw, expected):
+    assert normalize_gender(raw) == expected
+
+
+def test_status_is_lower_cased_and_typos_fixed():
+    assert normalize_status("inacti") == "inactive"
+    assert normalize_status("Active New") == "active-new"
+    assert normalize_status("active_old") == "active-old"
+    assert normalize_status("approved") == "approved"
+    assert normalize_status(None) is None
+
+
+@pytest.mark.parametrize("raw", ["1990-04-02", "02-04-1990", "02/04/1990", "1990-04-02T00:00:00", datetime(1990, 4, 2, 15, 30), date(1990, 4, 2)])
+def test_dob_parses_to_midnight_datetime(raw):
+    assert parse_dob(raw) == datetime(1990, 4, 2)
+
+
+def test_unparseable_dob_is_none():
+    assert parse_dob("unknown") is None and parse_dob("") is None
+
+
+def test_canonical_fields_from_insert_document():
+    doc = {"current_status": "prescreening", "basic_info": {"gender": "FVB", "dob": "1990-04-02"}}
+    assert canonical_fields(doc) == {"gender_norm": "female", "status_norm": "prescreening", "dob_date": datetime(1990, 4, 2)}
+
+
+def test_canonical_fields_only_for_fields_being_set():
+    assert canonical_fields({"current_status": "approved", "audit.updated_at": 1}) == {"status_norm": "approved"}
+    assert canonical_fields({"basic_info.gender": "VB"}) == {"gender_norm": "male"}
+    assert canonical_fields({"contact": "9876543210"}) == {}
+
+
+def _master(*results, first=None):
+    return FakeDB(volunteers_master=FakeCollection(results=list(results), first=first))
+
+
+@pytest.mark.asyncio
+async def test_status_stats_group_on_canonical_field(monkeypatch):
+    fake = _master([
+        {"_id": "approved", "count": 4},
+        {"_id": "inactive", "count": 2},
+        {"_id": "screening", "count": 3},
+        {"_id": "active-new", "count": 1},
+    ])
+    monkeypatch.setattr(dashboard_repo, "dashboard_db", fake)
+
+    stats = await dashboard_repo.get_status_stats({})
+
+    assert sorted((s["name"], s["value"]) for s in stats) == [("Active New", 1), ("Approved", 4), ("Not Active", 5)]
+    pipeline = fake.volunteers_master.pipelines[0]
+    assert pipeline[1] == {"$sort": {"status_norm": 1}}
+    assert "$switch" not in str(pipeline)
+
+
+@pytest.mark.asyncio
+async def test_gender_stats_bucket_unbackfilled_raw_values(monkeypatch):
+    fake = _master(
+        [{"_id": "female", "count": 5}, {"_id": None, "count": 4}, {"_id": "unknown", "count": 2}],
+        # Raw basic_info.gender of the 4 documents without gender_norm
+        [{"_id": "FVB", "count": 2}, {"_id": "VB", "count": 1}, {"_id": None, "count": 1}],
+    )
+    monkeypatch.setattr(dashboard_repo, "dashboard_db", fake)
+
+    stats = await dashboard_repo.get_gender_stats({"basic_info.field_area": "North"})
+
+    assert sorted((s["name"], s["value"]) for s in stats) == [("female", 7), ("male", 1), ("unknown", 3)]
+    assert fake.volunteers_master.pipelines[1][0] == {"$match": {"$and": [
+        {"basic_info.field_area": "North"}, {"gender_norm": {"$exists": False}},
+    ]}}
+
+
+@pytest.mark.asyncio
+async def test_backfilled_stats_need_one_query(monkeypatch):
+    fake = _master([{"_id": "male", "count": 3}])
+    monkeypatch.setattr(dashboard_repo, "dashboard_db", fake)
+    await dashboard_repo.get_gender_stats({})
+    assert len(fake.volunteers_master.pipelines) == 1
+
+
+def test_canonical_filter_falls_back_to_raw_values():
+    query = canonical_filter("status_norm", ["rejected", "inactive"])
+    canonical, raw = query["$or"]
+    assert canonical == {"status_norm": {"$in": ["rejected", "inactive"]}}
+    assert raw["status_norm"] == {"$exists": False}
+    spellings = raw["current_status"]["$in"]
+    assert {"rejected", "Rejected", "inactive", "inacti"} <= set(spellings)
+    assert {normalize_status(s) for s in spellings} == {"rejected", "inactive"}
+
+    gender = canonical_filter("gender_norm", ["minor"])["$or"][1]["basic_info.gender"]["$in"]
+    assert {"MVB", "Mfvb", "kids_7_11", "female_minor"} <= set(gender)
+    assert {normalize_gender(g) for g in gender} == {"minor"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("route, current, target", [
+    (enrollment.reject_volunteer, "screening", "rejected"),
+    (enrollment.move_back_to_prescreening, "approved", "prescreening"),
+])
+async def test_status_transitions_write_canonical_status(monkeypatch, route, current, target):
+    fake = _master(first={"volunteer_id": "V1", "current_status": current})
+    monkeypatch.setattr(enrollment, "db", fake)
+    await route("V1", current_user={"name": "admin"})
+    written = fake.volunteers_master.updates[0]
+    assert written["current_status"] == target
+    assert written["status_norm"] == normalize_status(target)
@@ -0,0 +1,78 @@
+from datetime import datetime
+
+import pytest
+
+from app.services import data_aggregator
+from app.services.data_aggregator import (
+    DataAggregator,
+    date_range_match,
+    event_overlap_match,
+    study_pipeline,
+    volunteer_pipeline,
+)
+from tests.conftest import FakeCollection, FakeDB
+
+START, END = datetime(2025, 1, 1), datetime(2025, 2, 1)
+NOW = datetime(2025, 3, 15)
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    data_aggregator.reset_collection_cache()
+    yield
+    data_aggregator.reset_collection_cache()
+
+
+def test_date_range_match_handles_open_bounds():
+    assert date_range_match(("created_at",), None) == {}
+    assert date_range_match(("created_at",), {"start": None, "end": None}) == {}
+    assert date_range_match(("created_at",), {"start": START, "end": None}) == {"created_at": {"$gte": START}}
+    both = date_range_match(("a", "b"), {"start": START, "end": END})
+    assert both == {"$or": [{"a": {"$gte": START, "$lte": END}}, {"b": {"$gte": START, "$lte": END}}]}
+
+
+def test_pipelines_apply_date_range_before_facet():
+    pipeline = volunteer_pipeline({"start": START, "end": END}, NOW)
+    assert "$match" in pipeline[0] and "$facet" in pipeline[1]
+    assert len(volunteer_pipeline(None, NOW)) == 1
+
+    studies = study_pipeline({"start": START, "end": END}, NOW)
+    assert studies[0] == {"$match": event_overlap_match({"start": START, "end": END})}
+    assert set(studies[1]["$facet"]) >= {"total", "upcoming", "ongoing", "completed", "this_month", "assigned"}
+
+
+@pytest.mark.asyncio
+async def test_volunteer_statistics_single_pipeline_and_cached_resolution():
+    facet = {"total": [{"n": 15}], "male": [{"n": 9}], "female": [{"n": 6}], "recent": [], "age": [{"_id": 18, "count": 3}]}
+    master = FakeCollection(results=[[facet]], first={"_id": 1})
+    pre_screenings = FakeCollection(count=5)
+    aggregator = DataAggregator(FakeDB(volunteers_master=master, pre_screenings=pre_screenings))
+
+    stats = await aggregator.get_volunteer_statistics({"start": START, "end": END})
+    await aggregator.get_volunteer_statistics()
+
+    assert stats["total_volunteers"] == 15 and stats["male_count"] == 9 and stats["female_count"] == 6
+    assert stats["recent_enrollments_30days"] == 0
+    assert stats["pre_screening"] == 5 and stats["total_applicants"] == 20
+    assert len(master.calls_of("find_one")) == 1 and not pre_screenings.calls_of("find_one")
+    assert pre_screenings.calls_of("count_documents")[0] == {"created_at": {"$gte": START, "$lte": END}}
+
+@pytest.mark.asyncio
+async def test_empty_master_falls_back_to_legacy_collection():
+    db = FakeDB(volunteers_master=FakeCollection(), volunteers=FakeCollection())
+    assert await data_aggregator.resolve_collections(db) == {"volunteers": "volunteers"}
+
+@pytest.mark.asyncio
+async def test_fallback_is_not_cached_until_master_has_data():
+    master, legacy = FakeCollection(), FakeCollection()
+    db = FakeDB(volunteers_master=master, volunteers=legacy)
+
+    await data_aggregator.warm_collection_cache(db)
+    assert await data_aggregator.resolve_collections(db) == {"volunteers": "volunteers"}
+
+    # First volunteer registered after startup: reports switch over and the choice sticks
+    master.first = {"_id": 1}
+    assert await data_aggregator.resolve_collections(db) == {"volunteers": "volunteers_master"}
+    master.first = None
+    assert await data_aggregator.resolve_collections(db) == {"volunteers": "volunteers_master"}
+    assert len(master.calls_of("find_one")) == 3 and not legacy.calls_of("find_one")
@@ -0,0 +1,160 @@
+from datetime import datetime
+
+import pytest
+
+from app.core.domain_errors import DuplicateIdentity
+from app.core.normalization import normalize_contact, normalize_id_proof
+from app.db.models.volunteer import RegistrationUpdate
+from app.repositories import person_keys_repo
+from app.repositories.person_keys_repo import claim_ops, identity_keys, release_op
+from app.services import identity_service
+from app.services.identity_service import find_conflict
+from app.services.registration_service import build_registration_plan
+
+NOW = datetime(2025, 6, 1, 12, 0)
+
+
+@pytest.mark.parametrize("raw", ["9876543210", "+91 98765-43210", "098765 43210", "91 9876543210"])
+def test_contact_spellings_normalize_to_one_key(raw):
+    assert normalize_contact(raw) == "9876543210"
+
+
+def test_blank_and_junk_values_produce_no_key():
+    assert normalize_contact("") is None and normalize_contact("N/A") is None
+    assert normalize_id_proof(" - ") is None
+    assert identity_keys([None, "", "N/A"], [None, ""]) == []
+
+
+def test_keys_are_deduplicated_across_spellings():
+    keys = identity_keys(["9876543210", "+91 9876543210"], ["abcde 1234-f"])
+    assert keys == ["contact:9876543210", "id_proof:ABCDE1234F"]
+
+
+def test_claim_only_matches_own_or_replaceable_owner():
+    op = claim_ops(["contact:9876543210"], "master", "V1", NOW, replace_types=("draft",))[0]
+    assert op._filter == {
+        "_id": "contact:9876543210",
+        "$or": [{"owner.type": "master", "owner.id": "V1"}, {"owner.type": "draft"}],
+    }
+    assert op._upsert is True
+    assert op._doc["$setOnInsert"] == {"kind": "contact", "value": "9876543210", "created_at": NOW}
+
+
+def test_release_keeps_current_keys():
+    op = release_op("master", "V1", keep=["contact:1234567890"])
+    assert op._filter == {"owner.type": "master", "owner.id": "V1", "_id": {"$nin": ["contact:1234567890"]}}
+
+
+def test_conflict_ignores_own_and_replaceable_owners():
+    owners = {
+        "contact:1": {"type": "draft", "id": "D1"},
+        "id_proof:X": {"type": "master", "id": "V1"},
+    }
+    assert find_conflict(owners, "master", "V1", replace_types=("draft",)) is None
+    assert find_conflict(owners, "master", "V2", replace_types=("draft",)) == ("id_proof:X", owners["id_proof:X"])
+    assert find_conflict(owners, "draft", "D2") == ("contact:1", owners["contact:1"])
+
+
+@pytest.mark.asyncio
+async def test_reserve_rejects_foreign_owner_before_writing(monkeypatch):
+    writes = []
+
+    async def fake_find_owners(keys):
+        return {"contact:9876543210": {"type": "master", "id": "V9"}}
+
+    async def fake_bulk_write(ops, session=None, ordered=False):
+        writes.append(ops)
+
+    monkeypatch.setattr(person_keys_repo, "find_owners", fake_find_owners)
+    monkeypatch.setattr(person_keys_repo, "bulk_write", fake_bulk_write)
+
+    with pytest.raises(DuplicateIdentity) as exc:
+        await identity_service.reserve("draft", "D1", contacts=["+91 98765 43210"])
+    assert exc.value.owner_type == "master" and exc.value.kind == "contact"
+    assert writes == []
+
+
+def test_registration_plan_moves_identity_keys_with_contact_change():
+    data = RegistrationUpdate(date_of_registration="2025-06-01", fit_status="yes", remarks="", study_assigned=[], contact="98765 43210")
+    master = {"volunteer_id": "V1", "contact": "9000000000", "id_proof_number": "ab-12"}
+    plan = build_registration_plan("V1", data, master, None, {}, "recruiter", NOW)
+    claims, release = plan["person_keys"][:-1], plan["person_keys"][-1]
+    assert [op._filter["_id"] for op in claims] == ["contact:9876543210", "id_proof:AB12"]
+    assert release._filter["_id"] == {"$nin": ["contact:9876543210", "id_proof:AB12"]}
+
+
+def test_registration_plan_leaves_identity_keys_alone_otherwise():
+    data = RegistrationUpdate(date_of_registration="2025-06-01", fit_status="no", remarks="", study_assigned=[])
+    plan = build_registration_plan("V1", data, {"volunteer_id": "V1"}, None, {}, "recruiter", NOW)
+    assert plan["person_keys"] == []
+
+
+class _FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def limit(self, n):
+        return self
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for doc in self.docs:
+            yield doc
+
+
+class _FakeRecords:
+    def __init__(self, docs, log):
+        self.docs, self.log = docs, log
+
+    def find(self, query, projection=None):
+        self.log.append(query)
+        return _FakeCursor(self.docs)
+
+
+@pytest.fixture
+def unindexed(monkeypatch):
+    """person_keys is empty; the records live only in their own collections."""
+    queries = []
+    records = {
+        "volunteers_master": _FakeRecords([{"volunteer_id": "V1", "contact": "+91 98765 43210"}], queries),
+        "field_visits": _FakeRecords([{"_id": "D1", "contact": "9123456789"}], queries),
+    }
+    state = {"backfilled": False}
+
+    async def no_owners(keys):
+        return {}
+
+    async def is_backfilled():
+        return state["backfilled"]
+
+    monkeypatch.setattr(person_keys_repo, "find_owners", no_owners)
+    monkeypatch.setattr(person_keys_repo, "is_backfilled", is_backfilled)
+    monkeypatch.setattr(identity_service, "search_db", records)
+    monkeypatch.setattr(identity_service, "_backfilled", False)
+    return state, queries
+
+
+@pytest.mark.asyncio
+async def test_records_are_found_before_the_backfill(unindexed):
+    _, queries = unindexed
+    owners = await identity_service.find_duplicates(contacts=["9876543210", "9123456789"])
+    assert owners == {
+        "contact:9876543210": {"type": "master", "id": "V1"},
+        "contact:9123456789": {"type": "draft", "id": "D1"},
+    }
+    # The values as entered are looked up too (legacy records store them unnormalized)
+    assert {"contact": {"$in": ["9123456789", "9876543210"]}} in queries[0]["$or"]
+
+    with pytest.raises(DuplicateIdentity) as exc:
+        await identity_service.ensure_available(["contact:9876543210"], "draft", "D2")
+    assert exc.value.owner_id == "V1"
+
+
+@pytest.mark.asyncio
+async def test_fallback_stops_once_backfill_marker_exists(unindexed):
+    state, queries = unindexed
+    state["backfilled"] = True
+    assert await identity_service.find_duplicates(contacts=["9876543210"]) == {}
+    assert queries == []
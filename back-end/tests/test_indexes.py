@@ -0,0 +1,73 @@
+import pytest
+from pymongo import IndexModel
+
+from app.db.indexes import desired_indexes, model_field_drift, reconcile_collection
+
+
+class FakeCollection:
+    def __init__(self, existing):
+        self.existing = existing
+        self.created = []
+
+    async def list_indexes(self):
+        for doc in self.existing:
+            yield doc
+
+    async def create_indexes(self, models):
+        self.created.extend(models)
+        return [m.document["name"] for m in models]
+
+
+class FakeDB(dict):
+    pass
+
+
+def test_declared_model_indexes_match_stored_fields():
+    assert model_field_drift() == []
+
+
+def test_desired_indexes_include_raw_and_beanie_collections():
+    desired = desired_indexes()
+    assert "volunteers_master" in desired
+    assert "assigned_studies" in desired
+
+
+@pytest.mark.asyncio
+async def test_reconcile_creates_only_missing_and_reports_extra():
+    coll = FakeCollection([
+        {"name": "_id_", "key": {"_id": 1}},
+        {"name": "a_1", "key": {"a": 1}},
+        {"name": "old_1", "key": {"old": 1}},
+    ])
+    db = FakeDB(things=coll)
+
+    report = await reconcile_collection(db, "things", [IndexModel("a"), IndexModel("b", unique=True)])
+
+    assert report["created"] == ["b_1"]
+    assert [m.document["name"] for m in coll.created] == ["b_1"]
+    assert report["drift"] == ["things.old_1: exists in DB but is not declared"]
+
+
+@pytest.mark.asyncio
+async def test_reconcile_dry_run_reports_option_drift():
+    coll = FakeCollection([{"name": "a_1", "key": {"a": 1}}])
+    db = FakeDB(things=coll)
+
+    report = await reconcile_collection(db, "things", [IndexModel("a", unique=True)], dry_run=True)
+
+    assert coll.created == []
+    assert report["missing"] == []
+    assert "options" in report["drift"][0]
+
+
+@pytest.mark.asyncio
+async def test_text_index_matches_server_representation():
+    coll = FakeCollection([
+        {"name": "_id_", "key": {"_id": 1}},
+        {"name": "names_text", "key": {"_fts": "text", "_ftsx": 1}, "weights": {"study_name": 1, "volunteer_name": 1}},
+    ])
+    declared = [IndexModel([("volunteer_name", "text"), ("study_name", "text")], name="names_text")]
+
+    report = await reconcile_collection(FakeDB(things=coll), "things", declared)
+
+    assert report["missing"] == [] and report["drift"] == []
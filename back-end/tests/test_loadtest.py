@@ -0,0 +1,69 @@
+import os
+import random
+
+import httpx
+import pytest
+
+
+@pytest.fixture
+def loadtest(monkeypatch):
+    # Importing the module points DATABASE_NAME at the bench DB; undo that afterwards
+    monkeypatch.setattr(os, "environ", os.environ.copy())
+    from benchmarks import loadtest
+    return loadtest
+
+
+def _context(loadtest, status=200):
+    requests = []
+
+    def handler(request):
+        requests.append((request.method, request.url.path))
+        return httpx.Response(status, json={})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://load")
+    return loadtest.LoadContext(client, ["V1", "V2", "V3"], ["AB-101"]), requests
+
+
+def test_user_overrides_adjust_and_disable_scenarios(loadtest):
+    scenarios = loadtest._apply_user_overrides(loadtest.DEFAULT_SCENARIOS, "exporter=0,prm_calendar=7")
+    users = {s.name: s.users for s in scenarios}
+    assert "exporter" not in users
+    assert users["prm_calendar"] == 7
+    assert users["front_desk_search"] == 8
+
+    with pytest.raises(SystemExit):
+        loadtest._apply_user_overrides(loadtest.DEFAULT_SCENARIOS, "nobody=3")
+
+
+def test_dry_run_plan_uses_shared_client_options(loadtest, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "MONGO_TLS", False)
+    plan = loadtest.describe_plan(loadtest.DEFAULT_SCENARIOS, duration=60)
+    assert plan["tls"] is False
+    assert plan["scenarios"]["exporter"] == {"users": 2, "think_time_s": 10.0, "approx_iterations": 12}
+    assert set(plan["scenarios"]) == {s.name for s in loadtest.DEFAULT_SCENARIOS}
+
+
+@pytest.mark.asyncio
+async def test_scenario_mix_hits_expected_routes(loadtest):
+    ctx, requests = _context(loadtest)
+    rng = random.Random(1)
+    for scenario in loadtest.DEFAULT_SCENARIOS:
+        await scenario.action(ctx, rng)
+    await ctx.client.aclose()
+
+    assert requests.count(("POST", "/api/v1/volunteers/attendance/bulk-toggle")) == 2
+    assert ("GET", "/api/v1/volunteers/search/master") in requests
+    assert ("GET", "/api/v1/dashboard/stats") in requests
+    assert ("GET", "/api/v1/prm/attendance/export/AB-101") in requests
+    assert sum(len(v) for v in ctx.samples.values()) == len(requests)
+    assert not ctx.errors
+
+
+@pytest.mark.asyncio
+async def test_error_responses_are_counted_per_route(loadtest):
+    ctx, _ = _context(loadtest, status=500)
+    await loadtest.recruiter_dashboard(ctx, random.Random(1))
+    await ctx.client.aclose()
+    assert ctx.errors == {"GET /dashboard/stats": 1, "GET /volunteers/stats": 1}
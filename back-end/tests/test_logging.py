@@ -0,0 +1,103 @@
+import io
+import json
+import logging
+import logging.handlers
+import queue
+
+from app.core.logging import (
+    JsonFormatter,
+    RequestContextFilter,
+    SamplingFilter,
+    _PreparedQueueHandler,
+    parse_sampling,
+)
+from app.core.request_context import request_id_var
+
+
+def _record(name="app.test", level=logging.INFO, msg="hello", **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, (), None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+def test_sampling_keeps_one_in_n_and_never_drops_warnings():
+    sampler = SamplingFilter({"app.core.middleware": 0.25})
+    kept = sum(sampler.filter(_record("app.core.middleware")) for _ in range(100))
+    assert kept == 25
+    assert all(sampler.filter(_record("app.core.middleware", logging.WARNING)) for _ in range(10))
+    # Child loggers follow the parent's rule, unrelated loggers are untouched
+    assert sum(sampler.filter(_record("app.core.middleware.sub")) for _ in range(8)) == 2
+    assert all(sampler.filter(_record("app.other")) for _ in range(10))
+
+
+def test_sampling_rate_zero_drops_info():
+    sampler = SamplingFilter(parse_sampling("noisy=0"))
+    assert not sampler.filter(_record("noisy"))
+    assert sampler.filter(_record("noisy", logging.ERROR))
+
+
+def test_json_records_carry_request_id_and_extras_through_queue():
+    log_queue = queue.SimpleQueue()
+    handler = _PreparedQueueHandler(log_queue)
+    handler.addFilter(RequestContextFilter())
+    stream = io.StringIO()
+    output = logging.StreamHandler(stream)
+    output.setFormatter(JsonFormatter())
+    listener = logging.handlers.QueueListener(log_queue, output)
+
+    log = logging.getLogger("app.test.json")
+    log.propagate = False
+    log.addHandler(handler)
+    listener.start()
+    token = request_id_var.set("req-123")
+    try:
+        log.warning("saved %s", "volunteer", extra={"audit": {"entity_id": "V1"}})
+    finally:
+        request_id_var.reset(token)
+        listener.stop()
+        log.removeHandler(handler)
+
+    entry = json.loads(stream.getvalue())
+    assert entry["message"] == "saved volunteer"
+    assert entry["request_id"] == "req-123"
+    assert entry["audit"] == {"entity_id": "V1"}
+    assert entry["level"] == "WARNING"
+
+
+def test_records_after_shutdown_are_written_directly(monkeypatch):
+    from app.core import logging as app_logging
+
+    root = logging.getLogger()
+    saved = (list(root.handlers), root.level)
+    stream = io.StringIO()
+    monkeypatch.setattr("sys.stdout", stream)
+    # Leave the app's own pipeline (if main was imported) running
+    for name in ("_listener", "_queue_handler", "_output"):
+        monkeypatch.setattr(app_logging, name, None)
+    try:
+        app_logging.setup_logging("INFO", "json")
+        logging.getLogger("app.test.shutdown").info("queued")
+        app_logging.shutdown_logging()
+        assert not any(isinstance(h, logging.handlers.QueueHandler) for h in root.handlers)
+
+        token = request_id_var.set("req-9")
+        try:
+            logging.getLogger("app.test.shutdown").info("after shutdown")
+        finally:
+            request_id_var.reset(token)
+        # Shutdown twice and set up again: still exactly one handler
+        app_logging.shutdown_logging()
+        app_logging.setup_logging("INFO", "json")
+        assert len(root.handlers) == 1
+        app_logging.shutdown_logging()
+    finally:
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        for handler in saved[0]:
+            root.addHandler(handler)
+        root.setLevel(saved[1])
+
+    entries = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [e["message"] for e in entries] == ["queued", "after shutdown"]
+    assert entries[1]["request_id"] == "req-9"
@@ -0,0 +1,39 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+from app.core.loop_monitor import LoopMonitor
+from app.core.metrics import LOOP_BLOCKED, LOOP_LAG
+
+
+def _blocking_call():
+    time.sleep(0.3)
+
+
+@pytest.mark.asyncio
+async def test_blocking_call_is_logged_with_stack(caplog):
+    blocked_before = LOOP_BLOCKED.collect().get((), 0)
+    monitor = LoopMonitor(interval_ms=10, block_threshold_ms=100).start()
+    try:
+        await asyncio.sleep(0.05)
+        with caplog.at_level(logging.WARNING, logger="app.core.loop_monitor"):
+            _blocking_call()
+            await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    messages = [r.getMessage() for r in caplog.records if "EVENT LOOP BLOCKED" in r.getMessage()]
+    assert len(messages) == 1
+    assert "_blocking_call" in messages[0]
+    assert LOOP_BLOCKED.collect().get((), 0) == blocked_before + 1
+
+
+@pytest.mark.asyncio
+async def test_probe_records_lag():
+    count_before = LOOP_LAG.collect().get((), [None, 0.0, 0])[2]
+    monitor = LoopMonitor(interval_ms=5, block_threshold_ms=1000).start()
+    await asyncio.sleep(0.1)
+    await monitor.stop()
+    assert LOOP_LAG.collect()[()][2] > count_before
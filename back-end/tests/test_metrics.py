@@ -0,0 +1,44 @@
+import threading
+
+from app.core.metrics import Counter, Histogram, REGISTRY, render_latest
+
+
+def _unregister(*metrics):
+    for m in metrics:
+        REGISTRY.remove(m)
+
+
+def test_counter_merges_thread_shards():
+    counter = Counter("test_events_total", "Test events", ("kind",))
+    try:
+        def work():
+            for _ in range(1000):
+                counter.inc(("a",))
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        counter.inc(("b",), 2)
+
+        assert counter.collect() == {("a",): 4000, ("b",): 2}
+    finally:
+        _unregister(counter)
+
+
+def test_histogram_renders_cumulative_buckets():
+    hist = Histogram("test_latency_seconds", "Test latency", ("route",), buckets=(0.1, 1.0))
+    try:
+        hist.observe(0.05, ("/x",))
+        hist.observe(0.5, ("/x",))
+        hist.observe(5, ("/x",))
+        text = render_latest()
+    finally:
+        _unregister(hist)
+
+    assert "# TYPE test_latency_seconds histogram" in text
+    assert 'test_latency_seconds_bucket{route="/x",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{route="/x",le="1.0"} 2' in text
+    assert 'test_latency_seconds_bucket{route="/x",le="+Inf"} 3' in text
+    assert 'test_latency_seconds_count{route="/x"} 3' in text
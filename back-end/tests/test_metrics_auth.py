@@ -0,0 +1,39 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import deps
+from app.core.config import Settings, settings
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.get("/metrics", dependencies=[Depends(deps.require_metrics_token)])
+    async def metrics():
+        return "ok"
+
+    return TestClient(app)
+
+
+def test_token_is_required_when_configured(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "s3cret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer s3cret"}).status_code == 200
+
+
+def test_production_without_token_is_closed(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+    monkeypatch.setattr(settings, "ENVIRONMENT", "production")
+    assert client.get("/metrics").status_code == 403
+    monkeypatch.setattr(settings, "ENVIRONMENT", "development")
+    assert client.get("/metrics").status_code == 200
+
+
+def test_metrics_default_off_in_production(monkeypatch):
+    monkeypatch.delenv("METRICS_ENABLED", raising=False)
+    assert Settings(ENVIRONMENT="production", _env_file=None).METRICS_ENABLED is False
+    assert Settings(ENVIRONMENT="development", _env_file=None).METRICS_ENABLED is True
+    assert Settings(ENVIRONMENT="production", METRICS_ENABLED=True, _env_file=None).METRICS_ENABLED is True
@@ -0,0 +1,47 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.core.domain_errors import InvalidPageCursor
+from app.core.pagination import decode_cursor, encode_cursor, keyset_filter, split_page
+
+SORT = [("timestamp", -1), ("_id", -1)]
+
+
+def test_cursor_round_trip_keeps_types():
+    values = {"timestamp": datetime(2025, 3, 1, 12, 30), "_id": ObjectId()}
+    decoded = decode_cursor(encode_cursor(values))
+    assert decoded == values
+    assert isinstance(decoded["_id"], ObjectId)
+
+
+def test_empty_cursor_means_first_page():
+    assert decode_cursor(None) is None
+    assert keyset_filter(SORT, None) == {}
+
+
+@pytest.mark.parametrize("token", ["not-base64!!", "aGVsbG8", encode_cursor({"other": 1})])
+def test_bad_cursor_is_rejected(token):
+    with pytest.raises(InvalidPageCursor):
+        keyset_filter(SORT, decode_cursor(token))
+
+
+def test_keyset_filter_breaks_ties_on_id():
+    ts, oid = datetime(2025, 1, 1), ObjectId()
+    assert keyset_filter(SORT, {"timestamp": ts, "_id": oid}) == {"$or": [
+        {"timestamp": {"$lt": ts}},
+        {"timestamp": ts, "_id": {"$lt": oid}},
+    ]}
+    assert keyset_filter([("name", 1)], {"name": "b"}) == {"name": {"$gt": "b"}}
+
+
+def test_split_page_returns_token_only_when_more_rows():
+    rows = [{"timestamp": datetime(2025, 1, d), "_id": ObjectId()} for d in (3, 2, 1)]
+
+    page, token = split_page(rows, SORT, limit=2)
+    assert page == rows[:2]
+    assert decode_cursor(token) == {"timestamp": rows[1]["timestamp"], "_id": rows[1]["_id"]}
+
+    page, token = split_page(rows, SORT, limit=3)
+    assert page == rows and token is None
@@ -0,0 +1,61 @@
+import json
+from datetime import datetime
+
+from app.services.prompt_budget import (
+    REPORT_TOKEN_BUDGETS,
+    TRUNCATION_MARK,
+    compact,
+    compact_for_prompt,
+    estimate_tokens,
+)
+from app.services.ai_providers import FakeProvider
+from app.services.ai_service import AIReportService
+
+
+def test_compact_rounds_trims_and_drops_noise():
+    data = {
+        "generated_at": "2025-01-01T10:00:00.123456",
+        "rate": 33.33333,
+        "whole": 4.0,
+        "when": datetime(2025, 1, 2, 3, 4, 5, 678),
+        "iso": "2025-01-02T03:04:05.678",
+        "empty": [],
+        "missing": None,
+        "events": list(range(12)),
+        "remarks": "x" * 300,
+    }
+    out = compact(data, top_n=5, max_str=20, decimals=1)
+    assert "generated_at" not in out and "empty" not in out and "missing" not in out
+    assert out["rate"] == 33.3 and out["whole"] == 4
+    assert out["when"] == "2025-01-02T03:04" and out["iso"] == "2025-01-02T03:04"
+    assert out["events"] == [0, 1, 2, 3, 4, {"more": 7}]
+    assert out["remarks"] == "x" * 20 + "..."
+
+
+def test_compact_for_prompt_fits_budget_and_stays_json_when_possible():
+    data = {"events": [{"title": f"Study {i}", "remarks": "r" * 150} for i in range(50)]}
+    text = compact_for_prompt(data, budget=400)
+    assert estimate_tokens(text) <= 400
+    assert json.loads(text)["events"][-1]["more"] > 0
+
+
+def test_hard_budget_truncates_as_last_resort():
+    data = {f"key_{i}": i for i in range(2000)}
+    text = compact_for_prompt(data, budget=100)
+    assert text.endswith(TRUNCATION_MARK)
+    assert estimate_tokens(text) <= 100
+
+
+def test_prompt_is_much_smaller_than_indented_dump():
+    data = {
+        "volunteers": {"total_volunteers": 1200, "conversion_rate_percentage": 61.234567,
+                       "age_distribution": [{"_id": b, "count": b * 3} for b in (18, 25, 35, 45, 55)]},
+        "calendar": {"next_events": [{"title": f"Study {i}", "start": datetime(2025, 5, i + 1),
+                                      "remarks": "Fasting required " * 10} for i in range(10)]},
+        "generated_at": datetime(2025, 5, 1).isoformat(),
+    }
+    service = AIReportService(FakeProvider())
+    prompt = service.build_prompt("overall_summary", data)
+    verbose = json.dumps(data, indent=2, default=str)
+    assert len(compact_for_prompt(data, "overall_summary")) < len(verbose) * 0.8
+    assert estimate_tokens(prompt) < REPORT_TOKEN_BUDGETS["overall_summary"] + 200
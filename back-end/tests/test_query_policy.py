@@ -0,0 +1,65 @@
+import pytest
+from pymongo.errors import ExecutionTimeout
+
+from app.core.domain_errors import QueryTimeout
+from app.core.request_context import request_id_var
+from app.db.query_policy import PolicyDatabase, QueryClass, time_limit_ms
+
+
+class FakeCursor:
+    def __init__(self, docs, error=None):
+        self.docs = docs
+        self.error = error
+
+    def sort(self, *args):
+        return self
+
+    async def to_list(self, length=None):
+        if self.error:
+            raise self.error
+        return self.docs
+
+
+class FakeCollection:
+    name = "things"
+
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+
+    def find(self, *args, **kwargs):
+        self.calls.append(("find", kwargs))
+        return FakeCursor([{"a": 1}], self.error)
+
+    async def count_documents(self, filter, **kwargs):
+        self.calls.append(("count_documents", kwargs))
+        if self.error:
+            raise self.error
+        return 1
+
+
+@pytest.mark.asyncio
+async def test_reads_carry_time_limit_and_request_comment():
+    coll = FakeCollection()
+    db = PolicyDatabase({"things": coll}, QueryClass.INTERACTIVE)
+    token = request_id_var.set("req-1")
+    try:
+        docs = await db.things.find({}).sort("a", 1).to_list(None)
+        await db.things.count_documents({})
+    finally:
+        request_id_var.reset(token)
+
+    assert docs == [{"a": 1}]
+    limit = time_limit_ms(QueryClass.INTERACTIVE)
+    assert coll.calls[0] == ("find", {"max_time_ms": limit, "comment": "req-1"})
+    assert coll.calls[1] == ("count_documents", {"maxTimeMS": limit, "comment": "req-1"})
+
+
+@pytest.mark.asyncio
+async def test_server_timeout_becomes_domain_error():
+    db = PolicyDatabase({"things": FakeCollection(ExecutionTimeout("too slow"))}, QueryClass.DASHBOARD)
+
+    with pytest.raises(QueryTimeout):
+        await db.things.find({}).to_list(None)
+    with pytest.raises(QueryTimeout):
+        await db.things.count_documents({})
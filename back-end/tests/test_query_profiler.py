@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+
+from app.core.query_profiler import (
+    profile_queries,
+    query_profiler_listener,
+    query_shape,
+)
+
+
+def _run_command(request_id, name, command, micros=1000):
+    query_profiler_listener.started(SimpleNamespace(request_id=request_id, command_name=name, command=command))
+    query_profiler_listener.succeeded(SimpleNamespace(request_id=request_id, command_name=name, duration_micros=micros))
+
+
+def test_query_shape_masks_literal_values():
+    a = query_shape("find", {"find": "volunteers_master", "filter": {"volunteer_id": "VOL-1"}})
+    b = query_shape("find", {"find": "volunteers_master", "filter": {"volunteer_id": "VOL-2"}})
+    c = query_shape("find", {"find": "volunteers_master", "filter": {"contact": "99"}})
+    assert a == b
+    assert a != c
+
+
+def test_profile_detects_repeated_shapes():
+    with profile_queries() as profile:
+        for i in range(6):
+            _run_command(i, "find", {"find": "study_visits", "filter": {"volunteerId": f"V{i}"}})
+        _run_command(99, "aggregate", {"aggregate": "assigned_studies", "pipeline": [{"$match": {"a": 1}}]}, micros=4000)
+        # getMore belongs to an earlier query: adds time, not a query
+        query_profiler_listener.succeeded(SimpleNamespace(request_id=100, command_name="getMore", duration_micros=500))
+
+    assert profile.query_count == 7
+    assert round(profile.total_ms, 1) == 10.5
+    repeated = profile.repeated_shapes(5)
+    assert len(repeated) == 1 and repeated[0][1] == 6
+    assert profile.server_timing() == 'db;dur=10.5;desc="7 queries"'
+
+
+def test_commands_outside_a_profile_are_ignored():
+    _run_command(1, "find", {"find": "x", "filter": {}})
+    with profile_queries() as profile:
+        pass
+    assert profile.query_count == 0
@@ -0,0 +1,76 @@
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import DeleteMany, UpdateOne
+
+from app.db.models.volunteer import RegistrationUpdate
+from app.services.registration_service import build_registration_plan
+
+NOW = datetime(2025, 6, 1, 12, 0)
+MASTER = {"volunteer_id": "V1", "basic_info": {"name": "Asha", "gender": "female"}, "contact": "900"}
+PRESCREENING = {"volunteer_id": "V1", "name": "Asha K", "contact": "N/A", "gender": "female", "dob": "1990-04-02", "field_area": "North"}
+STUDY_ID = ObjectId()
+
+
+def _data(**overrides):
+    fields = dict(date_of_registration="2025-06-01", fit_status="yes", remarks="ok", study_assigned=["S1", "S2"])
+    fields.update(overrides)
+    return RegistrationUpdate(**fields)
+
+
+def _plan(data, prescreening=PRESCREENING):
+    return build_registration_plan(
+        "V1", data, MASTER, prescreening, {"S1": {"_id": STUDY_ID, "study_code": "S1", "study_name": "Study One"}},
+        "recruiter", NOW,
+    )
+
+
+def test_prescreening_corrections_merge_into_one_set():
+    plan = _plan(_data(gender="male", dob="1991-01-01", contact="911", address="Lane 1"))
+    assert len(plan["prescreening_forms"]) == 1
+    update = plan["prescreening_forms"][0]._doc["$set"]
+    assert update == {"gender": "male", "dob": "1991-01-01", "contact": "911", "address": "Lane 1", "audit.updated_at": NOW}
+    master_set = plan["volunteers_master"][0]._doc["$set"]
+    assert master_set["current_stage"] == "registered" and master_set["basic_info.contact"] == "911"
+
+
+def test_no_prescreening_write_without_corrections():
+    assert _plan(_data())["prescreening_forms"] == []
+
+
+def test_participation_and_assignments_are_bulk_upserts():
+    plan = _plan(_data(contact="911"))
+    participation = plan["clinical_participation"]
+    assert isinstance(participation[0], DeleteMany)
+    assert participation[0]._filter["study.study_code"] == {"$nin": ["S1", "S2"]}
+    upserts = participation[1:]
+    assert all(isinstance(op, UpdateOne) and op._upsert for op in upserts)
+    assert upserts[0]._doc["$set"]["study"] == {"study_code": "S1", "study_name": "Study One"}
+    # Unknown study code falls back to the code itself
+    assert upserts[1]._doc["$set"]["study"]["study_name"] == "S2"
+    # Volunteer details reflect this request's corrections
+    assert upserts[0]._doc["$set"]["volunteer_ref"]["contact"] == "911"
+    assert upserts[0]._doc["$set"]["volunteer_ref"]["age"] == 2025 - 1990
+
+    assignments = plan["assigned_studies"]
+    assert len(assignments) == 2
+    first = assignments[0]._doc
+    assert first["$set"]["fitness_status"] == "fit" and first["$set"]["volunteer_contact"] == "911"
+    assert first["$setOnInsert"]["study_id"] == str(STUDY_ID)
+    assert first["$setOnInsert"]["visit_id"] == "REG-V1-S1"
+    assert assignments[1]._doc["$setOnInsert"]["study_id"] == "manual"
+    assert not set(first["$set"]) & set(first["$setOnInsert"])
+
+
+def test_placeholder_contact_only_set_on_insert():
+    plan = _plan(_data(fit_status="no"))
+    doc = plan["assigned_studies"][0]._doc
+    assert "volunteer_contact" not in doc["$set"]
+    assert doc["$setOnInsert"]["volunteer_contact"] == "N/A"
+    assert doc["$set"]["status"] == "rejected"
+
+
+def test_no_studies_only_clears_participation():
+    plan = _plan(_data(study_assigned=[]))
+    assert len(plan["clinical_participation"]) == 1
+    assert plan["assigned_studies"] == []
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import pytest
+
+from app.core.config import settings
+from app.services import report_cache
+from app.services.report_cache import _LRU, fingerprint, report_cache_key
+
+DATA = {"volunteers": {"total": 10, "by_stage": {"registered": 4}}, "generated_at": "2025-01-01T10:00:00"}
+RANGE = {"start": datetime(2025, 1, 1), "end": datetime(2025, 2, 1)}
+
+
+def _key(**overrides):
+    args = dict(report_type="overall_summary", date_range=RANGE, custom_prompt=None, raw_data=DATA, model="m")
+    args.update(overrides)
+    return report_cache_key(**args)
+
+
+def test_fingerprint_ignores_generation_time_but_not_data():
+    later = {**DATA, "generated_at": "2025-01-01T11:00:00"}
+    changed = {**DATA, "volunteers": {"total": 11, "by_stage": {"registered": 4}}}
+    assert fingerprint(DATA) == fingerprint(later)
+    assert fingerprint(DATA) != fingerprint(changed)
+
+
+def test_key_changes_with_each_component():
+    base = _key()
+    assert _key(report_type="custom") != base
+    assert _key(date_range={"start": datetime(2025, 1, 2), "end": None}) != base
+    assert _key(custom_prompt="Why did signups drop?") != base
+    assert _key(model="other") != base
+    # Prompt is normalized before hashing
+    assert _key(custom_prompt=" why did signups drop? ") == _key(custom_prompt="Why did signups drop?")
+
+
+def test_lru_evicts_oldest_and_expires():
+    lru = _LRU(max_entries=2)
+    lru.put("a", "A", ttl=60)
+    lru.put("b", "B", ttl=60)
+    assert lru.get("a") == "A"  # a is now most recent
+    lru.put("c", "C", ttl=60)
+    assert lru.get("b") is None
+    assert lru.get("a") == "A"
+
+    lru.put("old", "X", ttl=-1)
+    assert lru.get("old") is None
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_never_hits(monkeypatch):
+    monkeypatch.setattr(settings, "ENABLE_REPORT_CACHING", False)
+    report_cache._lru.put("k", "summary", ttl=60)
+    try:
+        assert await report_cache.get_cached_summary("k") is None
+    finally:
+        report_cache._lru.clear()
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from app.api.v1.routes import reports
+from app.api.v1.routes.reports import ReportRequest, report_event_stream
+from app.services.ai_providers import FakeProvider
+from app.services.ai_service import AIReportService
+
+DATA = {"volunteers": {"total": 3}}
+
+
+def _frames(chunks):
+    frames = []
+    for chunk in chunks:
+        event, data = chunk.rstrip("\n").split("\n")
+        frames.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return frames
+
+
+async def _collect(stream):
+    return [chunk async for chunk in stream]
+
+
+@pytest.fixture
+def stored(monkeypatch):
+    calls = []
+
+    async def fake_store(key, summary, report_type):
+        calls.append((key, summary, report_type))
+
+    monkeypatch.setattr(reports.report_cache, "store_summary", fake_store)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_stream_forwards_tokens_and_caches_full_text(stored):
+    ai = AIReportService(FakeProvider())
+    body = ReportRequest(report_type="volunteer_insights")
+    frames = _frames(await _collect(report_event_stream(ai, body, DATA, None, "k", None)))
+
+    assert frames[0] == ("meta", {"report_type": "volunteer_insights", "date_range": None, "cached": False})
+    tokens = [data for event, data in frames if event == "token"]
+    assert len(tokens) > 1
+    expected = await ai.generate_report("volunteer_insights", DATA)
+    assert "".join(tokens) == expected
+    assert frames[-1][0] == "done" and frames[-1][1]["raw_data"] == DATA
+    assert stored == [("k", expected, "volunteer_insights")]
+
+
+@pytest.mark.asyncio
+async def test_cached_summary_is_sent_without_calling_model(stored):
+    body = ReportRequest(report_type="overall_summary")
+    frames = _frames(await _collect(report_event_stream(None, body, DATA, None, "k", "cached text")))
+
+    assert frames[0][1]["cached"] is True
+    assert frames[1] == ("token", "cached text")
+    assert frames[-1][0] == "done"
+    assert stored == []
+
+
+@pytest.mark.asyncio
+async def test_model_failure_emits_error_and_skips_cache(stored):
+    class Failing(FakeProvider):
+        async def _stream_once(self, prompt):
+            yield "partial"
+            raise RuntimeError("boom")
+
+    body = ReportRequest(report_type="overall_summary")
+    frames = _frames(await _collect(report_event_stream(AIReportService(Failing()), body, DATA, None, "k", None)))
+
+    assert [event for event, _ in frames] == ["meta", "token", "error"]
+    assert "boom" in frames[-1][1]["detail"]
+    assert stored == []
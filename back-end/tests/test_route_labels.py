@@ -0,0 +1,50 @@
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import middleware
+from app.core.metrics import HTTP_REQUESTS
+
+
+def _app():
+    app = FastAPI()
+    exports = APIRouter(prefix="/export")
+    reports = APIRouter(prefix="/reports")
+
+    @exports.get("/stats")
+    async def export_stats():
+        return {}
+
+    @exports.get("/{code}")
+    async def export_code(code: str):
+        return {}
+
+    @reports.get("/stats")
+    async def report_stats():
+        return {}
+
+    app.include_router(exports, prefix="/api/v1")
+    app.include_router(reports, prefix="/api/v1")
+    app.middleware("http")(middleware.track_request_metrics)
+    return app
+
+
+def _paths():
+    return {labels[1] for labels in HTTP_REQUESTS.collect()}
+
+
+def test_labels_use_full_mounted_template():
+    client = TestClient(_app())
+    client.get("/api/v1/export/stats")
+    client.get("/api/v1/reports/stats")
+    client.get("/api/v1/export/AB-101")
+    client.get("/api/v1/export/CD-202")
+
+    paths = _paths()
+    assert {"/api/v1/export/stats", "/api/v1/reports/stats", "/api/v1/export/{code}"} <= paths
+    assert "/stats" not in paths and "/export/{code}" not in paths
+    assert not any("AB-101" in p for p in paths)
+
+
+def test_unmatched_requests_share_one_label():
+    TestClient(_app()).get("/nope/123")
+    assert "unmatched" in _paths()
@@ -0,0 +1,62 @@
+import threading
+import time
+
+from app.core import sampling_profiler
+from app.core.sampling_profiler import StackSampler, fold_stack, to_folded_text
+
+
+def _busy_leaf(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_fold_stack_is_root_first():
+    def inner():
+        import sys
+        return fold_stack(sys._getframe())
+
+    folded = inner()
+    frames = folded.split(";")
+    assert frames[-1].endswith(":inner")
+    assert any(f.endswith(":test_fold_stack_is_root_first") for f in frames[:-1])
+
+
+def test_sampler_attributes_samples_to_target_thread():
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_leaf, args=(stop,))
+    worker.start()
+    try:
+        sampler = StackSampler(worker.ident, interval_ms=1, max_samples=10_000).start()
+        time.sleep(0.1)
+        stacks = sampler.stop()
+    finally:
+        stop.set()
+        worker.join()
+
+    assert sampler.sample_count > 0
+    assert sum(stacks.values()) == sampler.sample_count
+    assert all("_busy_leaf" in stack for stack in stacks)
+
+
+def test_sampler_stops_at_max_samples():
+    sampler = StackSampler(threading.get_ident(), interval_ms=1, max_samples=3).start()
+    time.sleep(0.1)
+    sampler.stop()
+    assert sampler.sample_count == 3
+
+
+def test_only_one_profile_at_a_time():
+    first = sampling_profiler.try_start_sampler()
+    try:
+        assert first is not None
+        assert sampling_profiler.try_start_sampler() is None
+    finally:
+        sampling_profiler.stop_sampler(first)
+
+    second = sampling_profiler.try_start_sampler()
+    assert second is not None
+    sampling_profiler.stop_sampler(second)
+
+
+def test_folded_text_format():
+    assert to_folded_text({"a;b": 2, "a": 1}) == "a 1\na;b 2\n"
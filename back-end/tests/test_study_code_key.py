@@ -0,0 +1,50 @@
+from datetime import datetime
+
+import pytest
+
+from app.core.normalization import study_code_filter, study_code_key
+from app.db.odm.assigned_study import AssignedStudy
+from app.repositories import dashboard_repo
+from tests.conftest import FakeCollection, FakeDB
+
+
+def test_study_code_key_is_trimmed_upper_case():
+    assert study_code_key(" ab-101 ") == "AB-101"
+    assert study_code_key("") is None and study_code_key(None) is None
+
+
+def test_filter_matches_key_exactly_and_escapes_raw_fallback():
+    query = study_code_filter(" ab.1* ", "clinical_participation")
+    keyed, unkeyed = query["$or"]
+    assert keyed == {"study_code_key": "AB.1*"}
+    # Documents not yet backfilled: escaped, anchored, case-insensitive match on the raw code
+    assert unkeyed == {
+        "study_code_key": {"$exists": False},
+        "study.study_code": {"$regex": r"^\s*AB\.1\*\s*$", "$options": "i"},
+    }
+    assert study_code_filter("  ", "assigned_studies") == {"study_code_key": {"$in": []}}
+
+
+def test_assignment_sets_key_before_write():
+    assignment = AssignedStudy.model_construct(study_code="cv-2025")
+    assignment.set_study_code_key()
+    assert assignment.study_code_key == "CV-2025"
+
+
+@pytest.mark.asyncio
+async def test_participation_details_query_by_key(monkeypatch):
+    fake = FakeDB(
+        assigned_studies=FakeCollection([
+            {"volunteer_id": "V1", "study_code": "AB-101", "status": "assigned", "assigned_date": datetime(2025, 1, 1)},
+        ]),
+        volunteers_master=FakeCollection([
+            {"volunteer_id": "V1", "basic_info": {"name": "Asha", "dob": "1990-04-02", "gender": "FVB"}, "dob_date": datetime(1990, 4, 2)},
+        ]),
+    )
+    monkeypatch.setattr(dashboard_repo, "dashboard_db", fake)
+
+    rows = await dashboard_repo.get_study_participation_details("ab-101")
+
+    assert fake.assigned_studies.queries == [study_code_filter("AB-101", "assigned_studies")]
+    assert fake.assigned_studies.queries[0]["$or"][0] == {"study_code_key": "AB-101"}
+    assert rows[0]["name"] == "Asha" and rows[0]["gender"] == "Female" and isinstance(rows[0]["age"], int)
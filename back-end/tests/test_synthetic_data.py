@@ -0,0 +1,59 @@
+import random
+
+from benchmarks.runner import percentile, summarize
+from benchmarks.synthetic_data import (
+    generate_assignments,
+    generate_study_instances,
+    generate_visits,
+    generate_volunteers,
+)
+
+
+def _volunteers(seed, count=50):
+    return list(generate_volunteers(random.Random(seed), count))
+
+
+def test_generator_is_deterministic():
+    assert _volunteers(7) == _volunteers(7)
+    assert _volunteers(7) != _volunteers(8)
+
+
+def test_only_registered_volunteers_get_registration_forms():
+    for docs in _volunteers(1, 200):
+        assert ("registration" in docs) == (docs["master"]["current_stage"] == "registered")
+
+
+def test_visits_and_assignments_reference_instances():
+    rng = random.Random(3)
+    instances = generate_study_instances(rng, 4)
+    instance_ids = {str(i["_id"]) for i in instances}
+
+    visits = list(generate_visits(rng, instances, 10))
+    assert len(visits) == 40
+    assert {v["studyInstanceId"] for v in visits} == instance_ids
+
+    approved = [d["master"] for d in _volunteers(3, 100) if d["master"]["current_status"] == "approved"]
+    assignments = list(generate_assignments(rng, instances, approved, 5))
+    assert len(assignments) == 20
+    assert len({a["visit_id"] for a in assignments}) == 20
+
+
+def test_percentiles():
+    samples = [float(n) for n in range(1, 101)]
+    assert percentile(samples, 50) == 50
+    assert percentile(samples, 95) == 95
+    assert summarize(samples)["max_ms"] == 100
+
+
+def test_client_options_follow_mongo_tls(monkeypatch):
+    from app.core.config import settings
+    from app.db.client import build_client_options
+
+    monkeypatch.setattr(settings, "MONGO_TLS", False)
+    options = build_client_options()
+    assert options["tls"] is False
+    assert "tlsCAFile" not in options and "tlsAllowInvalidCertificates" not in options
+
+    monkeypatch.setattr(settings, "MONGO_TLS", True)
+    options = build_client_options()
+    assert options["tls"] is True and options["tlsCAFile"]
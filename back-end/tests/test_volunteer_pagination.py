@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.core.domain_errors import InvalidPageCursor
+from app.core.pagination import _get
+from app.repositories import dashboard_repo
+from tests.conftest import FakeCollection, FakeDB
+
+BASE = datetime(2025, 1, 1)
+
+
+def _doc(i):
+    return {"_id": ObjectId(f"{i:024x}"), "volunteer_id": f"V{i:03d}", "audit": {"created_at": BASE + timedelta(minutes=i // 2)}}
+
+
+def _matches(doc, query):
+    if not query:
+        return True
+    if "$and" in query:
+        return all(_matches(doc, q) for q in query["$and"])
+    if "$or" in query:
+        return any(_matches(doc, q) for q in query["$or"])
+    for field, cond in query.items():
+        value = _get(doc, field)
+        if isinstance(cond, dict):
+            if "$lt" in cond and not value < cond["$lt"]:
+                return False
+            if "$gt" in cond and not value > cond["$gt"]:
+                return False
+        elif value != cond:
+            return False
+    return True
+
+
+def _run(docs):
+    """Evaluates the $match/$sort/$skip/$limit stages of search_volunteers in memory."""
+    def run(pipeline):
+        rows = [d for d in docs if _matches(d, pipeline[0]["$match"])]
+        rows.sort(key=lambda d: (d["audit"]["created_at"], d["_id"]), reverse=True)
+        for stage in pipeline[2:]:
+            if "$skip" in stage:
+                rows = rows[stage["$skip"]:]
+            if "$limit" in stage:
+                rows = rows[:stage["$limit"]]
+        return [dict(r) for r in rows]
+    return run
+
+
+@pytest.fixture
+def volunteers(monkeypatch):
+    docs = [_doc(i) for i in range(25)]
+    coll = FakeCollection(docs, results=_run(docs))
+    monkeypatch.setattr(dashboard_repo, "dashboard_db", FakeDB(volunteers_master=coll))
+    dashboard_repo._total_cache.clear()
+    return coll
+
+
+@pytest.mark.asyncio
+async def test_cursor_walks_every_row_once_including_ties(volunteers):
+    seen, cursor = [], None
+    while True:
+        page = await dashboard_repo.search_volunteers({}, limit=7, cursor=cursor)
+        seen += [v["volunteer_id"] for v in page["volunteers"]]
+        assert all("_id" not in v and "audit" not in v for v in page["volunteers"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [f"V{i:03d}" for i in reversed(range(25))]
+    # The lookup stage always sits after the page limit
+    stages = [next(iter(stage)) for stage in volunteers.pipelines[0]]
+    assert stages.index("$limit") < stages.index("$lookup")
+
+
+@pytest.mark.asyncio
+async def test_totals_are_estimated_or_cached(volunteers):
+    page = await dashboard_repo.search_volunteers({}, limit=5)
+    assert page["total"] == 25 and not volunteers.calls_of("count_documents")
+
+    await dashboard_repo.search_volunteers({"current_stage": "registered"}, limit=5)
+    await dashboard_repo.search_volunteers({"current_stage": "registered"}, limit=5)
+    assert len(volunteers.calls_of("count_documents")) == 1
+
+    page = await dashboard_repo.search_volunteers({}, limit=5, include_total=False)
+    assert page["total"] is None
+
+
+@pytest.mark.asyncio
+async def test_garbage_cursor_is_rejected(volunteers):
+    with pytest.raises(InvalidPageCursor):
+        await dashboard_repo.search_volunteers({}, cursor="not-a-cursor")